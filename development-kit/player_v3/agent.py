@@ -0,0 +1,808 @@
+import random
+import threading
+import time
+from collections import deque
+from status import Status, Games, POS_NEXT
+from strategy import *
+from consts import SocketConst, DrawReason, TIME_DELAY, TIMEOUT_OF_PLAYER, THINK_TIME
+from card import CARD_COLOR, CARD_NUMBER, CARD_SPECIAL, WILD, WILD_DRAW_4, encode, decode, encode_cards
+from anytime import LatencyMonitor, evaluate, decide
+from rollout import top_of, playable_cards, unseen_cards, simulate_round
+from selector import LadderSelector
+from speculation import Speculator
+from params import DEFAULT_PARAMS
+
+
+FLUSHING = object() # 待たせていた送信を送っている最中であることを表す識別子
+
+
+def start_timer(delay: float, func) -> None:
+    """受信スレッドを止めずに、delay秒後に別スレッドでfuncを呼び出す"""
+    timer = threading.Timer(delay, func)
+    timer.daemon = True
+    timer.start()
+
+
+class Agent:
+    """
+    Socket通信に依存しないプレイヤーの思考・記録処理
+    受信イベントごとの処理を持ち、送信はemitを通してsend_eventに委譲する
+    手札のカードは受信時に整数へ変換し(card.py)、送信時にdictへ戻す
+    """
+    def __init__(self, send_event=None, version: str=None, log=None, time_delay: int=TIME_DELAY, think_time: int=THINK_TIME, seed: int=None, think_pool=None, metrics=None, schedule=start_timer, selector=None, speculate: bool=False, params=DEFAULT_PARAMS) -> None:
+        """
+        Args:
+            send_event (func): 送信関数 send_event(event, data, callback)
+            version (str): 使用するバージョン('v2' or 'v3')を固定する場合に指定する
+            log (func): ログ出力関数 (Noneの場合は出力しない)
+            time_delay (int): UNO宣言漏れ指摘の応答を待つ間、後続の送信を待たせる最大時間(ms) 0の場合は待たない
+            think_time (int): 1手あたりの思考時間の上限(ms) 0の場合はプレイアウトによる改善を行わない
+            seed (int): プレイアウトの乱数シード
+            think_pool (ThinkPool): プレイアウトを分担させるプロセスプール(Noneまたは未起動の場合は受信スレッドで行う)
+            metrics (Metrics): 判断処理の時間を記録する場合に指定する
+            schedule (func): 後続の送信を待たせる時間が過ぎた時の呼び出しを予約する関数 schedule(秒, func)
+            selector (any): 対戦ごとに使用するバージョンを選ぶ選択器(selector.py Noneの場合は従来の閾値による選択)
+            speculate (bool): 相手の手番の間に自分の手番の候補手を先読みするか(think_timeが0の場合・think_poolの起動中は行わない)
+            params (StrategyParams): 戦略の閾値(params.py)
+        """
+        self.send_event = send_event
+        self.version = version
+        self.log = log
+        self.time_delay = time_delay
+        self.think_time = think_time
+        self.latency = LatencyMonitor() # 送信の往復時間(Socketクライアントが記録する)
+        self.rng = random.Random(seed)
+        self.think_pool = think_pool
+        self.metrics = metrics
+        self.schedule = schedule
+        self.selector = selector if selector is not None else LadderSelector()
+        self.speculator = Speculator(seed) if speculate and think_time else None
+        self.armed_challenge = None # ワイルドドロー4を出された時点で決めたチャレンジの判断 (局面の識別子, チャレンジするか, 千里眼か, 判断材料)
+        self.challenge_inputs = None # 直近のチャレンジの判断材料(capture.pyで記録する)
+        self.outbox = deque() # 先行する送信の応答待ちの間に待たせている送信
+        self.waiting = None # 応答待ちの送信の識別子(Noneの場合は待っていない)
+        self.lock = threading.Lock()
+        self.id = '' # 自分のID
+        self.games = Games()
+        self.params = params
+        self.game_status = Status(params)
+
+
+    def print(self, *args) -> None:
+        """ログ出力"""
+        if self.log is not None:
+            self.log(*args)
+
+
+    def emit(self, event: str, data: dict, callback=pass_func, barrier: bool=False) -> None:
+        """
+        送信処理
+        barrierを指定した送信は、応答が返るかtime_delayが過ぎるまで後続の送信を待たせる
+        待たせている間も受信スレッドは止めず、待たせた送信は元の順序のまま送る
+
+        Args:
+            event (str): Socket通信イベント名
+            data (dict): 送信するデータ
+            callback (func): 応答を受け取る処理
+            barrier (bool): 後続の送信を待たせるか
+        """
+        with self.lock:
+            if self.waiting is not None:
+                self.outbox.append((event, data, callback, barrier))
+                return
+        self.send(event, data, callback, barrier)
+
+
+    def send(self, event: str, data: dict, callback, barrier: bool) -> None:
+        """
+        待たせずに送信する
+        barrierを指定した場合は、後続の送信を待たせる状態にしてから送る
+        """
+        if not (barrier and self.time_delay):
+            self.send_event(event, data, callback)
+            return
+
+        token = object()
+        with self.lock:
+            self.waiting = token
+
+        def release_callback(res):
+            callback(res)
+            self.release(token)
+
+        self.send_event(event, data, release_callback)
+        self.schedule(self.time_delay / 1000, lambda: self.release(token))
+
+
+    def release(self, token: object) -> None:
+        """
+        応答待ちを解除し、待たせていた送信を順番に送る
+        途中に応答待ちの送信があればそこで止める
+
+        Args:
+            token (object): 解除する応答待ち(既に解除済みの場合は何もしない)
+        """
+        with self.lock:
+            if self.waiting is not token:
+                return
+            # 送り終えるまでは新しい送信も待たせ、順序が入れ替わらないようにする
+            self.waiting = FLUSHING
+
+        while True:
+            with self.lock:
+                if self.waiting is not FLUSHING:
+                    return
+                if not self.outbox:
+                    self.waiting = None
+                    return
+                event, data, callback, barrier = self.outbox.popleft()
+            self.send(event, data, callback, barrier)
+
+
+    def record_time(self, name: str, start: float) -> None:
+        """
+        判断処理の時間を記録する
+
+        Args:
+            name (str): 処理名
+            start (float): 処理を開始した時刻(time.perf_counter())
+        """
+        if self.metrics is not None:
+            self.metrics.record('decision:' + name, time.perf_counter() - start)
+
+
+    def join_room_callback(self, data_res: dict) -> None:
+        """試合参加の結果を受け取る"""
+        self.id = data_res.get('your_id')
+        self.print('My id is {}'.format(self.id))
+
+
+    def select_version(self) -> str:
+        """
+        これまでの得点から今回の対戦で使用するバージョンを選ぶ
+
+        Returns:
+            str: 'v2' or 'v3'
+        """
+        if self.version is not None:
+            return self.version
+        return self.selector.select()
+
+
+    def think_deadline(self, received: float) -> float:
+        """
+        思考の締め切りを求める
+        思考時間の上限と、持ち時間から通信の安全余裕を差し引いた時間の早い方とする
+
+        Args:
+            received (float): next-playerを受信した時刻(time.perf_counter())
+        Returns:
+            float: time.perf_counter()基準の締め切り
+        """
+        budget = min(self.think_time, TIMEOUT_OF_PLAYER) / 1000
+        limit = TIMEOUT_OF_PLAYER / 1000 - self.latency.margin()
+        return received + min(budget, limit)
+
+
+    def think_state(self, cards: list, before_card: dict, num_card_of_player: dict) -> tuple:
+        """
+        プレイアウトに渡す盤面を作る
+
+        Args:
+            cards (list): 自分の手札
+            before_card (dict): 場札のカード
+            num_card_of_player (dict): 各プレイヤーの手札枚数
+        Returns:
+            tuple: (局面の識別子, 盤面, 候補手)
+        """
+        game_status = self.game_status
+        top_color, top_kind = top_of(before_card)
+        cards = sorted(cards)
+        moves = playable_cards(cards, top_color, top_kind) + [None]
+
+        others = [game_status.get_next_id(), game_status.get_mid_id(), game_status.get_before_id()]
+        card_counts = [num_card_of_player.get(player, 0) for player in others]
+        open_cards = [list(game_status.other_open_cards.get(player, [])) for player in others]
+        pool = unseen_cards(game_status.cards_status).tolist()
+
+        state = (pool, cards, card_counts, open_cards, top_color, top_kind)
+        key = (tuple(pool), tuple(cards), tuple(card_counts), tuple(tuple(known) for known in open_cards), top_color, top_kind)
+        return key, state, moves
+
+
+    def speculate(self) -> None:
+        """
+        局面が変わった時に、今の局面で自分の手番が来た場合の候補手の先読みを始める
+        プロセスプールの起動中は、受信処理とGILを取り合わないように先読みしない
+        """
+        game_status = self.game_status
+        if self.speculator is None or not game_status.field_cards or not game_status.my_cards:
+            return
+        if self.think_pool is not None and self.think_pool.running:
+            return
+        key, state, moves = self.think_state(game_status.my_cards, game_status.field_cards[-1], game_status.player_card_counts)
+        self.speculator.submit(key, state, moves, min(self.think_time, TIMEOUT_OF_PLAYER) / 1000)
+
+
+    def challenge_key(self, before_player: str, num_card_of_player: dict) -> tuple:
+        """
+        チャレンジの判断に使う局面の識別子
+        見えていない札・場札が変われば変わる値と、各プレイヤーの手札枚数の組とする
+
+        Args:
+            before_player (str): ワイルドドロー4を出したプレイヤーのID
+            num_card_of_player (dict): 各プレイヤーの手札枚数
+        Returns:
+            tuple: 局面の識別子
+        """
+        game_status = self.game_status
+        return (before_player, tuple(sorted(num_card_of_player.items())), game_status.num_unseen, game_status.num_of_field)
+
+
+    def arm_challenge(self, player: str, card_play: dict) -> None:
+        """
+        直前のプレイヤーがワイルドドロー4を出した時点で、next-playerを待たずにチャレンジの判断を済ませておく
+        next-playerで通知された局面が一致しない場合は使わずにその場で判断し直す
+
+        Args:
+            player (str): カードを出したプレイヤーのID
+            card_play (dict): 出されたカード
+        """
+        game_status = self.game_status
+        self.armed_challenge = None
+        if card_play.get('special') != 'wild_draw_4' or player == self.id or player != game_status.get_before_id():
+            return
+
+        my_id = self.id
+        num_card_of_player = dict(game_status.player_card_counts)
+        num_of_deck = game_status.num_unseen - sum(v for k, v in num_card_of_player.items() if k != my_id)
+        field_card = game_status.colored_card_before_top() #wild_draw_4の直前に出された白以外のカード
+
+        start = time.perf_counter()
+        inputs = {}
+        is_challenge = challenge_dicision(field_card, my_id, player, num_card_of_player, num_of_deck, game_status, self.games, inputs)
+        self.record_time('arm_challenge', start)
+        # 千里眼の送信はnext-playerで行うため、判断の結果として持っておく
+        special_logic = game_status.special_logic_flag[0]
+        game_status.special_logic_flag[0] = False
+        self.armed_challenge = (self.challenge_key(player, num_card_of_player), is_challenge, special_logic, inputs or None)
+
+
+    def think_play_card(self, play_card: any, cards: list, before_card: dict, num_card_of_player: dict, deadline: float, speculation: tuple=None) -> any:
+        """
+        ヒューリスティックで選んだカードを初期解とし、締め切りまでプレイアウトで改善する
+
+        Args:
+            play_card (int): ヒューリスティックで選んだカード(Noneの場合は山札から引く)
+            cards (list): 自分の手札
+            before_card (dict): 場札のカード
+            num_card_of_player (dict): 各プレイヤーの手札枚数
+            deadline (float): 締め切り
+            speculation (tuple): 相手の手番の間の先読みの結果(Speculator.take)
+        Returns:
+            int: 出すカード(Noneの場合は山札から引く)
+        """
+        key, state, moves = self.think_state(cards, before_card, num_card_of_player)
+        rows = []
+        if speculation is not None and speculation[0] == key:
+            # 先読みした局面と一致した場合は、先読みに使った時間だけ締め切りを早める
+            _, rows, elapsed = speculation
+            deadline -= elapsed
+        rng = self.rng
+
+        if self.think_pool is not None and self.think_pool.running:
+            candidates = self.think_pool.evaluate(state, moves, play_card, deadline, rng)
+        else:
+            pool, cards, card_counts, open_cards, top_color, top_kind = state
+            def simulate(moves):
+                return simulate_round(pool, cards, card_counts, open_cards, top_color, top_kind, moves, rng)
+            candidates = evaluate(play_card, moves, simulate, deadline)
+
+        if rows and play_card in moves and len(candidates) > 1:
+            # 先読みの結果を初期解との得点差に変換して加える(候補手の並びは同じ局面なら一致する)
+            base_index = moves.index(play_card)
+            for rewards in rows:
+                base = rewards[base_index]
+                for candidate, reward in zip(candidates, rewards):
+                    candidate.add(reward, base)
+            if self.metrics is not None:
+                self.metrics.record('speculation:hit', elapsed)
+
+        best = decide(play_card, candidates)
+        if best != play_card:
+            self.print('think: {} -> {} ({} rounds)'.format(play_card, best, candidates[0].n))
+        return best
+
+
+    def determine_if_execute_pointed_not_say_uno(self, number_card_of_player: dict) -> None:
+        """
+        他のプレイヤーのUNO宣言漏れをチェックする
+
+        Args:
+            number_card_of_player(dict): {キー:プレイヤーID, 値:手札の枚数}
+        Returns:
+            None
+        """
+        game_status = self.game_status
+
+        target = None
+        # 手札の枚数が1枚だけのプレイヤーを抽出する
+        # 2枚以上所持しているプレイヤーはUNO宣言の状態をリセットする
+        for k, v in number_card_of_player.items():
+            if k == self.id:
+                # 自分のIDは処理しない
+                continue
+            elif v == 1:
+                # 1枚だけ所持しているプレイヤー
+                target = k
+                break
+            elif k in game_status.uno_declared:
+                # 2枚以上所持しているプレイヤーはUNO宣言の状態をリセットする
+                del game_status.uno_declared[k]
+
+        if target == None:
+            # 1枚だけ所持しているプレイヤーがいない場合、処理を中断する
+            return
+
+        # 抽出したプレイヤーがUNO宣言を行っていない場合宣言漏れを指摘する
+        if target not in game_status.uno_declared.keys():
+            # ディーラーが指摘を処理してから自分の手番の送信が届くように、応答まで後続の送信を待たせる
+            self.emit(SocketConst.EMIT.POINTED_NOT_SAY_UNO, { 'target': target }, barrier=True)
+
+
+    # カードが手札に追加された
+    def on_reciever_card(self, data_res: dict) -> None:
+        game_status = self.game_status
+        cards_receive = encode_cards(data_res["cards_receive"])
+        game_status.my_cards += cards_receive
+        if len(cards_receive) == 5 and WILD_DRAW_4 in cards_receive:
+            cards_receive.remove(WILD_DRAW_4)
+        game_status.update_cards_status(cards_receive)
+
+        self.speculate()
+
+
+    # 対戦の開始
+    def on_first_player(self, data_res: dict) -> None:
+        game_status = self.game_status
+        games = self.games
+
+        game_status.version = self.select_version()
+        self.print('Game', games.num_game + 1)
+        self.print(f'game_scores: v2 = {games.scores[0]}, v3 = {games.scores[1]}')
+        self.print(f'version: {game_status.version}')
+
+        # チャレンジ成功数を記録するための辞書
+        if games.num_game == 0:
+            for player_id in data_res['play_order']:
+                if player_id != self.id:
+                    games.challenge_cnt[player_id] = [0, 0] # [トータル数, 成功数]
+                    games.challenged_cnt[player_id] = [0, 0, 0] # [ドロ4出した回数, チャレンジ回数, 成功数]
+
+        games.num_game += 1
+        game_status.set_play_order(data_res['play_order'], self.id)
+
+        first_card = data_res['first_card']
+        if "special" in first_card.keys():
+            if first_card["special"] == "reverse":
+                    game_status.reverse_order()
+
+        first_player = data_res['first_player']
+
+        # 最後にターンをプレイしたプレイヤーを初期化する
+        game_status.who_played_last = first_player
+
+        # プレイヤー全員の手札枚数を初期化する
+        game_status.init_player_card_counts(data_res['play_order'])
+        game_status.push_field_card(data_res['first_card'])
+        game_status.update_cards_status(encode(data_res['first_card']))
+
+        self.speculate()
+
+
+    # 場札の色指定を要求
+    def on_color_of_wild(self, data_res: dict) -> None:
+        game_status = self.game_status
+        color = select_change_color(game_status.my_cards, game_status)
+        data = {
+            'color_of_wild': color,
+        }
+
+        # 色変更を実行する
+        self.emit(SocketConst.EMIT.COLOR_OF_WILD, data)
+
+
+    # 場札の色が変わった
+    def on_update_color(self, data_res: dict) -> None:
+        game_status = self.game_status
+
+        # どの色に変更されたか記録する
+        chosen_color = data_res.get("color")
+        game_status.log_color(game_status.who_played_last, chosen_color, "wild")
+
+        # 場に出されたカードのログにおいて、カード色を black --> chosen_color に変更する
+        game_status.set_top_color(chosen_color)
+
+        self.speculate()
+
+
+    # シャッフルワイルドにより手札状況が変更
+    def on_shuffle_wild(self, data_res: dict) -> None:
+        game_status = self.game_status
+        game_status.uno_declared = {}
+
+        #シャッフルワイルドで公開手札をリセットする
+        game_status.init_open_cards()
+        game_status.init_my_open_cards()
+
+        for k, v in data_res.get('number_card_of_player').items():
+            if v == 1:
+                # シャッフル後に1枚になったプレイヤーはUNO宣言を行ったこととする
+                game_status.uno_declared[k] = True
+                if self.id != k:
+                    game_status.set_uno_player(k)
+                else:
+                    game_status.my_uno_flag = True
+
+            elif k in game_status.uno_declared:
+                # シャッフル後に2枚以上のカードが配られたプレイヤーはUNO宣言の状態をリセットする
+                if self.id != k:
+                    game_status.undo_uno_player(k)
+                else:
+                    game_status.my_uno_flag = False
+
+                del game_status.uno_declared[k]
+
+        # shuffle wildにより各プレイヤーの手札枚数がリセット
+        # 最新状態に更新しておく
+        for k, v in data_res['number_card_of_player'].items():
+            game_status.check_player_card_counts(k, v)
+
+        cards_receive = encode_cards(data_res.get("cards_receive"))
+        game_status.return_my_cards()
+        game_status.update_cards_status(cards_receive)
+        game_status.set_my_cards(cards_receive)
+
+        self.speculate()
+
+
+    # 自分の番
+    def on_next_player(self, data_res: dict) -> None:
+        received = time.perf_counter()
+        speculation = self.speculator.take() if self.speculator is not None else None
+        armed_challenge = self.armed_challenge
+        self.armed_challenge = None
+        my_id = self.id
+        game_status = self.game_status
+        games = self.games
+
+        before_player = data_res.get('before_player')
+        before_card = data_res.get('card_before')
+        cards = encode_cards(data_res.get('card_of_player'))
+        num_card_of_player = data_res.get('number_card_of_player')
+
+        next_player = game_status.get_next_id()
+        num_of_deck = game_status.calculate_num_of_deck(my_id, num_card_of_player)
+
+        game_status.check_uno_player(my_id, num_card_of_player)
+
+        self.determine_if_execute_pointed_not_say_uno(num_card_of_player)
+
+        # 各プレイヤーの手札枚数を最新状態に更新しておく
+        for k, v in num_card_of_player.items():
+            game_status.check_player_card_counts(k, v)
+
+        # 自分の手札を更新しておく
+        game_status.set_my_cards(cards)
+        game_status.my_uno_flag = len(cards) == 1
+
+        if data_res.get('draw_reason') == DrawReason.WILD_DRAW_4:
+            # カードを引く理由がワイルドドロー4の時、チャレンジを行うことができる。
+            start = time.perf_counter()
+            if armed_challenge is not None and armed_challenge[0] == self.challenge_key(before_player, num_card_of_player):
+                # ワイルドドロー4を出された時点で決めた判断を使う
+                _, is_challenge, game_status.special_logic_flag[0], self.challenge_inputs = armed_challenge
+            else:
+                field_card = game_status.colored_card_before_top() #wild_draw_4の直前に出された白以外のカード
+                inputs = {}
+                is_challenge = challenge_dicision(field_card, my_id, before_player, num_card_of_player, num_of_deck, game_status, games, inputs)
+                self.challenge_inputs = inputs or None
+            self.record_time('challenge_dicision', start)
+            if game_status.special_logic_flag[0]:
+                game_status.special_logic_flag[0] = False
+                title = "千里眼ッ!!!!!"
+                self.emit(SocketConst.EMIT.SPECIAL_LOGIC, { 'title': title })
+            self.emit(SocketConst.EMIT.CHALLENGE, { 'is_challenge': is_challenge } )
+            if is_challenge:
+                return
+
+        if data_res.get('must_call_draw_card'):
+            # カードを引かないと行けない時
+            game_status.my_uno_flag = False
+            self.emit(SocketConst.EMIT.DRAW_CARD, {})
+            return
+
+        # 自分の手札から、出せるカードのリストとプレイモードを取得する
+        start = time.perf_counter()
+        play_card, play_mode = select_play_card(cards, my_id, next_player, num_card_of_player, num_of_deck, before_card, game_status, games)
+        self.record_time('select_play_card', start)
+        if self.think_time:
+            # 持ち時間の残りでプレイアウトによる改善を行う
+            start = time.perf_counter()
+            play_card = self.think_play_card(play_card, cards, before_card, num_card_of_player, self.think_deadline(received), speculation)
+            self.record_time('think_play_card', start)
+
+        # 選出したカードがある時
+        if play_card is not None:
+            game_status.my_uno_flag = len(cards) == 2
+            data = {
+                'card_play': decode(play_card),
+                'yell_uno': game_status.my_uno_flag  # 残り手札数を考慮してUNOコールを宣言する
+            }
+
+            if play_card == WILD or play_card == WILD_DRAW_4:
+                data['color_of_wild'] = select_color_of_wild(cards, my_id, before_player, num_card_of_player, play_mode, game_status)
+
+            if play_card == WILD_DRAW_4:
+                games.challenged_cnt[next_player][0] += 1
+
+            if game_status.special_logic_flag[1]:
+                game_status.special_logic_flag[1] = False
+                title = "もう絶望する必要なんて，ない！"
+                self.emit(SocketConst.EMIT.SPECIAL_LOGIC, { 'title': title })
+
+            self.emit(SocketConst.EMIT.PLAY_CARD, data)
+
+        else:
+            # 引いたカードを出すイベントを実行
+            def draw_card_callback(res):
+                # 引いたカードが場に出せない場合、処理を終了
+                if not res.get('can_play_draw_card'):
+                    game_status.my_uno_flag = False
+                    return
+
+                # 引いたカード情報の取得
+                draw_card = encode(res.get('draw_card')[0])
+
+                # プレイモードに応じて処理を変える
+                # 攻撃モードの場合
+                if play_mode == "offensive":
+                    # 引いてきたカードがシャッフルワイルドの場合、出さずに処理を終了
+                    if CARD_SPECIAL[draw_card] == "wild_shuffle" and not (len(cards) >= 4 and min_cards_check(my_id, num_card_of_player) <= 2):
+                        game_status.my_uno_flag = False
+                        data = {
+                            'is_play_card': False,
+                            'yell_uno': game_status.my_uno_flag  # 残り手札数を考慮してUNOコールを宣言する
+                        }
+                        self.emit(SocketConst.EMIT.PLAY_DRAW_CARD, data)
+                        return
+                    elif not game_status.wild_shuffle_flag() and CARD_SPECIAL[draw_card]  == "white_wild":
+                        game_status.my_uno_flag = False
+                        data = {
+                            'is_play_card': False,
+                            'yell_uno': game_status.my_uno_flag  # 残り手札数を考慮してUNOコールを宣言する
+                        }
+                        self.emit(SocketConst.EMIT.PLAY_DRAW_CARD, data)
+                        return
+
+                # 直後がUNOであり、自分もUNOでワイルドカードが引いたとき
+                if game_status.uno_positions() == POS_NEXT and game_status.my_uno_flag and CARD_SPECIAL[draw_card] in ["wild", "wild_shuffle", "white_wild"]:
+                    #直後が手札公開をしていて,その手札から読める絶対に出せない色＝場の色である場合出さない
+                    if len(game_status.other_open_cards[next_player]) > 0: #特殊処理が走る
+                        #直後の人が持っていない色を認識
+                        open_card = game_status.other_open_cards[next_player][0]
+                        open_card_coler = CARD_COLOR[open_card]
+                        open_card_number = CARD_NUMBER[open_card]
+                        open_card_special = CARD_SPECIAL[open_card]
+
+                        if open_card_coler not in {"black", "white"} and before_card["color"] != open_card_coler:
+                            if (open_card_number is not None and open_card_number != before_card.get("number")) or \
+                               (open_card_special is not None and open_card_special != before_card.get("special")):
+                                #出さない
+                                game_status.my_uno_flag = False
+                                data = {
+                                    'is_play_card': False,
+                                    'yell_uno': game_status.my_uno_flag  # 残り手札数を考慮してUNOコールを宣言する
+                                }
+                                self.emit(SocketConst.EMIT.PLAY_DRAW_CARD, data)
+                                return
+
+                # 以後、引いたカードが場に出せるときの処理
+                game_status.my_uno_flag = len(cards) == 1
+                data = {
+                    'is_play_card': True,
+                    'yell_uno': game_status.my_uno_flag  # 残り手札数を考慮してUNOコールを宣言する
+                }
+
+                if draw_card == WILD or draw_card == WILD_DRAW_4:
+                    data['color_of_wild'] = select_color_of_wild(cards, my_id, before_player, num_card_of_player, play_mode, game_status)
+
+                if draw_card == WILD_DRAW_4:
+                    games.challenged_cnt[next_player][0] += 1
+
+                # 引いたカードを出すイベントを実行
+                self.emit(SocketConst.EMIT.PLAY_DRAW_CARD, data)
+
+            # カードを引くイベントを実行
+            self.emit(SocketConst.EMIT.DRAW_CARD, {}, draw_card_callback)
+
+
+    # カードが場に出た
+    def on_play_card(self, data_res: dict) -> None:
+        game_status = self.game_status
+        player = data_res.get('player')
+        card_play = data_res.get('card_play')
+
+        # UNO宣言を行った場合は記録する
+        if data_res.get('yell_uno'):
+            game_status.uno_declared[player] = data_res.get('yell_uno')
+            if self.id != player:
+                game_status.set_uno_player(player)
+
+        # カードを場に出した(game_status側処理)
+        game_status.play_card(card_play, player)
+        game_status.num_of_field += 1
+
+        card = encode(card_play)
+        if self.id != player:
+            # 自分の出したカードでなければ cards_statusを更新する
+            game_status.update_cards_status(card)
+            # 公開されていた手札に含まれていた場合は消去する
+            game_status.remove_other_player_cards(player, card)
+        else:
+            game_status.remove_my_open_cards(card)
+            if card in game_status.my_cards:
+                game_status.my_cards.remove(card)
+
+        if "special" in card_play.keys():
+            if card_play["special"] == "reverse":
+                game_status.reverse_order()
+
+        # 最後にカードをプレイしたプレイヤーを更新
+        game_status.who_played_last = player
+
+        # ホワイトワイルドの効果が切れてるのを確認
+        if game_status.is_white_activate[player] > 0:
+            game_status.is_white_activate[player] = 0
+
+        self.arm_challenge(player, card_play)
+        self.speculate()
+
+
+    # 山札からカードを引いた
+    def on_draw_card(self, data_res: dict) -> None:
+        game_status = self.game_status
+        player = data_res.get('player')
+        # カードが増えているのでUNO宣言の状態をリセットする
+        if player in game_status.uno_declared:
+            if self.id != player:
+                game_status.undo_uno_player(player)
+            del game_status.uno_declared[player]
+
+        # 山札からカードが引かれた(game_status側処理)
+        game_status.draw_card(player)
+
+        self.speculate()
+
+
+    # 山札から引いたカードが場に出た
+    def on_play_draw_card(self, data_res: dict) -> None:
+        game_status = self.game_status
+        player = data_res.get('player')
+        card_play = data_res.get('card_play')
+        if data_res.get('is_play_card'):
+            if data_res.get('yell_uno'):
+            # UNO宣言を行った場合は記録する
+                game_status.uno_declared[player] = data_res.get('yell_uno')
+                if self.id != player:
+                    game_status.set_uno_player(player)
+
+            # カードを場に出した(game_status側処理)
+            game_status.play_card(card_play, player)
+            game_status.num_of_field += 1
+
+            card = encode(card_play)
+            if self.id != player:
+                # 自分の出したカードでなければ cards_statusを更新する
+                game_status.update_cards_status(card)
+            else:
+                if card in game_status.my_cards:
+                    game_status.my_cards.remove(card)
+
+            if "special" in card_play.keys():
+                if card_play["special"] == "reverse":
+                    game_status.reverse_order()
+
+            # 最後にカードをプレイしたプレイヤーを更新
+            game_status.who_played_last = player
+
+            self.arm_challenge(player, card_play)
+
+        self.speculate()
+
+
+    # チャレンジの結果
+    def on_challenge(self, data_res: dict) -> None:
+        my_id = self.id
+        game_status = self.game_status
+        games = self.games
+
+        # レスポンス取得
+        challenger = data_res.get("challenger")
+        target = data_res.get("target")
+        is_challenge = data_res.get("is_challenge")
+        is_challenge_success = data_res.get("is_challenge_success")
+
+        # チャレンジした場合
+        if is_challenge:
+            if challenger == my_id:
+                games.challenge_cnt[target][0] += 1
+            if target == my_id:
+                games.challenged_cnt[challenger][1] += 1
+                game_status.my_open_cards[challenger] = game_status.my_cards.copy()
+
+            # チャレンジが成功した場合は
+            if is_challenge_success:
+                # ターゲットがペナルティとして山札から4枚引く
+                game_status.draw_card(target)
+
+                # 場に出されていたwild_draw_4を手札に戻す
+                game_status.pop_field_card() # wild_draw_4が取り出される
+                game_status.num_of_field -= 1 # 場のカードが1枚減る
+                game_status.player_card_counts[target] += 1 # プレイヤーの手札の枚数が+1される
+                if target != my_id: # wild_draw_4を出したプレイヤーが自分でない場合
+                    # 自分からwild_draw_4が見えなくなるので cards_statusを元に戻す
+                    game_status.restore_cards_status(WILD_DRAW_4)
+                else:
+                    game_status.challenge_success = True
+                    games.challenged_cnt[challenger][2] += 1
+                    game_status.my_open_cards[challenger].append(WILD_DRAW_4)
+
+                # チャレンジ成功数をインクリメント
+                if challenger == my_id:
+                    games.challenge_cnt[target][1] += 1
+
+            # チャレンジが失敗した場合は
+            else:
+                # チャレンジャーが wild_draw_4の効果を受けて4枚ドロー
+                game_status.draw_card(challenger)
+
+                # 追加でペナルティとして山札から2枚引く
+                game_status.draw_card(challenger, penalty_draw=2)
+
+        # チャレンジしない場合
+        else:
+            # wild_draw_4の効果を受けて4枚ドロー
+            game_status.draw_card(challenger)
+
+        self.speculate()
+
+
+    # チャレンジによる手札の公開
+    def on_public_card(self, data_res: dict) -> None:
+        self.game_status.set_other_player_cards(data_res.get("card_of_player"), encode_cards(data_res.get("cards")))
+
+        self.speculate()
+
+
+    # 対戦が終了
+    def on_finish_turn(self, data_res: dict) -> None:
+        score = data_res.get("score")[self.id]
+        if self.game_status.version == 'v2':
+            self.games.scores[0] += score
+        else:
+            self.games.scores[1] += score
+        self.selector.update(self.game_status.version, score)
+        self.game_status = Status(self.params)
+
+
+    # ペナルティ発生
+    def on_penalty(self, data_res: dict) -> None:
+        game_status = self.game_status
+
+        # ペナルティによりカードを2枚引く
+        game_status.draw_card(data_res.get('player'), penalty_draw=2)
+
+        # カードが増えているのでUNO宣言の状態をリセットする
+        if data_res.get('player') in game_status.uno_declared:
+            del game_status.uno_declared[data_res.get('player')]
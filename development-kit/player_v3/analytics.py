@@ -0,0 +1,407 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import zlib
+import numpy as np
+from consts import SocketConst, Special, DrawReason
+from capture import RECV, NOTE, FILE_SUFFIX
+from params import DEFAULT_PARAMS
+from selector import STRATEGY_VERSIONS
+
+
+"""
+記録(capture.py)の集計
+
+記録したファイルを1行ずつ読み(ジェネレータ)、集計に使う行を一定の件数ずつnumpyの配列にして、
+固定の大きさのヒストグラムに足し込む(コーパス全体をメモリに載せない)
+集計する内容
+    Games(status.py)と同じ統計: 対戦数, challenge_cnt, challenged_cnt, バージョンごとの得点
+    一定の対戦数ごとのバージョン別の勝率・平均得点
+    直前のプレイヤーの手札枚数ごとのチャレンジ成功率
+        (自分のチャレンジは判断時の枚数、他のプレイヤーのチャレンジは受信イベントから推定した枚数)
+    自分のチャレンジの判断材料(challenge_dicisionの確率p・直前のプレイヤーの手札枚数)と結果
+これらからstrategy.pyのチャレンジの閾値(challenge_hand_size, challenge_p_large, challenge_p_small)を求める
+
+例) python analytics.py captures/ -b 100
+    python analytics.py --check (閾値を求める処理の確認)
+"""
+CHUNK_ROWS = 1 << 14 # numpyの配列にまとめる行数
+MAX_HAND = 30 # 手札枚数の集計の上限(これ以上は同じ枠にまとめる)
+P_BINS = 20 # 確率pの区間の数
+INITIAL_HAND = 7 # 対戦開始時の手札枚数
+# チャレンジの損得(自分の手札の増減 チャレンジしない場合の4枚との差)
+CHALLENGE_GAIN_SUCCESS = 4 # 成功すれば4枚引かずに済む
+CHALLENGE_GAIN_FAILURE = -2 # 失敗すれば4枚に加えてペナルティの2枚を引く
+
+
+def list_files(paths: list) -> list:
+    """ディレクトリは中の記録ファイルに展開し、名前順(記録順)に並べる"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += [os.path.join(path, name) for name in os.listdir(path) if name.endswith(FILE_SUFFIX)]
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def iter_records(paths: list):
+    """
+    記録を1行ずつ返すジェネレータ(書き込み途中のファイルは読めたところまで)
+
+    Args:
+        paths (list): 記録ファイルまたはディレクトリ
+    Yields:
+        tuple: (種類, イベント名, 内容)
+    """
+    for path in list_files(paths):
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    yield record['k'], record['e'], record['d']
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            continue
+
+
+class CorpusStats:
+    """
+    記録から統計を集計する(record()に記録を順に渡す)
+    """
+    def __init__(self, bucket_size: int=100, chunk_rows: int=CHUNK_ROWS) -> None:
+        """
+        Args:
+            bucket_size (int): バージョン別の勝率をまとめる対戦数
+            chunk_rows (int): numpyの配列にまとめる行数
+        """
+        self.bucket_size = bucket_size
+        self.chunk_rows = chunk_rows
+
+        # Games(status.py)と同じ統計
+        self.num_game = 0
+        self.challenge_cnt = {} # 各プレイヤーに対する [チャレンジ数, 成功数]
+        self.challenged_cnt = {} # 各プレイヤーに対する [ドロ4出した回数, チャレンジされた回数, 成功された数]
+        self.scores = [0, 0] # [v2の得点, v3の得点]
+
+        # ヒストグラム
+        num_versions = len(STRATEGY_VERSIONS) + 1 # 最後は不明なバージョン
+        self.version_games = np.zeros((0, num_versions), dtype=np.int64) # [区間, バージョン] 対戦数
+        self.version_wins = np.zeros((0, num_versions), dtype=np.int64) # 勝った対戦数
+        self.version_scores = np.zeros((0, num_versions), dtype=np.int64) # 得点の合計
+        self.hand_challenges = np.zeros((2, MAX_HAND + 1, 2), dtype=np.int64) # [自分か, 直前のプレイヤーの手札枚数, 成功したか]
+        self.decisions = np.zeros((MAX_HAND + 1, P_BINS, 2, 2), dtype=np.int64) # [手札枚数, pの区間, チャレンジしたか, 成功したか]
+
+        # numpyの配列にまとめる前の行
+        self.turn_rows = [] # (区間, バージョン, 勝ったか, 得点)
+        self.challenge_rows = [] # (自分か, 手札枚数, 成功したか)
+        self.decision_rows = [] # (手札枚数, pの区間, チャレンジしたか, 成功したか)
+
+        # 記録を読み進める間の状態
+        self.me = None
+        self.version = None
+        self.play_order = []
+        self.turn_right = True
+        self.counts = {} # 推定した各プレイヤーの手札枚数
+        self.challenge_inputs = None # 直近のチャレンジの判断材料
+
+
+    def scan(self, records) -> 'CorpusStats':
+        """記録を全て集計する"""
+        for kind, event, data in records:
+            self.record(kind, event, data)
+        self.reduce()
+        return self
+
+
+    def record(self, kind: str, event: str, data: any) -> None:
+        """
+        記録を1件集計する
+
+        Args:
+            kind (str): 記録の種類
+            event (str): イベント名
+            data (any): 内容
+        """
+        if kind == RECV:
+            handler = getattr(self, 'on_' + event.replace('-', '_'), None)
+            if handler is not None:
+                handler(data)
+        elif kind == NOTE:
+            if event == 'version':
+                self.version = data
+            elif event == 'challenge':
+                self.challenge_inputs = data
+        elif event == SocketConst.EMIT.JOIN_ROOM and isinstance(data, dict):
+            # 参加の応答で自分のIDが分かる
+            self.me = data.get('your_id', self.me)
+
+        if len(self.turn_rows) + len(self.challenge_rows) + len(self.decision_rows) >= self.chunk_rows:
+            self.reduce()
+
+
+    def next_of(self, player: str) -> str:
+        """プレイヤーの次の手番のプレイヤー"""
+        if player not in self.play_order:
+            return None
+        step = 1 if self.turn_right else -1
+        return self.play_order[(self.play_order.index(player) + step) % len(self.play_order)]
+
+
+    def on_first_player(self, data: dict) -> None:
+        self.play_order = data.get('play_order', [])
+        self.turn_right = data.get('first_card', {}).get('special') != Special.REVERSE
+        self.counts = {player: INITIAL_HAND for player in self.play_order}
+        self.version = None
+        self.challenge_inputs = None
+        if self.num_game == 0:
+            for player in self.play_order:
+                if player != self.me:
+                    self.challenge_cnt[player] = [0, 0]
+                    self.challenged_cnt[player] = [0, 0, 0]
+        self.num_game += 1
+
+
+    def on_next_player(self, data: dict) -> None:
+        # 自分の番では全員の手札枚数が分かる
+        self.counts = dict(data.get('number_card_of_player', self.counts))
+        self.turn_right = data.get('turn_right', self.turn_right)
+        if data.get('draw_reason') != DrawReason.WILD_DRAW_4:
+            self.challenge_inputs = None
+
+
+    def on_shuffle_wild(self, data: dict) -> None:
+        self.counts = dict(data.get('number_card_of_player', self.counts))
+
+
+    def on_penalty(self, data: dict) -> None:
+        self.counts[data.get('player')] = data.get('number_card_of_player', 0)
+
+
+    def on_draw_card(self, data: dict) -> None:
+        # 引いた枚数は分からないので1枚とする(次の自分の番で正しい枚数に戻る)
+        if data.get('is_draw'):
+            player = data.get('player')
+            self.counts[player] = self.counts.get(player, 0) + 1
+
+
+    def on_play_card(self, data: dict) -> None:
+        self.played(data.get('player'), data.get('card_play', {}))
+
+
+    def on_play_draw_card(self, data: dict) -> None:
+        if data.get('is_play_card'):
+            self.played(data.get('player'), data.get('card_play', {}))
+
+
+    def played(self, player: str, card: dict) -> None:
+        """カードが場に出た"""
+        self.counts[player] = self.counts.get(player, 0) - 1
+        special = card.get('special')
+        if special == Special.REVERSE:
+            self.turn_right = not self.turn_right
+        elif special == Special.WILD_DRAW_4 and player == self.me:
+            target = self.next_of(player)
+            if target in self.challenged_cnt:
+                self.challenged_cnt[target][0] += 1
+
+
+    def on_challenge(self, data: dict) -> None:
+        me = self.me
+        challenger = data.get('challenger')
+        target = data.get('target')
+        is_challenge = bool(data.get('is_challenge'))
+        is_success = bool(data.get('is_challenge_success'))
+        hand_size = self.counts.get(target, 0)
+
+        if challenger == me and self.challenge_inputs is not None:
+            # 自分のチャレンジの判断とその結果
+            inputs = self.challenge_inputs
+            hand_size = inputs.get('hand_size', hand_size)
+            if not inputs.get('by_open_cards') and 'p' in inputs:
+                p_bin = min(int(inputs['p'] * P_BINS), P_BINS - 1)
+                self.decision_rows.append((min(hand_size, MAX_HAND), p_bin, int(is_challenge), int(is_challenge and is_success)))
+            self.challenge_inputs = None
+
+        if is_challenge:
+            self.challenge_rows.append((int(challenger == me), min(max(hand_size, 0), MAX_HAND), int(is_success)))
+            if challenger == me and target in self.challenge_cnt:
+                self.challenge_cnt[target][0] += 1
+                if is_success:
+                    self.challenge_cnt[target][1] += 1
+            if target == me and challenger in self.challenged_cnt:
+                self.challenged_cnt[challenger][1] += 1
+                if is_success:
+                    self.challenged_cnt[challenger][2] += 1
+
+        # 推定した手札枚数に結果を反映する
+        if not is_challenge:
+            self.counts[challenger] = self.counts.get(challenger, 0) + 4
+        elif is_success:
+            self.counts[target] = self.counts.get(target, 0) + 5
+        else:
+            self.counts[challenger] = self.counts.get(challenger, 0) + 6
+
+
+    def on_finish_turn(self, data: dict) -> None:
+        score = data.get('score', {}).get(self.me, 0)
+        if self.version in STRATEGY_VERSIONS:
+            version = STRATEGY_VERSIONS.index(self.version)
+            self.scores[version] += score
+        else:
+            version = len(STRATEGY_VERSIONS)
+        bucket = max(self.num_game - 1, 0) // self.bucket_size
+        self.turn_rows.append((bucket, version, int(data.get('winner') == self.me), score))
+
+
+    def reduce(self) -> None:
+        """溜めた行をヒストグラムに足し込む"""
+        if self.turn_rows:
+            rows = np.array(self.turn_rows, dtype=np.int64)
+            self.turn_rows = []
+            num_buckets = int(rows[:, 0].max()) + 1
+            if num_buckets > len(self.version_games):
+                grow = num_buckets - len(self.version_games)
+                width = self.version_games.shape[1]
+                self.version_games = np.vstack([self.version_games, np.zeros((grow, width), dtype=np.int64)])
+                self.version_wins = np.vstack([self.version_wins, np.zeros((grow, width), dtype=np.int64)])
+                self.version_scores = np.vstack([self.version_scores, np.zeros((grow, width), dtype=np.int64)])
+            index = (rows[:, 0], rows[:, 1])
+            np.add.at(self.version_games, index, 1)
+            np.add.at(self.version_wins, index, rows[:, 2])
+            np.add.at(self.version_scores, index, rows[:, 3])
+
+        if self.challenge_rows:
+            rows = np.array(self.challenge_rows, dtype=np.int64)
+            self.challenge_rows = []
+            np.add.at(self.hand_challenges, (rows[:, 0], rows[:, 1], rows[:, 2]), 1)
+
+        if self.decision_rows:
+            rows = np.array(self.decision_rows, dtype=np.int64)
+            self.decision_rows = []
+            np.add.at(self.decisions, (rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]), 1)
+
+
+    def fit_challenge(self, params=DEFAULT_PARAMS) -> dict:
+        """
+        自分のチャレンジの結果から、チャレンジの閾値を求める
+        手札枚数の区切りごとに、区切りの上下それぞれでチャレンジの損得の合計が最大になるpの下限を選び、
+        損得の合計が最大になる区切りを返す
+        チャレンジしなかった判断の結果は分からないため、pの下限は現在の閾値より下げられない(下げる場合はtuner.pyで探索する)
+
+        Args:
+            params (StrategyParams): 現在の閾値(結果のない枠で使う)
+        Returns:
+            dict: {'challenge_hand_size', 'challenge_p_large', 'challenge_p_small', 'gain': 損得の合計, 'samples': チャレンジした数}
+        """
+        challenged = self.decisions[:, :, 1, :] # [手札枚数, pの区間, 成功したか]
+        gain_table = challenged[:, :, 1] * CHALLENGE_GAIN_SUCCESS + challenged[:, :, 0] * CHALLENGE_GAIN_FAILURE
+        edges = np.arange(P_BINS) / P_BINS
+
+        def best_threshold(gains, default):
+            if not gains.any():
+                return default, 0
+            # 高いpの区間から累積し、累積が最大になる区間のうち最も高い区間の下端を下限とする
+            # (チャレンジのない低い区間は累積が変わらず最大と並ぶため、最も低い区間を選ぶと下限が0になる)
+            cumulative = np.cumsum(gains[::-1])[::-1]
+            i = len(cumulative) - 1 - int(np.argmax(cumulative[::-1]))
+            if cumulative[i] <= 0:
+                return 1.0, 0
+            # 現在の閾値より下げない
+            lowest = int(np.searchsorted(edges, default, side='right')) - 1
+            if i < lowest:
+                return float(default), int(cumulative[lowest])
+            return float(edges[i]), int(cumulative[i])
+
+        best = None
+        for split in range(1, MAX_HAND + 1):
+            p_large, gain_large = best_threshold(gain_table[split:].sum(axis=0), params.challenge_p_large)
+            p_small, gain_small = best_threshold(gain_table[:split].sum(axis=0), params.challenge_p_small)
+            gain = gain_large + gain_small
+            if best is None or gain > best['gain'] or (gain == best['gain'] and split == params.challenge_hand_size):
+                best = {'challenge_hand_size': split, 'challenge_p_large': p_large, 'challenge_p_small': p_small, 'gain': gain}
+        best['samples'] = int(challenged.sum())
+        return best
+
+
+    def report(self) -> list:
+        """集計結果の一覧"""
+        lines = ['games: {}, me: {}, scores: v2 = {}, v3 = {}'.format(self.num_game, self.me, self.scores[0], self.scores[1])]
+
+        lines.append('win rate / mean score by version per {} games'.format(self.bucket_size))
+        names = STRATEGY_VERSIONS + ['?']
+        for bucket, (games, wins, scores) in enumerate(zip(self.version_games, self.version_wins, self.version_scores)):
+            cells = ['{} {:>4} games {:5.1%} {:+7.1f}'.format(name, n, w / n, s / n) for name, n, w, s in zip(names, games, wins, scores) if n]
+            lines.append('    {:>6}- | {}'.format(bucket * self.bucket_size + 1, ' | '.join(cells)))
+
+        lines.append('challenge_cnt [challenges, successes] / challenged_cnt [draw4, challenged, successes]')
+        for player in sorted(set(self.challenge_cnt) | set(self.challenged_cnt)):
+            lines.append('    {:<20} {} {}'.format(player, self.challenge_cnt.get(player), self.challenged_cnt.get(player)))
+
+        lines.append('challenge success rate by hand size of the before player (own / all)')
+        own = self.hand_challenges[1]
+        total = self.hand_challenges.sum(axis=0)
+        for hand_size in range(MAX_HAND + 1):
+            if total[hand_size].sum():
+                cells = []
+                for counts in (own[hand_size], total[hand_size]):
+                    n = counts.sum()
+                    cells.append('{:5.1%} of {:>5}'.format(counts[1] / n, n) if n else '{:>14}'.format('-'))
+                lines.append('    {:>2}{} | {}'.format(hand_size, '+' if hand_size == MAX_HAND else ' ', ' | '.join(cells)))
+
+        fit = self.fit_challenge()
+        lines.append('fitted challenge thresholds ({} challenges, gain {:+d} cards): challenge_hand_size={}, challenge_p_large={:.2f}, challenge_p_small={:.2f}'.format(
+            fit['samples'], fit['gain'], fit['challenge_hand_size'], fit['challenge_p_large'], fit['challenge_p_small']))
+        return lines
+
+
+def check_fit_challenge() -> None:
+    """fit_challengeが現在の閾値より低い下限を返さないか確認する(デバッグ用 python analytics.py --check)"""
+    params = DEFAULT_PARAMS
+    stats = CorpusStats()
+    stats.decisions[8, 14, 1, 1] = 10
+    stats.decisions[8, 14, 1, 0] = 2
+    stats.decisions[3, 18, 1, 1] = 5
+    stats.decisions[3, 18, 1, 0] = 1
+    fit = stats.fit_challenge(params)
+    assert fit['challenge_p_large'] == max(0.7, params.challenge_p_large), fit
+    assert fit['challenge_p_small'] == max(0.9, params.challenge_p_small), fit
+    assert fit['gain'] == 10 * CHALLENGE_GAIN_SUCCESS + 2 * CHALLENGE_GAIN_FAILURE + 5 * CHALLENGE_GAIN_SUCCESS + 1 * CHALLENGE_GAIN_FAILURE, fit
+    assert fit['samples'] == 18, fit
+
+    # 損をしたチャレンジしかない枠ではチャレンジしない(結果のない枠は現在の閾値のまま)
+    stats = CorpusStats()
+    stats.decisions[8, 14, 1, 0] = 3
+    fit = stats.fit_challenge(params)
+    assert fit['challenge_p_large'] == 1.0 and fit['challenge_p_small'] == params.challenge_p_small, fit
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming statistics over captured matches (see capture.py)')
+    parser.add_argument('paths', action='store', nargs='*', type=str, help='Capture files or directories')
+    parser.add_argument('-b', '--bucket', action='store', type=int, default=100, help='Number of games per row of the version table')
+    parser.add_argument('-c', '--chunk', action='store', type=int, default=CHUNK_ROWS, help='Number of rows reduced at once')
+    parser.add_argument('--check', action='store_true', help='Check the threshold fitting on a small example and exit')
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.check:
+        check_fit_challenge()
+        print('ok')
+        return
+    if not args.paths:
+        parser.error('the following arguments are required: paths')
+
+    start = time.perf_counter()
+    stats = CorpusStats(args.bucket, args.chunk).scan(iter_records(args.paths))
+    for line in stats.report():
+        print(line)
+    print('{:.2f} sec'.format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
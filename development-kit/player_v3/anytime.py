@@ -0,0 +1,192 @@
+import math
+import time
+
+
+"""
+持ち時間を使った手の改善
+
+ディーラーは手番ごとに持ち時間(TIMEOUT_OF_PLAYER)を設けているため、
+ヒューリスティックの答えを初期解とし、締め切りまでプレイアウトで候補手を評価して良い手があれば差し替える
+締め切りは通信の往復時間から求めた安全余裕を持ち時間から差し引いて決める
+"""
+INITIAL_MARGIN = 1.0 # 往復時間を1度も計測していない時の安全余裕(秒)
+MIN_MARGIN = 0.2 # 安全余裕の下限(秒)
+RTT_GAIN = 0.125 # 平滑化往復時間の更新係数
+RTTVAR_GAIN = 0.25 # 往復時間のばらつきの更新係数
+MIN_SAMPLE = 30 # 差し替えを検討するのに必要なプレイアウトの巡回数
+Z_SCORE = 3.0 # 差し替えに必要な得点差(標準誤差の何倍か)
+
+
+class LatencyMonitor:
+    """
+    送信から応答(ack)までの往復時間を記録し、持ち時間から差し引く安全余裕を求める
+    TCPの再送タイムアウトと同様に 平滑化往復時間 + 4 * ばらつき とする
+    """
+    def __init__(self, min_margin: float=MIN_MARGIN, initial_margin: float=INITIAL_MARGIN) -> None:
+        """
+        Args:
+            min_margin (float): 安全余裕の下限(秒)
+            initial_margin (float): 計測前の安全余裕(秒)
+        """
+        self.min_margin = min_margin
+        self.initial_margin = initial_margin
+        self.srtt = None # 平滑化往復時間(秒)
+        self.rttvar = 0.0 # 往復時間のばらつき(秒)
+        self.max_rtt = 0.0 # 最大往復時間(秒)
+        self.num_sample = 0
+
+
+    def record(self, rtt: float) -> None:
+        """
+        往復時間を記録する
+
+        Args:
+            rtt (float): 往復時間(秒)
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += RTTVAR_GAIN * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += RTT_GAIN * (rtt - self.srtt)
+        self.max_rtt = max(self.max_rtt, rtt)
+        self.num_sample += 1
+
+
+    def margin(self) -> float:
+        """
+        持ち時間から差し引く安全余裕
+
+        Returns:
+            float: 秒
+        """
+        if self.srtt is None:
+            return max(self.min_margin, self.initial_margin)
+        return max(self.min_margin, self.srtt + 4 * self.rttvar)
+
+
+class Candidate:
+    """
+    候補手ごとのプレイアウト結果
+    同じ確定化で評価した初期解との得点差(対応のある差)を集計する
+    """
+    def __init__(self, move: any) -> None:
+        self.move = move
+        self.n = 0
+        self.total = 0.0
+        self.total_diff = 0.0
+        self.total_diff_sq = 0.0
+
+
+    def stats(self) -> tuple:
+        """他のプロセスに返すための集計値"""
+        return self.n, self.total, self.total_diff, self.total_diff_sq
+
+
+    def merge(self, n: int, total: float, total_diff: float, total_diff_sq: float) -> None:
+        """他のプロセスで集計した結果を合算する"""
+        self.n += n
+        self.total += total
+        self.total_diff += total_diff
+        self.total_diff_sq += total_diff_sq
+
+
+    def add(self, reward: float, base: float) -> None:
+        diff = reward - base
+        self.n += 1
+        self.total += reward
+        self.total_diff += diff
+        self.total_diff_sq += diff * diff
+
+
+    def mean(self) -> float:
+        return self.total / self.n if self.n else float('-inf')
+
+
+    def gain(self) -> float:
+        """初期解に対する得点差の平均"""
+        return self.total_diff / self.n if self.n else float('-inf')
+
+
+    def stderr(self) -> float:
+        """得点差の平均の標準誤差"""
+        if self.n < 2:
+            return float('inf')
+        var = max(0.0, (self.total_diff_sq - self.total_diff * self.total_diff / self.n) / (self.n - 1))
+        return math.sqrt(var / self.n)
+
+
+def candidate_moves(incumbent: any, moves: list) -> list:
+    """候補手に初期解が含まれない場合は末尾に追加する"""
+    moves = list(moves)
+    if incumbent not in moves:
+        moves.append(incumbent)
+    return moves
+
+
+def evaluate(incumbent: any, moves: list, simulate, deadline: float) -> list:
+    """
+    締め切りまで全ての候補手を同じ確定化でプレイアウトする(共通乱数法)
+    締め切りは1巡ごとに確認するため、超過は最大でもプレイアウト1巡分になる
+
+    Args:
+        incumbent (any): 初期解(ヒューリスティックの答え)
+        moves (list): 候補手(初期解を含まない場合は追加する)
+        simulate (func): simulate(候補手のリスト) -> 同じ確定化で評価した候補手ごとの自分の得点のリスト
+        deadline (float): time.perf_counter()基準の締め切り
+    Returns:
+        list: candidate_moves()の順の候補手ごとの評価
+    """
+    moves = candidate_moves(incumbent, moves)
+    candidates = [Candidate(move) for move in moves]
+    if len(candidates) < 2:
+        return candidates
+
+    base_index = moves.index(incumbent)
+    while time.perf_counter() < deadline:
+        rewards = simulate(moves)
+        base = rewards[base_index]
+        for candidate, reward in zip(candidates, rewards):
+            candidate.add(reward, base)
+    return candidates
+
+
+def decide(incumbent: any, candidates: list, min_sample: int=MIN_SAMPLE, z: float=Z_SCORE) -> any:
+    """
+    初期解より有意に良い手があれば差し替える
+
+    Args:
+        incumbent (any): 初期解
+        candidates (list): 候補手ごとの評価
+        min_sample (int): 差し替えに必要なプレイアウトの巡回数
+        z (float): 差し替えに必要な得点差(標準誤差の何倍か)
+    Returns:
+        any: 選んだ手
+    """
+    base = next(candidate for candidate in candidates if candidate.move == incumbent)
+    if len(candidates) < 2 or base.n < min_sample:
+        return incumbent
+
+    best = max(candidates, key=lambda c: c.gain())
+    # 初期解との得点差が標準誤差のz倍を超える場合のみ差し替える
+    if best.gain() > z * best.stderr():
+        return best.move
+    return incumbent
+
+
+def improve(incumbent: any, moves: list, simulate, deadline: float, min_sample: int=MIN_SAMPLE, z: float=Z_SCORE) -> tuple:
+    """
+    締め切りまで候補手をプレイアウトで評価し(evaluate)、初期解より有意に良い手があれば差し替える(decide)
+
+    Args:
+        incumbent (any): 初期解(ヒューリスティックの答え)
+        moves (list): 候補手(初期解を含まない場合は追加する)
+        simulate (func): simulate(候補手のリスト) -> 同じ確定化で評価した候補手ごとの自分の得点のリスト
+        deadline (float): time.perf_counter()基準の締め切り
+        min_sample (int): 差し替えに必要なプレイアウトの巡回数
+        z (float): 差し替えに必要な得点差(標準誤差の何倍か)
+    Returns:
+        tuple: (選んだ手, 候補手ごとの評価のリスト)
+    """
+    candidates = evaluate(incumbent, moves, simulate, deadline)
+    return decide(incumbent, candidates, min_sample, z), candidates
@@ -0,0 +1,89 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+"""
+asyncioによるSocket通信の実行環境
+
+socketio.AsyncClientのイベントループではSocket通信(ping応答を含む)だけを扱い、
+受信処理と送信の応答処理は1本のスレッドの実行器で受け取った順に実行する
+思考処理が長くかかってもイベントループは止まらないため、engine.ioのpingタイムアウトで切断されない
+"""
+
+
+class AsyncRuntime:
+    """
+    socketio.AsyncClientの受信処理・送信処理を同期関数のまま扱うための実行環境
+    """
+    def __init__(self, sio) -> None:
+        """
+        Args:
+            sio (socketio.AsyncClient): Socketクライアント
+        """
+        self.sio = sio
+        self.loop = None
+        self.send_lock = None # AsyncClient.emitは同時に呼び出せないため送信を直列にする
+        # 受信処理と応答処理を同じスレッドで順に実行し、Agentの状態を排他なしで扱えるようにする
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='agent')
+
+
+    def on(self, event: str):
+        """
+        受信処理を登録するデコレータ(socketio.Client.onと同じ使い方)
+        受信処理は実行器で実行する
+        """
+        def set_handler(handler):
+            async def run_handler(*args):
+                # 受信した順に実行器に積む(呼び出した時点で積まれるため順序は入れ替わらない)
+                await asyncio.get_event_loop().run_in_executor(self.executor, handler, *args)
+
+            self.sio.on(event, run_handler)
+            return handler
+
+        return set_handler
+
+
+    def emit(self, event: str, data: any, callback) -> None:
+        """
+        送信処理(どのスレッドからでも呼び出せる)
+
+        Args:
+            event (str): Socket通信イベント名
+            data (Any): 送信するデータ
+            callback (func): 応答を受け取る処理 callback(err, res) 実行器で実行する
+        """
+        self.loop.call_soon_threadsafe(self.loop.create_task, self.emit_and_wait(event, data, callback))
+
+
+    async def emit_and_wait(self, event: str, data: any, callback) -> None:
+        """
+        送信して応答を待ち、応答処理が終わるまで待つ
+        山札から引く→引いたカードを出すかの判断は、この応答待ちの後に続けて行われる
+        """
+        done = self.loop.create_future()
+
+        def on_ack(*args):
+            # 応答を受け取った時点で実行器に積み、受信イベントとの順序を保つ
+            done.set_result(self.executor.submit(callback, *args))
+
+        async with self.send_lock:
+            await self.sio.emit(event, data, callback=on_ack)
+        await asyncio.wrap_future(await done)
+
+
+    def run(self, url: str, **kwargs) -> None:
+        """
+        接続して切断されるまで待つ
+
+        Args:
+            url (str): 接続先
+            kwargs: AsyncClient.connectの引数
+        """
+        asyncio.get_event_loop().run_until_complete(self.connect_and_wait(url, **kwargs))
+
+
+    async def connect_and_wait(self, url: str, **kwargs) -> None:
+        self.loop = asyncio.get_event_loop()
+        self.send_lock = asyncio.Lock()
+        await self.sio.connect(url, **kwargs)
+        await self.sio.wait()
@@ -0,0 +1,419 @@
+import argparse
+import math
+import sys
+import time
+import numpy as np
+from card import NUM_KINDS_OF_COLOR, NUM_CARD_KINDS, WILD, WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD, NO_COLOR, NO_KIND, PLAYABLE_MASK
+from rollout import CARD_SCORE, DRAW_2_KIND, SKIP_KIND, REVERSE_KIND
+from snapshot import INIT_UNSEEN
+
+
+"""
+多数の対戦をまとめて進めるシミュレータ
+
+独立した4人対戦をB件並べ、全ての対戦の手番を1手ずつ同時に進める
+手札はカードの種類ごとの枚数の行列(B, 4, 56)、山札・捨て札は(B, 56)、場札・手番・向き・引く枚数は(B,)の配列で持つ
+山札から引く処理は山札の枚数の行列から一様に引く(山札をシャッフルして上から引くのと同じ分布)
+方策(Policyクラス)も出せるカードの行列から優先度の最小を選ぶ配列演算で書く
+
+戦略のパラメータを数百万対戦で比べるためのもので、Agentの判断をそのまま再現するものではない
+
+簡略化しているルール(rollout.pyと同じ)
+    チャレンジは行わない
+    白いワイルドは次のプレイヤーが2枚引いてスキップされるものとする
+    UNO宣言漏れの指摘は行わない
+    最初の場札の効果(ドロー2・スキップ・リバース)は無視する
+
+例) python batch.py v3 v0 v3 v0 -n 1000000 -b 20000
+"""
+NUM_SEATS = 4
+MAX_TURN = 1000 # 1対戦の最大手数(超えた場合は勝者なしとして得点を計算する)
+MAX_CARD_OF_PLAYER = 25 # 出せるカードがない場合に引ける手札の上限
+
+_CARD_IDS = np.arange(NUM_CARD_KINDS)
+PLAYABLE = np.array([[mask >> card & 1 for card in range(NUM_CARD_KINDS)] for mask in PLAYABLE_MASK], dtype=bool) # 場札の(色, 種類) -> 出せるカード
+CARD_COLOR_INDEX = np.where(_CARD_IDS < WILD, _CARD_IDS // NUM_KINDS_OF_COLOR, NO_COLOR) # カード -> 色の番号(ワイルド系はNO_COLOR)
+CARD_KIND_INDEX = np.where(_CARD_IDS < WILD, _CARD_IDS % NUM_KINDS_OF_COLOR, NO_KIND) # カード -> 種類(ワイルド系はNO_KIND)
+COLOR_CARDS = (CARD_COLOR_INDEX[:, None] == np.arange(NO_COLOR)[None, :]).astype(np.int16) # (56, 4) カードが各色であるか
+SCORES = np.array(CARD_SCORE, dtype=np.int64)
+INIT_DECK = np.array(INIT_UNSEEN, dtype=np.int16)
+INIT_COLOR_COUNTS = INIT_DECK @ COLOR_CARDS # 色ごとの全体の枚数
+# 最初の場札にできないカード(引き直す)
+NOT_FIRST_CARD = np.isin(_CARD_IDS, [WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD])
+# カードごとに次のプレイヤーが引く枚数
+CARD_PENALTY = np.where(CARD_KIND_INDEX == DRAW_2_KIND, 2, 0)
+CARD_PENALTY[WILD_DRAW_4] = 4
+CARD_PENALTY[WHITE_WILD] = 2
+
+BIG = 1 << 30 # 出せないカードの優先度
+
+
+def _v0_priority() -> np.ndarray:
+    """player_v0のselect_play_cardの順位: 同じ色 or 同じ数字・記号 > ワイルド・シャッフルワイルド・白いワイルド > ワイルドドロー4 (同じ順位はカードの種類の順)"""
+    group = np.where(_CARD_IDS < WILD, 0, np.where(_CARD_IDS == WILD_DRAW_4, 2, 1))
+    return group * NUM_CARD_KINDS + _CARD_IDS
+
+
+V0_PRIORITY = _v0_priority()
+
+# offensive_mode_v3の順位: スキップ・リバース > ドロー2 > 数字(色の優先度順・大きい順) > ワイルド系(WILD_ORDERの順)
+# 優先度 = 分類 * CLASS_WEIGHT + 色の優先度 * RANK_WEIGHT + 分類内の順 * SUB_WEIGHT + カードの種類
+SUB_WEIGHT = 64
+RANK_WEIGHT = SUB_WEIGHT * 16
+CLASS_WEIGHT = RANK_WEIGHT * 4
+WILD_ORDER = [WILD, WHITE_WILD, WILD_DRAW_4, WILD_SHUFFLE]
+
+
+def _v3_priority() -> np.ndarray:
+    """色の優先度を除いたoffensive_mode_v3の優先度"""
+    kinds = CARD_KIND_INDEX
+    group = np.where(_CARD_IDS >= WILD, 3, np.where(kinds < 10, 2, np.where(kinds == DRAW_2_KIND, 1, 0)))
+    sub = np.where(_CARD_IDS >= WILD, 0, np.where(kinds < 10, 9 - kinds, 0))
+    for i, card in enumerate(WILD_ORDER):
+        sub[card] = i
+    return group * CLASS_WEIGHT + sub * SUB_WEIGHT + _CARD_IDS
+
+
+V3_PRIORITY = _v3_priority()
+COLORED = _CARD_IDS < WILD
+# offensive_color_orderで同じ条件の色を並べる順(red, blue, green, yellowの順 色の番号はARR_COLORの順)
+COLOR_DICT_ORDER = np.array([0, 3, 2, 1])
+
+
+class V0Policy:
+    """
+    player_v0の方策: select_play_cardの順位で出し、ワイルドの色は無作為に選ぶ
+    """
+    def select_card(self, sim: any, rows: np.ndarray, hands: np.ndarray, playable: np.ndarray) -> np.ndarray:
+        """
+        出すカードを選ぶ
+
+        Args:
+            sim (BatchSimulator): シミュレータ
+            rows (np.ndarray): 対戦の番号
+            hands (np.ndarray): 手番のプレイヤーの手札(len(rows), 56)
+            playable (np.ndarray): 出せるカード(len(rows), 56)
+        Returns:
+            np.ndarray: 出すカード(出さずに山札から引く場合は-1)
+        """
+        return masked_argmin(np.broadcast_to(V0_PRIORITY, playable.shape), playable)
+
+
+    def select_color(self, sim: any, rows: np.ndarray, hands: np.ndarray) -> np.ndarray:
+        """ワイルド系で指定する色の番号を選ぶ"""
+        return sim.rng.integers(0, NO_COLOR, len(rows))
+
+
+class V3Policy:
+    """
+    player_v3の攻撃モードの方策: offensive_mode_v3の順位で出し、ワイルドの色はoffensive_color_orderの先頭とする
+    """
+    def __init__(self, threshold: int=4) -> None:
+        """
+        Args:
+            threshold (int): 見えていない札がこの枚数以下の色は、手札にあれば先に出す(offensive_color_orderの閾値)
+        """
+        self.threshold = threshold
+
+
+    def color_keys(self, sim: any, rows: np.ndarray, hands: np.ndarray) -> np.ndarray:
+        """
+        offensive_color_orderの並びの比較キー(小さいほど優先)
+
+        Returns:
+            np.ndarray: (len(rows), 4) 色ごとのキー
+        """
+        hand_colors = hands @ COLOR_CARDS
+        unseen = INIT_COLOR_COUNTS - sim.seen_colors(rows) - hand_colors
+        first = (unseen <= self.threshold) & (hand_colors > 0)
+        # 見えていない札が少なく手札にある色(少ない順) > 手札に多い色(同じ枚数は見えていない札が少ない順)
+        later = (1 << 24) + ((256 - hand_colors) << 14)
+        return np.where(first, 0, later) + (np.maximum(unseen, 0) << 4) + COLOR_DICT_ORDER
+
+
+    def select_card(self, sim: any, rows: np.ndarray, hands: np.ndarray, playable: np.ndarray) -> np.ndarray:
+        rank = self.color_keys(sim, rows, hands).argsort(axis=1).argsort(axis=1)
+        priority = V3_PRIORITY + np.where(COLORED, rank[:, CARD_COLOR_INDEX % NO_COLOR] * RANK_WEIGHT, 0)
+        cards = masked_argmin(priority, playable)
+        # 残り3枚以下ではシャッフルワイルドを出さない
+        keep = (cards == WILD_SHUFFLE) & (hands.sum(axis=1) <= 3)
+        cards[keep] = -1
+        return cards
+
+
+    def select_color(self, sim: any, rows: np.ndarray, hands: np.ndarray) -> np.ndarray:
+        return self.color_keys(sim, rows, hands).argmin(axis=1)
+
+
+POLICIES = {
+    'v0': V0Policy,
+    'v3': V3Policy,
+}
+
+
+def masked_argmin(priority: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """行ごとにmaskがTrueの要素のうち優先度が最小の列を返す(Trueがない行は-1)"""
+    cards = np.where(mask, priority, BIG).argmin(axis=1)
+    return np.where(mask.any(axis=1), cards, -1)
+
+
+class BatchSimulator:
+    """
+    B件の4人対戦をまとめて進めるシミュレータ
+    """
+    def __init__(self, policies: list, num_games: int, seed: int=None) -> None:
+        """
+        Args:
+            policies (list): 席ごとの方策(V0Policy, V3Policy)
+            num_games (int): 同時に進める対戦数
+            seed (int): 乱数シード
+        """
+        self.policies = policies
+        # 同じ方策の席をまとめて1回の配列演算で選ぶ
+        self.groups = list({id(policy): policy for policy in policies}.values())
+        self.seat_group = np.array([next(i for i, group in enumerate(self.groups) if group is policy) for policy in policies])
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.hands = np.zeros((num_games, NUM_SEATS, NUM_CARD_KINDS), dtype=np.int16)
+        self.deck = np.tile(INIT_DECK, (num_games, 1))
+        self.discard = np.zeros((num_games, NUM_CARD_KINDS), dtype=np.int16) # 場札より前に出されたカード(山札が無くなったら山札に戻す)
+        self.top_card = np.zeros(num_games, dtype=np.int64)
+        self.top_color = np.zeros(num_games, dtype=np.int64)
+        self.top_kind = np.zeros(num_games, dtype=np.int64)
+        self.seat = self.rng.integers(0, NUM_SEATS, num_games)
+        self.step = np.ones(num_games, dtype=np.int64)
+        self.pending = np.zeros(num_games, dtype=np.int64) # 手番のプレイヤーが引く枚数(引いたら手番を終える)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.scores = np.zeros((num_games, NUM_SEATS), dtype=np.int64)
+        self.turns = 0
+        self.deal()
+
+
+    def deal(self) -> None:
+        """7枚ずつ配り、最初の場札を出す"""
+        rows = np.arange(self.num_games)
+        for i in range(7 * NUM_SEATS):
+            cards = self.draw(rows)
+            self.hands[rows, i % NUM_SEATS, cards] += 1
+
+        cards = self.draw(rows)
+        redraw = NOT_FIRST_CARD[cards]
+        while redraw.any():
+            # ワイルドドロー4・シャッフルワイルド・白いワイルドは山札に戻して引き直す
+            again = rows[redraw]
+            self.deck[again, cards[redraw]] += 1
+            cards[redraw] = self.draw(again)
+            redraw = NOT_FIRST_CARD[cards]
+        self.top_card[:] = cards
+        self.top_color[:] = np.where(cards == WILD, self.rng.integers(0, NO_COLOR, self.num_games), CARD_COLOR_INDEX[cards])
+        self.top_kind[:] = CARD_KIND_INDEX[cards]
+
+
+    def draw(self, rows: np.ndarray) -> np.ndarray:
+        """
+        対戦ごとに山札から1枚ずつ引く(山札が無い対戦は捨て札を山札に戻してから引く)
+
+        Args:
+            rows (np.ndarray): 対戦の番号(重複なし)
+        Returns:
+            np.ndarray: 引いたカード(山札も捨て札も無い場合は-1)
+        """
+        counts = self.deck[rows].cumsum(axis=1, dtype=np.int16)
+        empty = counts[:, -1] == 0
+        if empty.any():
+            refill = rows[empty]
+            self.deck[refill] += self.discard[refill]
+            self.discard[refill] = 0
+            counts[empty] = self.deck[refill].cumsum(axis=1, dtype=np.int16)
+        totals = counts[:, -1]
+        r = (self.rng.random(len(rows)) * totals).astype(np.int64)
+        cards = (counts <= r[:, None]).sum(axis=1)
+        has = totals > 0
+        self.deck[rows[has], cards[has]] -= 1
+        return np.where(has, cards, -1)
+
+
+    def give(self, rows: np.ndarray, seats: np.ndarray) -> np.ndarray:
+        """対戦ごとに指定した席のプレイヤーが山札から1枚引く"""
+        cards = self.draw(rows)
+        has = cards >= 0
+        self.hands[rows[has], seats[has], cards[has]] += 1
+        return cards
+
+
+    def seen_colors(self, rows: np.ndarray) -> np.ndarray:
+        """場札と捨て札の色ごとの枚数(全員から見えている札)"""
+        seen = self.discard[rows] @ COLOR_CARDS
+        top_color = CARD_COLOR_INDEX[self.top_card[rows]]
+        colored = top_color < NO_COLOR
+        seen[np.flatnonzero(colored), top_color[colored]] += 1
+        return seen
+
+
+    def run(self, max_turn: int=MAX_TURN) -> np.ndarray:
+        """
+        全ての対戦が終わるまで進める
+
+        Args:
+            max_turn (int): 最大手数
+        Returns:
+            np.ndarray: (B, 4) 席ごとの得点
+        """
+        while self.turns < max_turn:
+            rows = np.flatnonzero(~self.done)
+            if len(rows) == 0:
+                break
+            self.play_turn(rows)
+            self.turns += 1
+
+        # 手数の上限に達した対戦は勝者なし
+        rows = np.flatnonzero(~self.done)
+        if len(rows):
+            self.scores[rows] = -(self.hands[rows] @ SCORES)
+            self.done[rows] = True
+        return self.scores
+
+
+    def play_turn(self, rows: np.ndarray) -> None:
+        """終わっていない対戦の手番を1手ずつ進める"""
+        seat = self.seat[rows]
+        step = self.step[rows]
+
+        # ドロー系のカードを出された手番は引いて終わる
+        pending = self.pending[rows]
+        forced = pending > 0
+        if forced.any():
+            forced_rows = rows[forced]
+            forced_seat = seat[forced]
+            forced_pending = pending[forced]
+            for k in range(int(forced_pending.max())):
+                more = forced_pending > k
+                self.give(forced_rows[more], forced_seat[more])
+            self.pending[forced_rows] = 0
+            self.seat[forced_rows] = (forced_seat + step[forced]) % NUM_SEATS
+            rows = rows[~forced]
+            seat = seat[~forced]
+            step = step[~forced]
+            if len(rows) == 0:
+                return
+
+        hands = self.hands[rows, seat]
+        top_key = self.top_color[rows] * (NO_KIND + 1) + self.top_kind[rows]
+        playable = (hands > 0) & PLAYABLE[top_key]
+        group = self.seat_group[seat]
+
+        cards = np.full(len(rows), -1)
+        for i, policy in enumerate(self.groups):
+            mine = np.flatnonzero(group == i)
+            if len(mine):
+                cards[mine] = policy.select_card(self, rows[mine], hands[mine], playable[mine])
+
+        # 出さない場合は1枚引き、出せるならそのまま出す
+        draw = np.flatnonzero((cards < 0) & (hands.sum(axis=1) < MAX_CARD_OF_PLAYER))
+        if len(draw):
+            drawn = self.give(rows[draw], seat[draw])
+            has = drawn >= 0
+            hands[draw[has], drawn[has]] += 1
+            ok = has & PLAYABLE[top_key[draw], np.maximum(drawn, 0)]
+            cards[draw[ok]] = drawn[ok]
+
+        play = cards >= 0
+        self.seat[rows[~play]] = (seat[~play] + step[~play]) % NUM_SEATS
+        if not play.any():
+            return
+        self.play(rows[play], seat[play], step[play], cards[play], hands[play], group[play])
+
+
+    def play(self, rows: np.ndarray, seat: np.ndarray, step: np.ndarray, cards: np.ndarray, hands: np.ndarray, group: np.ndarray) -> None:
+        """カードを出し、効果を適用して手番を進める"""
+        colors = CARD_COLOR_INDEX[cards]
+        wild = np.flatnonzero((cards >= WILD) & (cards != WHITE_WILD))
+        if len(wild):
+            for i, policy in enumerate(self.groups):
+                mine = wild[group[wild] == i]
+                if len(mine):
+                    colors[mine] = policy.select_color(self, rows[mine], hands[mine])
+        white = cards == WHITE_WILD
+        colors[white] = self.top_color[rows[white]] # 白いワイルドは場札の色のまま
+
+        self.hands[rows, seat, cards] -= 1
+        self.discard[rows, self.top_card[rows]] += 1
+        self.top_card[rows] = cards
+        self.top_color[rows] = colors
+        kinds = CARD_KIND_INDEX[cards]
+        self.top_kind[rows] = kinds
+
+        step = np.where(kinds == REVERSE_KIND, -step, step)
+        self.step[rows] = step
+        penalty = CARD_PENALTY[cards]
+        self.pending[rows] = penalty
+        # ドロー系は次のプレイヤーが引く手番で飛ばすため、ここではスキップのみ2つ進める
+        self.seat[rows] = (seat + step * np.where(kinds == SKIP_KIND, 2, 1)) % NUM_SEATS
+
+        for i in np.flatnonzero(cards == WILD_SHUFFLE):
+            self.shuffle_hands(rows[i], seat[i], step[i])
+
+        # 上がり
+        finished = self.hands[rows, seat].sum(axis=1) == 0
+        if finished.any():
+            done_rows = rows[finished]
+            scores = -(self.hands[done_rows] @ SCORES)
+            scores[np.arange(len(done_rows)), seat[finished]] = -scores.sum(axis=1)
+            self.scores[done_rows] = scores
+            self.done[done_rows] = True
+
+
+    def shuffle_hands(self, row: int, seat: int, step: int) -> None:
+        """シャッフルワイルドによる手札の再配布(次のプレイヤーから順に1枚ずつ配る)"""
+        hands = self.hands[row]
+        cards = np.repeat(_CARD_IDS, hands.sum(axis=0))
+        self.rng.shuffle(cards)
+        hands[:] = 0
+        order = (seat + step * np.arange(1, NUM_SEATS + 1)) % NUM_SEATS
+        for i, target in enumerate(order):
+            np.add.at(hands[target], cards[i::NUM_SEATS], 1)
+
+
+def parse_policy(name: str, threshold: int) -> any:
+    """方策の名前から方策を作る"""
+    if name == 'v3':
+        return V3Policy(threshold)
+    return POLICIES[name]()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batched self-play of simple policies')
+    parser.add_argument('policies', action='store', nargs=NUM_SEATS, type=str, choices=list(POLICIES), help='Policy of each seat')
+    parser.add_argument('-n', '--games', action='store', type=int, default=100000, help='Number of games')
+    parser.add_argument('-b', '--batch', action='store', type=int, default=10000, help='Number of games advanced together')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=0, help='Random seed')
+    parser.add_argument('--threshold', action='store', type=int, nargs='+', default=[4], help='Threshold of offensive_color_order for v3 (several values to sweep)')
+    args = parser.parse_args(sys.argv[1:])
+
+    for threshold in args.threshold:
+        policies = [parse_policy(name, threshold) for name in args.policies]
+        totals = np.zeros(NUM_SEATS)
+        squares = np.zeros(NUM_SEATS)
+        wins = np.zeros(NUM_SEATS)
+        num_games = 0
+        batch = 0
+        start = time.perf_counter()
+        while num_games < args.games:
+            n = min(args.batch, args.games - num_games)
+            scores = BatchSimulator(policies, n, seed=args.seed * 1000003 + batch).run()
+            totals += scores.sum(axis=0)
+            squares += (scores.astype(np.float64) ** 2).sum(axis=0)
+            wins += (scores > 0).sum(axis=0)
+            num_games += n
+            batch += 1
+        elapsed = time.perf_counter() - start
+
+        print('threshold: {}, games: {}, {:.1f} sec ({:,.0f} games/sec)'.format(threshold, num_games, elapsed, num_games / elapsed))
+        for seat, name in enumerate(args.policies):
+            mean = totals[seat] / num_games
+            stderr = math.sqrt(max(squares[seat] / num_games - mean ** 2, 0) / num_games)
+            print('    seat {} {}: score {:8.2f} ± {:5.2f} / win {:.3f}'.format(seat, name, mean, stderr, wins[seat] / num_games))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from consts import SocketConst
+
+
+"""
+受信イベント・送信の記録(分析用)
+
+player_v3.pyの受信イベント・送信・応答をそのままの内容で、圧縮したJSONLファイルに追記する
+受信処理では内容をJSONの文字列にしてキューに入れるだけにし、圧縮・書き出しは別スレッドで行う
+(受信した内容はAgentの処理で書き換えられることがあるため(Status.set_top_colorなど)、JSONへの変換は呼び出し元で行う)
+ファイルが一定の大きさ(圧縮前)を超えたら、対戦の区切り(finish-turn)で次のファイルに切り替える
+記録したファイルはanalytics.pyで集計する
+
+1行の形式
+    {"t": 記録開始からの秒数, "k": 種類, "e": イベント名, "d": 内容}
+    種類: recv(受信イベント), send(送信), ack(送信の応答), err(送信のエラー応答), note(Agentの判断材料など受信・送信以外の記録)
+
+例) python player_v3.py http://localhost:8080 "Dealer 1" "Player 1" --capture captures/
+    python analytics.py captures/
+"""
+MAX_FILE_BYTES = 64 * 1024 * 1024 # 1ファイルあたりの大きさの目安(圧縮前)
+FILE_SUFFIX = '.jsonl.gz'
+
+# 記録の種類
+RECV = 'recv'
+SEND = 'send'
+ACK = 'ack'
+ERR = 'err'
+NOTE = 'note'
+
+
+class Capture:
+    """
+    受信イベント・送信を圧縮したJSONLファイルに記録する(どのスレッドからでも呼び出せる)
+    """
+    def __init__(self, directory: str, max_bytes: int=MAX_FILE_BYTES, prefix: str='capture') -> None:
+        """
+        Args:
+            directory (str): 記録するディレクトリ
+            max_bytes (int): 1ファイルあたりの大きさの目安(圧縮前) 超えたら対戦の区切りで次のファイルにする
+            prefix (str): ファイル名の先頭(ファイル名は<prefix>-<開始日時>-<通し番号>.jsonl.gz)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = '{}-{}'.format(prefix, time.strftime('%Y%m%d-%H%M%S'))
+        self.start = time.perf_counter()
+        self.queue = queue.Queue()
+        self.file = None
+        self.file_no = 0
+        self.file_bytes = 0
+        self.paths = [] # 書き出したファイル
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+
+    def record(self, kind: str, event: str, data: any) -> None:
+        """
+        1件記録する(書き出しは待たない)
+
+        Args:
+            kind (str): RECV, SEND, ACK, ERR, NOTE
+            event (str): Socket通信イベント名(NOTEの場合は記録の名前)
+            data (any): 内容(JSONに変換できる値)
+        """
+        line = json.dumps({'t': round(time.perf_counter() - self.start, 6), 'k': kind, 'e': event, 'd': data}, ensure_ascii=False, separators=(',', ':'))
+        self.queue.put((kind, event, line))
+
+
+    def open_next(self) -> None:
+        """次のファイルを開く"""
+        if self.file is not None:
+            self.file.close()
+        self.file_no += 1
+        path = os.path.join(self.directory, '{}-{:04d}{}'.format(self.name, self.file_no, FILE_SUFFIX))
+        self.file = gzip.open(path, 'wb', compresslevel=6)
+        self.file_bytes = 0
+        self.paths.append(path)
+
+
+    def write_loop(self) -> None:
+        """書き出しスレッド"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            kind, event, line = item
+            line = (line + '\n').encode('utf-8')
+            if self.file is None:
+                self.open_next()
+            self.file.write(line)
+            self.file_bytes += len(line)
+            if kind == RECV and event == SocketConst.EMIT.FINISH_TURN and self.file_bytes >= self.max_bytes:
+                self.open_next()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+    def close(self) -> None:
+        """残りの記録を書き出してファイルを閉じる"""
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,147 @@
+from consts import Color, Special, ARR_COLOR
+
+
+"""
+カードの整数表現
+
+手札・公開手札・戦略内のカードのリストはdictではなく0〜55の整数(カードの種類)で扱う
+dictとの変換はディーラーとの送受信の境界(Agent)でのみ行う
+
+    色ごとに13種類 (ARR_COLORの順)
+        色 * 13 + 0〜9   : 数字カード
+        色 * 13 + 10〜12 : ドロー2・スキップ・リバース
+    52 : ワイルド
+    53 : ワイルドドロー4
+    54 : シャッフルワイルド
+    55 : 白いワイルド
+
+場札はワイルドの指定色を持つため、dictのまま扱う
+"""
+COLOR_SPECIALS = [Special.DRAW_2, Special.SKIP, Special.REVERSE] # 色を持つ記号カード
+NUM_KINDS_OF_COLOR = 13 # 1色あたりのカードの種類数
+
+WILD = 52 # ワイルド
+WILD_DRAW_4 = 53 # ワイルドドロー4
+WILD_SHUFFLE = 54 # シャッフルワイルド
+WHITE_WILD = 55 # 白いワイルド
+NUM_CARD_KINDS = 56 # カードの種類数
+
+ARR_WILD = [WILD, WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD] # 場札に関係なく出せるカード
+NO_COLOR = len(ARR_COLOR) # 場札の色が4色以外(黒・白)の場合の色番号
+NO_KIND = NUM_KINDS_OF_COLOR # 場札がワイルド系の場合の種類番号
+
+
+def _build_tables() -> tuple:
+    """カードの種類ごとの色・数字・記号の対応表を作成する"""
+    colors = []
+    numbers = []
+    specials = []
+    for color in ARR_COLOR:
+        for number in range(10):
+            colors.append(color)
+            numbers.append(number)
+            specials.append(None)
+        for special in COLOR_SPECIALS:
+            colors.append(color)
+            numbers.append(None)
+            specials.append(special)
+    for color, special in [
+        (Color.BLACK, Special.WILD),
+        (Color.BLACK, Special.WILD_DRAW_4),
+        (Color.BLACK, Special.WILD_SHUFFLE),
+        (Color.WHITE, Special.WHITE_WILD),
+    ]:
+        colors.append(color)
+        numbers.append(None)
+        specials.append(special)
+
+    return tuple(colors), tuple(numbers), tuple(specials)
+
+
+CARD_COLOR, CARD_NUMBER, CARD_SPECIAL = _build_tables() # カードの種類 -> 色, 数字(記号カードはNone), 記号(数字カードはNone)
+# カードの種類 -> cards_statusのキー (色, 数字 or 記号)
+CARD_KEY = tuple(
+    (CARD_COLOR[card], CARD_SPECIAL[card] if CARD_NUMBER[card] is None else str(CARD_NUMBER[card]))
+    for card in range(NUM_CARD_KINDS)
+)
+_COLOR_INDEX = {color: i for i, color in enumerate(ARR_COLOR)}
+_SPECIAL_INDEX = {special: i for i, special in enumerate(COLOR_SPECIALS)}
+_WILD_ID = {Special.WILD: WILD, Special.WILD_DRAW_4: WILD_DRAW_4, Special.WILD_SHUFFLE: WILD_SHUFFLE, Special.WHITE_WILD: WHITE_WILD}
+
+
+def _build_playable_mask() -> tuple:
+    """場札の(色番号, 種類)ごとに、出せるカードの種類のビットマスクを作成する"""
+    masks = []
+    for color in range(NO_COLOR + 1):
+        for kind in range(NO_KIND + 1):
+            mask = 0
+            for card in range(NUM_CARD_KINDS):
+                if card in ARR_WILD or card // NUM_KINDS_OF_COLOR == color or card % NUM_KINDS_OF_COLOR == kind:
+                    mask |= 1 << card
+            masks.append(mask)
+    return tuple(masks)
+
+
+# top_key(場札) -> 出せるカードの種類のビットマスク (カードcardが出せる <=> mask >> card & 1)
+PLAYABLE_MASK = _build_playable_mask()
+
+
+def top_key(card: dict) -> int:
+    """
+    場札のdictをPLAYABLE_MASKの添字に変換する
+
+    Args:
+        card (dict): 場札のカード
+    Returns:
+        int: 色番号 * 14 + 種類 (4色以外の色はNO_COLOR、ワイルド系はNO_KIND)
+    """
+    color = _COLOR_INDEX.get(card.get('color'), NO_COLOR)
+    number = card.get('number')
+    if number is not None:
+        kind = int(number)
+    else:
+        special = card.get('special')
+        kind = 10 + _SPECIAL_INDEX[special] if special in _SPECIAL_INDEX else NO_KIND
+    return color * (NO_KIND + 1) + kind
+
+
+def encode(card: dict) -> int:
+    """
+    dictのカードを整数に変換する
+    ワイルド系のカードは指定された色に関係なく同じ値になる
+
+    Args:
+        card (dict): {'color': str, 'number': int} or {'color': str, 'special': str}
+    Returns:
+        int: カードの種類
+    """
+    special = card.get('special')
+    if special is None:
+        return _COLOR_INDEX[card['color']] * NUM_KINDS_OF_COLOR + int(card['number'])
+    if special in _WILD_ID:
+        return _WILD_ID[special]
+    return _COLOR_INDEX[card['color']] * NUM_KINDS_OF_COLOR + 10 + _SPECIAL_INDEX[special]
+
+
+def decode(card: int) -> dict:
+    """
+    整数のカードをディーラーに送信する形式のdictに変換する
+
+    Args:
+        card (int): カードの種類
+    Returns:
+        dict:
+    """
+    if CARD_NUMBER[card] is None:
+        return {'color': CARD_COLOR[card], 'special': CARD_SPECIAL[card]}
+    return {'color': CARD_COLOR[card], 'number': CARD_NUMBER[card]}
+
+
+def encode_cards(cards: list) -> list:
+    """dictのカードのリストを整数のリストに変換する"""
+    return [encode(card) for card in cards]
+
+
+def decode_cards(cards: list) -> list:
+    """整数のカードのリストをdictのリストに変換する"""
+    return [decode(card) for card in cards]
@@ -0,0 +1,1287 @@
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from consts import SocketConst, Color, Special, DrawReason, ARR_COLOR
+from strategy import pass_func
+
+
+"""
+定数(ディーラープログラムの設定値に合わせる)
+"""
+MAX_PLAYER = 4 # 参加人数
+CARD_DEAL = 7 # 対戦開始時に配る手札の枚数
+MAX_CARD_OF_PLAYER = 25 # 手札の最大枚数
+CARD_PUNISH = 2 # ペナルティ発生時に引くカードの枚数
+CARD_DRAW_CHALLENGE_SUCCESSFULLY = 4 # チャレンジ成功時にワイルドドロー4を出したプレイヤーが引く枚数
+CARD_DRAW_CHALLENGE_FAILED = 6 # チャレンジ失敗時にチャレンジしたプレイヤーが引く枚数
+NO_PLAY_MAX_LAP = 10 # 盤面に変化がない状態の継続ターン数
+WHITE_WILD_BIND_2 = 'bind_2' # バインド2
+WHITE_WILD_SKIP_BIND_2 = 'skip_bind_2' # スキップバインド2
+
+# 手札の並び順
+SORT_ORDER = [Color.YELLOW, Color.GREEN, Color.BLUE, Color.RED, Color.BLACK, Color.WHITE]
+# 場札の色に関係なく出せる記号カードの種類
+ARR_WILD_SPECIAL = [Special.WILD, Special.WILD_DRAW_4, Special.WILD_SHUFFLE, Special.WHITE_WILD]
+# カードごとの点数
+SCORE = {
+    0: 0, 1: 1, 2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7, 8: 8, 9: 9,
+    Special.SKIP: 20, Special.REVERSE: 20, Special.DRAW_2: 20,
+    Special.WILD: 50, Special.WILD_DRAW_4: 50, Special.WILD_SHUFFLE: 40, Special.WHITE_WILD: 40,
+}
+
+# イベントごとに呼び出すプレイヤー側の処理
+HANDLERS = {
+    SocketConst.EMIT.RECEIVER_CARD: 'on_reciever_card',
+    SocketConst.EMIT.FIRST_PLAYER: 'on_first_player',
+    SocketConst.EMIT.COLOR_OF_WILD: 'on_color_of_wild',
+    SocketConst.EMIT.UPDATE_COLOR: 'on_update_color',
+    SocketConst.EMIT.SHUFFLE_WILD: 'on_shuffle_wild',
+    SocketConst.EMIT.NEXT_PLAYER: 'on_next_player',
+    SocketConst.EMIT.PLAY_CARD: 'on_play_card',
+    SocketConst.EMIT.DRAW_CARD: 'on_draw_card',
+    SocketConst.EMIT.PLAY_DRAW_CARD: 'on_play_draw_card',
+    SocketConst.EMIT.CHALLENGE: 'on_challenge',
+    SocketConst.EMIT.PUBLIC_CARD: 'on_public_card',
+    SocketConst.EMIT.POINTED_NOT_SAY_UNO: 'on_pointed_not_say_uno',
+    SocketConst.EMIT.FINISH_TURN: 'on_finish_turn',
+    SocketConst.EMIT.FINISH_GAME: 'on_finish_game',
+    SocketConst.EMIT.PENALTY: 'on_penalty',
+}
+
+
+def create_deck(use_white_wild: bool=True) -> list:
+    """
+    山札を生成する
+
+    Args:
+        use_white_wild (bool): 白いワイルドを含めるか
+    Returns:
+        list: 112枚(白いワイルドなしの場合は109枚)のカード
+    """
+    cards = []
+    for color in ARR_COLOR:
+        cards.append({'color': color, 'number': 0})
+        for _ in range(2):
+            for number in range(1, 10):
+                cards.append({'color': color, 'number': number})
+            for special in [Special.SKIP, Special.REVERSE, Special.DRAW_2]:
+                cards.append({'color': color, 'special': special})
+    for _ in range(4):
+        cards.append({'color': Color.BLACK, 'special': Special.WILD})
+        cards.append({'color': Color.BLACK, 'special': Special.WILD_DRAW_4})
+    cards.append({'color': Color.BLACK, 'special': Special.WILD_SHUFFLE})
+    if use_white_wild:
+        for _ in range(3):
+            cards.append({'color': Color.WHITE, 'special': Special.WHITE_WILD})
+
+    return cards
+
+
+def sort_cards(cards: list) -> list:
+    """ディーラーと同じ並び順で手札を整列する"""
+    return sorted(cards, key=lambda card: (
+        SORT_ORDER.index(card.get('color')) if card.get('color') in SORT_ORDER else len(SORT_ORDER),
+        card.get('number') is None,
+        card.get('number') or 0,
+        card.get('special') or '',
+    ))
+
+
+def is_valid_card(card: dict) -> bool:
+    """存在するカードであるかを判定する"""
+    if not isinstance(card, dict):
+        return False
+    color = card.get('color')
+    number = card.get('number')
+    special = card.get('special')
+    if number is not None:
+        return color in ARR_COLOR and number in range(10) and special is None
+    if special in [Special.SKIP, Special.REVERSE, Special.DRAW_2]:
+        return color in ARR_COLOR
+    if special in [Special.WILD, Special.WILD_DRAW_4, Special.WILD_SHUFFLE]:
+        return color == Color.BLACK
+    if special == Special.WHITE_WILD:
+        return color == Color.WHITE
+    return False
+
+
+def is_same_card(card_a: dict, card_b: dict) -> bool:
+    """色と数字(記号)が一致するかを判定する"""
+    if card_a.get('special'):
+        return card_a.get('color') == card_b.get('color') and card_a.get('special') == card_b.get('special')
+    return card_a.get('color') == card_b.get('color') and card_a.get('number') == card_b.get('number')
+
+
+def is_available_card(card_play: dict, card_before: dict, card_add_on: int) -> bool:
+    """
+    場に出せるカードであるかを判定する
+
+    Args:
+        card_play (dict): 出したカード
+        card_before (dict): 場札のカード
+        card_add_on (int): 引かないといけないカードの枚数
+    Returns:
+        bool:
+    """
+    if card_add_on > 0:
+        return False
+    if card_play.get('special') in ARR_WILD_SPECIAL:
+        return True
+    if card_play.get('special') and card_play.get('special') == card_before.get('special'):
+        return True
+    if card_play.get('color') == card_before.get('color'):
+        return True
+    if card_play.get('number') is not None and card_play.get('number') == card_before.get('number'):
+        return True
+    return False
+
+
+def is_challenge_successfully(card: dict, cards: list) -> bool:
+    """
+    チャレンジが成功するかを判定する
+
+    Args:
+        card (dict): ワイルドドロー4を出す前の場札
+        cards (list): ワイルドドロー4を出したプレイヤーの手札
+    Returns:
+        bool:
+    """
+    for card_validate in cards:
+        if card_validate.get('special') in [Special.WILD, Special.WILD_SHUFFLE]:
+            return True
+        if card_validate.get('color') == card.get('color'):
+            return True
+        if card.get('special') in [Special.DRAW_2, Special.REVERSE, Special.SKIP] and card.get('special') == card_validate.get('special'):
+            return True
+        if card_validate.get('number') is not None and card_validate.get('number') == card.get('number'):
+            return True
+    return False
+
+
+def remove_card(card_play: dict, cards: list) -> list:
+    """手札から出したカードを1枚だけ取り除く"""
+    for i, card in enumerate(cards):
+        if is_same_card(card_play, card):
+            return cards[:i] + cards[i + 1:]
+    return list(cards)
+
+
+def card_score(card: dict) -> int:
+    """カードの点数を返す"""
+    if card.get('special'):
+        return SCORE[card['special']]
+    return SCORE[card['number']]
+
+
+# 受け取り側が書き換える送信データの値(イベントごと) これ以外の値は全員に同じものを渡す
+#   card_play, first_card: 場札として記録され、ワイルドの色指定で色が書き換えられる(Status.set_top_color)
+#   cards_receive, card_of_player, cards, draw_card: 旧バージョンなどが手札・公開カードとしてそのまま持ち、追加・削除する
+MUTABLE_KEYS = {
+    SocketConst.EMIT.RECEIVER_CARD: ('cards_receive',),
+    SocketConst.EMIT.SHUFFLE_WILD: ('cards_receive',),
+    SocketConst.EMIT.FIRST_PLAYER: ('first_card',),
+    SocketConst.EMIT.NEXT_PLAYER: ('card_of_player',),
+    SocketConst.EMIT.PLAY_CARD: ('card_play',),
+    SocketConst.EMIT.PLAY_DRAW_CARD: ('card_play',),
+    SocketConst.EMIT.PUBLIC_CARD: ('cards',),
+}
+MUTABLE_ACK_KEYS = ('card_play', 'draw_card') # 送信の処理結果
+
+
+def clone(data: any, keys: tuple) -> any:
+    """
+    送信データの複製(受け取り側で書き換えられても盤面や他のプレイヤーに影響しないようにする)
+    受け取り側が書き換える値だけを複製する(リストの中のカードは書き換えられないため複製しない)
+
+    Args:
+        data (any): 送信データ
+        keys (tuple): 複製する値のキー
+    Returns:
+        any: 書き換える値がなければdataそのもの
+    """
+    if not keys or not isinstance(data, dict):
+        return data
+    copied = None
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, (dict, list)):
+            if copied is None:
+                copied = dict(data)
+            copied[key] = value.copy()
+    return data if copied is None else copied
+
+
+class Engine:
+    """
+    ディーラープログラムの代わりに対戦を進行する疑似ディーラー
+    Socket通信を使わずに、同一プロセス内のプレイヤー(Agent)同士で試合を行う
+
+    ディーラーからの送信は全て順番に配送し、配送待ちがなくなってからプレイヤーからの送信を1件ずつ処理する
+    どちらもなくなった場合は、手番のプレイヤーがタイムアウトしたものとして扱う
+    """
+    def __init__(self, agents: list, total_turn: int=1000, white_wild: str=WHITE_WILD_BIND_2, seed: int=None, raise_error: bool=True) -> None:
+        """
+        Args:
+            agents (list): プレイヤーのリスト(受信イベントごとの処理とsend_event, join_room_callbackを持つこと)
+            total_turn (int): 総対戦数
+            white_wild (str): 白いワイルドの種類(Noneの場合は白いワイルドなし)
+            seed (int): 乱数シード
+            raise_error (bool): プレイヤー側の処理で発生した例外を送出するか(Falseの場合は応答なしとして扱う)
+        """
+        self.rng = random.Random(seed)
+        self.raise_error = raise_error
+        self.total_turn = total_turn
+        self.white_wild = white_wild
+        self.members = ['player_{}'.format(i) for i in range(len(agents))]
+        self.agents = dict(zip(self.members, agents))
+
+        self.events = deque() # プレイヤーへの配送待ち (player, event, data) or (None, callback, data)
+        self.requests = deque() # ディーラーの処理待ち (turn, player, event, data, callback)
+
+        self.turn = 0
+        self.finished = False
+        self.order = {player: 0 for player in self.members}
+        self.score = {player: 0 for player in self.members}
+        self.score_history = {player: [] for player in self.members}
+        self.winner = None
+        self.num_timeout = 0
+        self.num_penalty = 0
+        self.num_error = 0
+
+        for player, agent in self.agents.items():
+            agent.send_event = self.create_sender(player)
+            agent.join_room_callback({'room_name': 'engine', 'player': player, 'your_id': player})
+
+
+    def create_sender(self, player: str):
+        """プレイヤーごとの送信関数を生成する"""
+        def send_event(event, data, callback=pass_func):
+            self.requests.append((self.turn, player, event, data, callback))
+        return send_event
+
+
+    def run(self) -> dict:
+        """
+        試合を最後まで進行する
+
+        Returns:
+            dict: {'winner': 優勝者, 'order': 勝数, 'score': 得点}
+        """
+        self.start_turn()
+        while self.events or self.requests or not self.finished:
+            if self.events:
+                self.deliver(*self.events.popleft())
+            elif self.requests:
+                turn, player, event, data, callback = self.requests.popleft()
+                if self.finished or turn != self.turn:
+                    # 終了した対戦に対する送信は処理しない
+                    continue
+                self.receive(player, event, data, callback)
+            else:
+                self.timeout()
+
+        return {'winner': self.winner, 'order': dict(self.order), 'score': dict(self.score)}
+
+
+    """
+    配送
+    """
+    def send(self, player: str, event: str, data: dict) -> None:
+        """特定のプレイヤーに送信する"""
+        self.events.append((player, event, data))
+
+
+    def broadcast(self, event: str, data: dict) -> None:
+        """全プレイヤーに送信する"""
+        for player in self.members:
+            self.events.append((player, event, data))
+
+
+    def ack(self, callback, data: any) -> None:
+        """送信元のプレイヤーに処理結果を返却する"""
+        self.events.append((None, callback, data))
+
+
+    def deliver(self, player: str, event: any, data: any) -> None:
+        """配送待ちのイベントをプレイヤーの処理に渡す"""
+        try:
+            self.dispatch(player, event, data)
+        except Exception:
+            # Socketクライアントと同様に、例外が発生したイベントは処理されなかったものとして進行を続ける
+            if self.raise_error:
+                raise
+            self.num_error += 1
+
+
+    def dispatch(self, player: str, event: any, data: any) -> None:
+        """イベントの種類に応じてプレイヤーの処理を呼び出す"""
+        if player is None:
+            # eventには返却先のコールバックが入っている
+            event(clone(data, MUTABLE_ACK_KEYS))
+            return
+
+        handler = getattr(self.agents[player], HANDLERS.get(event, ''), None)
+        if handler is not None:
+            handler(clone(data, MUTABLE_KEYS.get(event)))
+
+
+    def receive(self, player: str, event: str, data: dict, callback) -> None:
+        """プレイヤーからの送信を処理する"""
+        data = data or {}
+        if event == SocketConst.EMIT.PLAY_CARD:
+            self.on_play_card(player, data, callback)
+        elif event == SocketConst.EMIT.DRAW_CARD:
+            self.on_draw_card(player, data, callback)
+        elif event == SocketConst.EMIT.PLAY_DRAW_CARD:
+            self.on_play_draw_card(player, data, callback)
+        elif event == SocketConst.EMIT.COLOR_OF_WILD:
+            self.on_color_of_wild(player, data, callback)
+        elif event == SocketConst.EMIT.CHALLENGE:
+            self.on_challenge(player, data, callback)
+        elif event == SocketConst.EMIT.POINTED_NOT_SAY_UNO:
+            self.on_pointed_not_say_uno(player, data, callback)
+        else:
+            # special-logic等は盤面に影響しないので受け付けるだけ
+            self.ack(callback, data)
+
+
+    """
+    盤面の補助処理
+    """
+    def card_count_of_players(self) -> dict:
+        """各プレイヤーの手札枚数"""
+        return {player: len(self.card_of_player[player]) for player in self.players}
+
+
+    def draw_reason(self, player: str) -> str:
+        """カードを引く理由を取得する"""
+        if self.must_call_draw_card:
+            if self.activation_white_wild.get(player, 0) > 0:
+                if self.white_wild == WHITE_WILD_BIND_2:
+                    return DrawReason.BIND_2
+                elif self.white_wild == WHITE_WILD_SKIP_BIND_2:
+                    return DrawReason.SKIP_BIND_2
+            elif self.card_add_on > 0:
+                if self.before_card_play.get('special') == Special.DRAW_2:
+                    return DrawReason.DRAW_2
+                elif self.before_card_play.get('special') == Special.WILD_DRAW_4:
+                    return DrawReason.WILD_DRAW_4
+        return DrawReason.NOTHING
+
+
+    def pre_get_next_player(self, before_player: str=None, turn_right: bool=None, is_skip: bool=None) -> tuple:
+        """
+        次のプレイヤーを取得する(盤面は更新しない)
+
+        Returns:
+            tuple: (次のプレイヤー, スキップされるプレイヤー)
+        """
+        before_player = self.before_player if before_player is None else before_player
+        turn_right = self.turn_right if turn_right is None else turn_right
+        is_skip = self.is_skip if is_skip is None else is_skip
+
+        num = len(self.players)
+        index = self.players.index(before_player)
+        step = 1 if turn_right else -1
+        next_player = self.players[(index + step) % num]
+        opposite_player = self.players[(index + step * 2) % num]
+        if is_skip:
+            return opposite_player, next_player
+        return next_player, None
+
+
+    def get_next_player(self) -> str:
+        """次のプレイヤーを取得して手番を移す"""
+        next_player, _ = self.pre_get_next_player()
+        self.next_player = next_player
+        self.is_skip = False
+        self.timeout_flag[next_player] = True
+        self.number_turn_play += 1
+        if self.activation_white_wild.get(next_player, 0) > 0:
+            # 白いワイルドの効果を受ける残回数が残っている場合、カードを引かせる
+            self.must_call_draw_card = True
+        return next_player
+
+
+    def draw_cards(self, count: int) -> list:
+        """
+        山札からカードを引く
+        山札が無くなった時は一番上の場札を残して場札を山札に戻す
+
+        Args:
+            count (int): 引く枚数
+        Returns:
+            list: 実際に引くことができたカード
+        """
+        cards = []
+        for _ in range(count):
+            if not self.draw_desk:
+                front = self.reveal_desk.pop()
+                self.draw_desk = self.reveal_desk
+                self.rng.shuffle(self.draw_desk)
+                self.reveal_desk = [front]
+            if self.draw_desk:
+                cards.append(self.draw_desk.pop())
+        return sort_cards(cards)
+
+
+    def add_cards(self, player: str, cards: list) -> None:
+        """手札にカードを加える"""
+        self.card_of_player[player] = sort_cards(self.card_of_player[player] + cards)
+
+
+    """
+    対戦の進行
+    """
+    def start_turn(self) -> None:
+        """対戦を開始する"""
+        players = list(self.members)
+        self.rng.shuffle(players)
+        self.players = players
+        self.turn += 1
+
+        deck = create_deck(self.white_wild is not None)
+        self.rng.shuffle(deck)
+
+        # 手札の配布
+        dealt = {player: [] for player in players}
+        for i in range(len(players) * CARD_DEAL):
+            dealt[players[i % len(players)]].append(deck.pop())
+        self.card_of_player = {}
+        for player in players:
+            self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': dealt[player], 'is_penalty': False})
+            self.card_of_player[player] = sort_cards(dealt[player])
+
+        # 最初のカードを決める(ワイルドドロー4・シャッフルワイルド・白いワイルドは引き直す)
+        first_card = deck.pop()
+        while first_card.get('special') in [Special.WILD_DRAW_4, Special.WILD_SHUFFLE, Special.WHITE_WILD]:
+            deck.append(first_card)
+            self.rng.shuffle(deck)
+            first_card = deck.pop()
+        first_player = players[0]
+
+        self.broadcast(SocketConst.EMIT.FIRST_PLAYER, {
+            'first_player': first_player,
+            'first_card': first_card,
+            'play_order': players,
+            'total_turn': self.total_turn,
+            'white_wild': self.white_wild,
+        })
+
+        self.draw_desk = deck
+        self.reveal_desk = [first_card]
+        self.before_player = first_player
+        self.next_player = None
+        self.turn_right = first_card.get('special') != Special.REVERSE
+        self.card_add_on = 2 if first_card.get('special') == Special.DRAW_2 else 0
+        self.must_call_draw_card = first_card.get('special') == Special.DRAW_2
+        self.can_call_play_draw_card = False
+        self.before_card_play = dict(first_card)
+        self.color_before_wild = self.rng.choice(ARR_COLOR)
+        self.card_before_wild_draw_4 = None
+        self.card_before_draw_card = None
+        self.activation_white_wild = {}
+        self.yell_uno = {player: False for player in players}
+        self.timeout_flag = {player: False for player in players}
+        self.is_skip = first_card.get('special') == Special.SKIP
+        self.number_turn_play = 1
+        self.number_card_play = 1
+        self.no_play_count = 0
+        self.restrict_interrupt = False
+        self.has_yell_uno_penalty = {}
+        self.color_of_wild_player = None # 色指定を要求しているプレイヤー
+
+        # 最初のカードによるアクション
+        if first_card.get('special') == Special.WILD:
+            # 最初のプレイヤーが色を選択する
+            self.next_player = first_player
+            self.timeout_flag[first_player] = True
+            self.color_of_wild_player = first_player
+            self.send(first_player, SocketConst.EMIT.COLOR_OF_WILD, {})
+            return
+
+        index = players.index(first_player)
+        if self.is_skip:
+            # 最初のカードがスキップの場合、最初のプレイヤーはスキップされる
+            index_next = 1 if self.turn_right else -1
+            self.is_skip = False
+        else:
+            # 最初のカードがリバースの場合、最初のプレイヤーの直前のプレイヤーから始まる
+            index_next = 0 if self.turn_right else -1
+        next_player = players[(index + index_next) % len(players)]
+        self.next_player = next_player
+        self.timeout_flag[next_player] = True
+        self.send_next_player(next_player)
+
+
+    def send_next_player(self, next_player: str) -> None:
+        """手番のプレイヤーに通知する"""
+        self.send(next_player, SocketConst.EMIT.NEXT_PLAYER, {
+            'next_player': next_player,
+            'before_player': self.before_player,
+            'card_before': dict(self.before_card_play),
+            'card_of_player': self.card_of_player[next_player],
+            'must_call_draw_card': self.must_call_draw_card,
+            'draw_reason': self.draw_reason(next_player),
+            'turn_right': self.turn_right,
+            'number_card_play': self.number_card_play,
+            'number_turn_play': self.number_turn_play,
+            'number_card_of_player': self.card_count_of_players(),
+        })
+
+
+    def next_player_action(self, is_challenge: bool=None, is_challenge_success: bool=None) -> None:
+        """次のプレイヤーに順番を回す"""
+        if is_challenge is None or (is_challenge and not is_challenge_success):
+            next_player = self.get_next_player()
+        elif is_challenge:
+            # チャレンジ成功時は現在のプレイヤーの手番が続行する
+            next_player = self.next_player
+        else:
+            # チャレンジしなかった場合は引き続き現在のプレイヤーの手番
+            return
+        self.send_next_player(next_player)
+
+
+    def play_card_action(self, player: str, card_play: dict, before_card_play: dict) -> None:
+        """出したカードの効果を処理する"""
+        special = card_play.get('special')
+        if special == Special.WILD_SHUFFLE:
+            # 手札が0枚になったプレイヤーは再配布の対象から除外する
+            ignore_player = player if not self.card_of_player[player] else None
+            self.shuffle_wild(ignore_player)
+            self.card_add_on = 0
+            self.restrict_interrupt = True
+            for target in self.players:
+                self.yell_uno[target] = len(self.card_of_player[target]) == 1
+                self.send(target, SocketConst.EMIT.SHUFFLE_WILD, {
+                    'cards_receive': self.card_of_player[target],
+                    'number_card_of_player': self.card_count_of_players(),
+                })
+            # 色指定を要求する
+            self.timeout_flag[player] = True
+            self.color_of_wild_player = player
+            self.send(player, SocketConst.EMIT.COLOR_OF_WILD, {})
+
+        elif special == Special.WHITE_WILD:
+            if self.white_wild == WHITE_WILD_SKIP_BIND_2:
+                self.is_skip = True
+            next_player, _ = self.pre_get_next_player()
+            self.must_call_draw_card = True
+            self.activation_white_wild[next_player] = self.activation_white_wild.get(next_player, 0) + 2
+            self.before_card_play = dict(self.before_card_play, color=before_card_play.get('color'))
+
+        else:
+            if special == Special.DRAW_2:
+                self.card_add_on += 2
+                self.must_call_draw_card = True
+            if special == Special.REVERSE:
+                self.turn_right = not self.turn_right
+            if special == Special.SKIP:
+                self.is_skip = True
+
+
+    def shuffle_wild(self, ignore_player: str=None) -> None:
+        """シャッフルワイルドによる手札の再配布"""
+        next_player, _ = self.pre_get_next_player()
+        players = self.players if self.turn_right else self.players[::-1]
+        index = players.index(next_player)
+        players_sorted = [p for p in players[index:] + players[:index] if p != ignore_player]
+
+        cards = []
+        for player in self.players:
+            if player == ignore_player:
+                continue
+            cards += self.card_of_player[player]
+            self.card_of_player[player] = []
+        self.rng.shuffle(cards)
+
+        for i in range(len(cards)):
+            self.card_of_player[players_sorted[i % len(players_sorted)]].append(cards.pop())
+        for player in players_sorted:
+            self.card_of_player[player] = sort_cards(self.card_of_player[player])
+
+
+    def is_turn_end(self, player: str, card_play: dict=None, is_color_of_wild: bool=False) -> bool:
+        """対戦が終了しているか判定する"""
+        if card_play:
+            if card_play.get('special') == Special.WILD_SHUFFLE:
+                # シャッフルと色の変更を行ってから判定する
+                return False
+            return len(self.card_of_player[player]) == 0
+        elif is_color_of_wild:
+            return len(self.card_of_player[player]) == 0
+        return False
+
+
+    def turn_end(self, win_player: str=None) -> None:
+        """対戦終了時の処理"""
+        self.color_of_wild_player = None
+        winner = None
+        score_of_player = {}
+        score_of_winner = 0
+        for player in self.players:
+            if win_player and not self.card_of_player[player]:
+                winner = player
+                continue
+            score_of_player[player] = -sum(card_score(card) for card in self.card_of_player[player])
+            score_of_winner -= score_of_player[player]
+        if winner:
+            score_of_player[winner] = score_of_winner
+            self.order[winner] += 1
+
+        for player in self.players:
+            self.score[player] += score_of_player[player]
+            self.score_history[player].append(score_of_player[player])
+
+        self.broadcast(SocketConst.EMIT.FINISH_TURN, {
+            'winner': win_player or '',
+            'turn_no': self.turn,
+            'score': score_of_player,
+        })
+
+        if self.turn >= self.total_turn:
+            self.finish_game()
+            return
+
+        self.start_turn()
+
+
+    def finish_game(self) -> None:
+        """試合終了時の処理"""
+        win_score = max(self.score.values())
+        winners = [player for player in self.members if self.score[player] >= win_score]
+        if len(winners) > 1:
+            # 同点の場合は先にその点数に到達したプレイヤーを優勝とする
+            def reached(player):
+                total = 0
+                for i, score in enumerate(self.score_history[player]):
+                    total += score
+                    if total >= win_score:
+                        return i
+                return len(self.score_history[player])
+            winners.sort(key=reached)
+        self.winner = winners[0]
+        self.finished = True
+
+        self.broadcast(SocketConst.EMIT.FINISH_GAME, {
+            'winner': self.winner,
+            'turn_win': self.order[self.winner],
+            'order': dict(self.order),
+            'total_score': dict(self.score),
+        })
+
+
+    """
+    ペナルティ・タイムアウト
+    """
+    def skip_player(self, player: str, is_color_of_wild: bool=False) -> None:
+        """現在のプレイヤーをスキップする"""
+        if self.must_call_draw_card:
+            # カードを引かないといけない時は引かせてから次に回す
+            self.handle_draw_card(player)
+            return
+
+        if is_color_of_wild:
+            self.color_of_wild_player = None
+            if self.before_card_play.get('color') == Color.BLACK:
+                self.before_card_play = dict(self.before_card_play, color=self.color_before_wild)
+            if self.before_card_play.get('special') == Special.WILD_DRAW_4:
+                self.card_add_on += 4
+                self.must_call_draw_card = True
+            else:
+                self.card_add_on = 0
+                self.must_call_draw_card = False
+        self.before_player = player
+        self.no_play_count = 0
+        self.can_call_play_draw_card = False
+        self.timeout_flag[player] = False
+        self.next_player_action()
+
+
+    def handle_penalty(self, player: str, error: str, is_next_player: bool, is_color_of_wild: bool=False) -> None:
+        """
+        ペナルティ処理
+
+        Args:
+            player (str): ペナルティ対象のプレイヤー
+            error (str): エラー内容
+            is_next_player (bool): 現在の手番のプレイヤーであるか
+            is_color_of_wild (bool): color-of-wildで発生したペナルティか
+        """
+        self.num_penalty += 1
+        count = min(CARD_PUNISH, MAX_CARD_OF_PLAYER - len(self.card_of_player[player]))
+        if count <= 0:
+            if is_next_player:
+                self.skip_player(player)
+            return
+
+        cards = self.draw_cards(count)
+        self.add_cards(player, cards)
+        self.can_call_play_draw_card = False
+        self.yell_uno[player] = False
+        self.restrict_interrupt = False
+
+        self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': True})
+        self.broadcast(SocketConst.EMIT.PENALTY, {
+            'player': player,
+            'number_card_of_player': len(self.card_of_player[player]),
+            'error': error,
+        })
+
+        if len(cards) < count:
+            # 山札枯渇により対戦終了
+            self.turn_end()
+            return
+
+        if is_next_player:
+            self.skip_player(player, is_color_of_wild)
+
+
+    def timeout(self) -> None:
+        """応答が無くなった場合に手番のプレイヤーをタイムアウトさせる"""
+        self.num_timeout += 1
+        player = self.color_of_wild_player
+        if player is not None:
+            self.timeout_color_of_wild(player)
+            return
+
+        player = self.next_player
+        if player is None or not self.timeout_flag.get(player):
+            raise RuntimeError('engine stalled: turn {}'.format(self.turn))
+
+        count = max(0, min(CARD_PUNISH, MAX_CARD_OF_PLAYER - len(self.card_of_player[player])))
+        cards = self.draw_cards(count)
+        self.before_player = player
+        self.no_play_count = 0 if cards else self.no_play_count + 1
+        self.add_cards(player, cards)
+        self.yell_uno[player] = False
+        self.restrict_interrupt = False
+        self.timeout_flag[player] = False
+
+        self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': True})
+        self.broadcast(SocketConst.EMIT.PENALTY, {
+            'player': player,
+            'number_card_of_player': len(self.card_of_player[player]),
+            'error': 'timeout',
+        })
+
+        if len(cards) < count:
+            self.turn_end()
+            return
+
+        # 前のプレイヤーが出したカードの効果によるドロー
+        activation = 1 if self.activation_white_wild.get(player, 0) else 0
+        card_add_on = self.card_add_on or activation
+        if card_add_on:
+            cards = self.draw_cards(card_add_on)
+            self.add_cards(player, cards)
+            if cards:
+                self.no_play_count = 0
+                if activation:
+                    self.activation_white_wild[player] -= 1
+            else:
+                self.no_play_count += 1
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+            self.can_call_play_draw_card = False
+            self.card_before_draw_card = None
+            self.number_card_play += 1
+            self.has_yell_uno_penalty = {}
+            if cards:
+                self.broadcast(SocketConst.EMIT.DRAW_CARD, {'player': player, 'is_draw': True})
+            if len(cards) < card_add_on or self.no_play_count >= NO_PLAY_MAX_LAP * len(self.players):
+                self.turn_end()
+                return
+
+        self.send_next_player(self.get_next_player())
+
+
+    def timeout_color_of_wild(self, player: str) -> None:
+        """色指定を行わなかったプレイヤーのタイムアウト処理"""
+        self.color_of_wild_player = None
+        count = max(0, min(CARD_PUNISH, MAX_CARD_OF_PLAYER - len(self.card_of_player[player])))
+        cards = self.draw_cards(count)
+        self.no_play_count = 0 if cards else self.no_play_count + 1
+        self.add_cards(player, cards)
+
+        if self.before_card_play.get('special') == Special.WILD_DRAW_4:
+            self.card_add_on += 4
+            self.must_call_draw_card = True
+        else:
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+        self.before_player = player
+        self.before_card_play = dict(self.before_card_play, color=self.color_before_wild)
+        self.number_card_play += 1
+        self.yell_uno[player] = False
+        self.restrict_interrupt = False
+        self.has_yell_uno_penalty = {}
+        self.timeout_flag[player] = False
+
+        self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': True})
+        self.broadcast(SocketConst.EMIT.PENALTY, {
+            'player': player,
+            'number_card_of_player': len(self.card_of_player[player]),
+            'error': 'color-of-wild timeout',
+        })
+
+        if self.no_play_count >= NO_PLAY_MAX_LAP * len(self.players):
+            self.turn_end()
+            return
+
+        self.send_next_player(self.get_next_player())
+
+
+    """
+    プレイヤーからの送信に対する処理
+    """
+    def on_play_card(self, player: str, data: dict, callback) -> None:
+        """play-card"""
+        if self.restrict_interrupt:
+            return
+
+        card_play = data.get('card_play')
+        yell_uno = data.get('yell_uno')
+        color_of_wild = data.get('color_of_wild')
+        if player != self.next_player:
+            self.handle_penalty(player, 'Next player invalid.', False)
+            return
+
+        error = None
+        cards = self.card_of_player[player]
+        if self.must_call_draw_card:
+            error = 'Can not play card.'
+        elif not is_valid_card(card_play):
+            error = 'Card play invalid.'
+        elif not isinstance(yell_uno, bool):
+            error = 'Yell uno is required.'
+        elif not any(is_same_card(card_play, card) for card in cards):
+            error = 'Card play not exist of player.'
+        elif not is_available_card(card_play, self.before_card_play, self.card_add_on):
+            error = 'Card play invalid with card before.'
+        elif card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4] and not color_of_wild:
+            error = 'Color of wild is required.'
+        elif color_of_wild and color_of_wild not in ARR_COLOR:
+            error = 'Color wild invalid.'
+        elif yell_uno and len(cards) != 2:
+            error = 'Can not say uno and play card.'
+        if error:
+            self.handle_penalty(player, error, True)
+            return
+
+        card_play = {k: v for k, v in card_play.items() if k in ('color', 'number', 'special')}
+        before_card_play = self.before_card_play
+        self.card_of_player[player] = remove_card(card_play, cards)
+        self.number_card_play += 1
+        self.reveal_desk.append(card_play)
+        self.color_before_wild = before_card_play.get('color')
+        self.before_card_play = dict(card_play)
+        if card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4]:
+            self.before_card_play['color'] = color_of_wild
+        self.before_player = player
+        if card_play.get('special') == Special.WILD_DRAW_4:
+            self.card_before_wild_draw_4 = dict(before_card_play)
+            self.card_add_on += 4
+            self.must_call_draw_card = True
+        else:
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+        self.no_play_count = 0
+        self.yell_uno[player] = yell_uno
+        self.has_yell_uno_penalty = {}
+        self.timeout_flag[player] = False
+
+        self.play_card_action(player, card_play, before_card_play)
+
+        self.broadcast(SocketConst.EMIT.PLAY_CARD, dict(data, player=player))
+        if card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4]:
+            self.broadcast(SocketConst.EMIT.UPDATE_COLOR, {'color': self.before_card_play['color']})
+
+        if self.is_turn_end(player, card_play):
+            if card_play.get('special') in [Special.DRAW_2, Special.WILD_DRAW_4]:
+                # 上がりのカードがドロー系の場合、次のプレイヤーは効果分を引いてから終了する
+                next_player, _ = self.pre_get_next_player()
+                cards = self.draw_cards(self.card_add_on)
+                self.add_cards(next_player, cards)
+                self.card_add_on = 0
+                self.must_call_draw_card = False
+                self.can_call_play_draw_card = False
+                self.card_before_draw_card = None
+                self.send(next_player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': False})
+                self.broadcast(SocketConst.EMIT.DRAW_CARD, {'player': next_player, 'is_draw': True})
+            self.turn_end(player)
+            self.ack(callback, data)
+            return
+
+        if card_play.get('special') != Special.WILD_SHUFFLE:
+            self.next_player_action()
+        self.ack(callback, data)
+
+
+    def on_draw_card(self, player: str, data: dict, callback) -> None:
+        """draw-card"""
+        if self.restrict_interrupt:
+            return
+        if player != self.next_player:
+            self.handle_penalty(player, 'Next player invalid.', False)
+            return
+        self.handle_draw_card(player, callback)
+
+
+    def handle_draw_card(self, player: str, callback=None) -> None:
+        """山札からカードを引く処理"""
+        has_activation_white_wild = self.activation_white_wild.get(player, 0) > 0
+        need_draw_card = self.card_add_on > 0
+        if not has_activation_white_wild and not need_draw_card and len(self.card_of_player[player]) >= MAX_CARD_OF_PLAYER:
+            # 手札が最大枚数に達していてカードを引けない
+            if self.no_play_count >= NO_PLAY_MAX_LAP * len(self.players):
+                # 盤面に動きがなく限界数を超えた場合は対戦終了
+                self.turn_end()
+                if callback is not None:
+                    self.ack(callback, {})
+                return
+
+            self.before_player = player
+            self.no_play_count += 1
+            self.yell_uno[player] = False
+            self.timeout_flag[player] = False
+
+            emit_data = {'player': player, 'is_draw': False}
+            self.broadcast(SocketConst.EMIT.DRAW_CARD, emit_data)
+            if callback is not None:
+                self.ack(callback, dict(emit_data, can_play_draw_card=False))
+            self.next_player_action()
+            return
+
+        activation = 1 if has_activation_white_wild else 0
+        card_add_on = self.card_add_on or activation
+        count = card_add_on or 1
+
+        cards = self.draw_cards(count)
+        if activation:
+            self.activation_white_wild[player] -= 1
+
+        if card_add_on > 0 or not cards or not is_available_card(cards[0], self.before_card_play, self.card_add_on):
+            # 引いたカードを出すことはできない
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+            self.can_call_play_draw_card = False
+            self.before_player = player
+            self.add_cards(player, cards)
+            self.no_play_count = 0
+            self.restrict_interrupt = False
+            self.yell_uno[player] = False
+            self.has_yell_uno_penalty = {}
+            self.timeout_flag[player] = False
+
+            emit_data = {'player': player, 'is_draw': True}
+            self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': False})
+            self.broadcast(SocketConst.EMIT.DRAW_CARD, emit_data)
+            cb_data = dict(emit_data, can_play_draw_card=False, draw_card=cards)
+            if len(cards) < count:
+                # 山札枯渇により対戦終了
+                self.turn_end()
+                if callback is not None:
+                    self.ack(callback, cb_data)
+                return
+
+            if callback is not None:
+                self.ack(callback, cb_data)
+            self.next_player_action()
+            return
+
+        # 引いたカードが場に出せる場合はplay-draw-cardを待つ
+        self.must_call_draw_card = False
+        self.can_call_play_draw_card = True
+        self.card_before_draw_card = cards[0]
+        self.add_cards(player, cards)
+        self.no_play_count = 0
+        self.restrict_interrupt = True
+        self.yell_uno[player] = False
+        self.has_yell_uno_penalty = {}
+        self.timeout_flag[player] = True
+
+        emit_data = {'player': player, 'is_draw': True}
+        self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': False})
+        self.broadcast(SocketConst.EMIT.DRAW_CARD, emit_data)
+        if callback is not None:
+            self.ack(callback, dict(emit_data, draw_card=cards, can_play_draw_card=True))
+
+
+    def on_play_draw_card(self, player: str, data: dict, callback) -> None:
+        """play-draw-card"""
+        card_play = self.card_before_draw_card
+        is_next_player = player == self.next_player
+        if not is_next_player and self.restrict_interrupt:
+            return
+        if not is_next_player:
+            self.handle_penalty(player, 'Next player invalid.', False)
+            return
+
+        is_play_card = data.get('is_play_card')
+        yell_uno = data.get('yell_uno')
+        color_of_wild = data.get('color_of_wild')
+        cards = self.card_of_player[player]
+        error = None
+        if not self.can_call_play_draw_card:
+            error = 'Can not play draw card.'
+        elif not isinstance(is_play_card, bool):
+            error = 'Is play card is required.'
+        elif not isinstance(yell_uno, bool):
+            error = 'Yell uno is required.'
+        elif not any(is_same_card(card_play, card) for card in cards):
+            error = 'Card play not exist of player.'
+        elif is_play_card and not is_available_card(card_play, self.before_card_play, self.card_add_on):
+            error = 'Card play invalid with card before.'
+        elif is_play_card and card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4] and not color_of_wild:
+            error = 'Color of wild is required.'
+        elif is_play_card and color_of_wild and color_of_wild not in ARR_COLOR:
+            error = 'Color wild invalid.'
+        elif yell_uno and len(cards) != 2:
+            error = 'Can not say uno and play card.'
+        if error:
+            self.handle_penalty(player, error, True)
+            return
+
+        emit_data = dict(data, player=player)
+        if is_play_card:
+            emit_data['card_play'] = card_play
+
+        before_card_play = self.before_card_play
+        self.before_player = player
+        self.card_add_on = 0
+        self.must_call_draw_card = False
+        if is_play_card:
+            self.color_before_wild = before_card_play.get('color')
+            self.before_card_play = dict(card_play)
+            self.card_of_player[player] = remove_card(card_play, cards)
+            self.reveal_desk.append(card_play)
+            self.number_card_play += 1
+            if card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4]:
+                self.before_card_play['color'] = color_of_wild
+            if card_play.get('special') == Special.WILD_DRAW_4:
+                self.card_before_wild_draw_4 = dict(before_card_play)
+                self.card_add_on += 4
+            self.must_call_draw_card = card_play.get('special') == Special.WILD_DRAW_4
+        self.can_call_play_draw_card = False
+        self.card_before_draw_card = None
+        self.no_play_count = 0
+        self.yell_uno[player] = yell_uno
+        self.restrict_interrupt = False
+        self.has_yell_uno_penalty = {}
+        self.timeout_flag[player] = False
+
+        if not is_play_card:
+            self.broadcast(SocketConst.EMIT.PLAY_DRAW_CARD, emit_data)
+            self.next_player_action()
+            self.ack(callback, data)
+            return
+
+        self.play_card_action(player, card_play, before_card_play)
+        self.broadcast(SocketConst.EMIT.PLAY_DRAW_CARD, emit_data)
+        if card_play.get('special') != Special.WILD_SHUFFLE:
+            self.next_player_action()
+        if card_play.get('special') in [Special.WILD, Special.WILD_DRAW_4]:
+            self.broadcast(SocketConst.EMIT.UPDATE_COLOR, {'color': self.before_card_play['color']})
+        self.ack(callback, data)
+
+
+    def on_color_of_wild(self, player: str, data: dict, callback) -> None:
+        """color-of-wild"""
+        is_next_player = player == self.next_player
+        if not is_next_player and self.restrict_interrupt:
+            return
+        if not is_next_player:
+            self.handle_penalty(player, 'Next player invalid.', False, True)
+            return
+
+        color_of_wild = data.get('color_of_wild')
+        error = None
+        if self.before_card_play.get('color') != Color.BLACK:
+            error = 'Already changed color.'
+        elif not color_of_wild:
+            error = 'Color of wild is required.'
+        elif color_of_wild not in ARR_COLOR:
+            error = 'Color wild invalid.'
+        elif self.before_card_play.get('special') == Special.WILD_DRAW_4 or \
+             (self.before_card_play.get('special') == Special.WILD and self.number_turn_play != 1):
+            error = 'Can not chose color of wild.'
+        if error:
+            self.handle_penalty(player, error, True, True)
+            return
+
+        self.color_of_wild_player = None
+        self.before_card_play['color'] = color_of_wild
+        self.must_call_draw_card = False
+        self.before_player = player
+        self.no_play_count = 0
+        self.restrict_interrupt = False
+        self.has_yell_uno_penalty = {}
+        self.timeout_flag[player] = False
+
+        self.broadcast(SocketConst.EMIT.UPDATE_COLOR, {'color': color_of_wild})
+        if self.is_turn_end(player, None, True):
+            self.turn_end(player)
+            self.ack(callback, data)
+            return
+
+        self.next_player_action()
+        self.ack(callback, data)
+
+
+    def on_challenge(self, player: str, data: dict, callback) -> None:
+        """challenge"""
+        if self.restrict_interrupt:
+            return
+        is_next_player = player == self.next_player
+        if not is_next_player:
+            self.handle_penalty(player, 'Next player invalid.', False)
+            return
+
+        is_challenge = data.get('is_challenge')
+        if not isinstance(is_challenge, bool):
+            self.handle_penalty(player, 'Is challenge is required.', True)
+            return
+        if self.before_card_play.get('special') != Special.WILD_DRAW_4 or self.card_add_on == 0 or \
+           self.activation_white_wild.get(player, 0) > 0:
+            self.handle_penalty(player, 'Can not challenge.', True)
+            return
+
+        before_player = self.before_player
+        if not is_challenge:
+            self.broadcast(SocketConst.EMIT.CHALLENGE, {
+                'challenger': player,
+                'target': before_player,
+                'is_challenge': False,
+            })
+            self.next_player_action(False)
+            self.ack(callback, data)
+            return
+
+        cards_of_before_player = self.card_of_player[before_player]
+        is_challenge_success = is_challenge_successfully(self.card_before_wild_draw_4, cards_of_before_player)
+        self.send(player, SocketConst.EMIT.PUBLIC_CARD, {
+            'card_of_player': before_player,
+            'cards': cards_of_before_player,
+        })
+        emit_data = {
+            'challenger': player,
+            'target': before_player,
+            'is_challenge': True,
+            'is_challenge_success': is_challenge_success,
+        }
+
+        if is_challenge_success:
+            # ワイルドドロー4を手札に戻し、さらに4枚引かせる
+            cards_receive = [self.reveal_desk.pop()]
+            cards = self.draw_cards(CARD_DRAW_CHALLENGE_SUCCESSFULLY)
+            if len(cards) < CARD_DRAW_CHALLENGE_SUCCESSFULLY:
+                self.turn_end()
+                return
+
+            cards_receive += cards
+            self.before_card_play = dict(self.card_before_wild_draw_4)
+            self.add_cards(before_player, cards_receive)
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+            self.card_before_wild_draw_4 = None
+            self.no_play_count = 0
+            self.has_yell_uno_penalty = {}
+
+            self.broadcast(SocketConst.EMIT.CHALLENGE, emit_data)
+            self.send(before_player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards_receive, 'is_penalty': False})
+        else:
+            # チャレンジしたプレイヤーが6枚引く
+            cards = self.draw_cards(CARD_DRAW_CHALLENGE_FAILED)
+            if len(cards) < CARD_DRAW_CHALLENGE_FAILED:
+                self.turn_end()
+                return
+
+            self.add_cards(player, cards)
+            self.card_add_on = 0
+            self.must_call_draw_card = False
+            self.before_player = player
+            self.card_before_wild_draw_4 = None
+            self.no_play_count = 0
+            self.has_yell_uno_penalty = {}
+            self.timeout_flag[player] = False
+
+            self.broadcast(SocketConst.EMIT.CHALLENGE, emit_data)
+            self.send(player, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': False})
+
+        self.next_player_action(True, is_challenge_success)
+        self.ack(callback, data)
+
+
+    def on_pointed_not_say_uno(self, player: str, data: dict, callback) -> None:
+        """pointed-not-say-uno"""
+        if self.restrict_interrupt:
+            return
+
+        target = data.get('target')
+        if self.has_yell_uno_penalty.get(target):
+            return
+
+        if not target or target not in self.players or len(self.card_of_player[target]) != 1:
+            self.handle_penalty(player, 'Can not pointed not say uno.', False)
+            return
+        if self.before_player != target:
+            return
+
+        emit_data = {
+            'pointer': player,
+            'target': target,
+            'have_say_uno': self.yell_uno.get(target),
+        }
+        if self.yell_uno.get(target):
+            self.broadcast(SocketConst.EMIT.POINTED_NOT_SAY_UNO, emit_data)
+            self.ack(callback, data)
+            return
+
+        cards = self.draw_cards(CARD_PUNISH)
+        if len(cards) < CARD_PUNISH:
+            self.turn_end()
+            return
+
+        self.add_cards(target, cards)
+        self.has_yell_uno_penalty[target] = True
+
+        self.send(target, SocketConst.EMIT.RECEIVER_CARD, {'cards_receive': cards, 'is_penalty': False})
+        self.broadcast(SocketConst.EMIT.PENALTY, {
+            'player': target,
+            'number_card_of_player': len(self.card_of_player[target]),
+            'error': 'Did not say uno.',
+        })
+        self.broadcast(SocketConst.EMIT.POINTED_NOT_SAY_UNO, emit_data)
+        self.ack(callback, data)
+
+
+def main():
+    from agent import Agent
+
+    parser = argparse.ArgumentParser(description='Headless self-play without the dealer')
+    parser.add_argument('-n', '--total_turn', action='store', type=int, default=100, help='Number of turns')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=None, help='Random seed')
+    parser.add_argument('--no_white_wild', action='store_true', help='Play without white wild')
+    args = parser.parse_args(sys.argv[1:])
+
+    random.seed(args.seed)
+    agents = [Agent(time_delay=0) for _ in range(MAX_PLAYER)]
+    engine = Engine(agents, args.total_turn, None if args.no_white_wild else WHITE_WILD_BIND_2, args.seed)
+
+    start = time.perf_counter()
+    result = engine.run()
+    elapsed = time.perf_counter() - start
+
+    print('winner: {}'.format(result['winner']))
+    for player in engine.members:
+        print('{}: win {} / score {}'.format(player, result['order'][player], result['score'][player]))
+    print('turns: {}, penalty: {}, timeout: {}'.format(engine.turn, engine.num_penalty, engine.num_timeout))
+    print('{:.2f} sec ({:.1f} turns/sec)'.format(elapsed, engine.turn / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import sys
+import time
+import socketio
+from strategy import pass_func
+from consts import SocketConst, THINK_TIME
+from agent import Agent
+from async_runtime import AsyncRuntime
+from workers import ThinkPool
+from metrics import Metrics
+
+from rich import print
+
+
+"""
+1つのプロセスで複数の席に参加するプレイヤーのホスト
+
+席ごとにSocketクライアント(AsyncClient)・Agent(Status/Gamesを含む)を持ち、全ての席を1つのイベントループで動かす
+確率計算やプレイアウトの表はモジュールの定数なので、全ての席で共有される
+プレイアウトのワーカー(ThinkPool)も全ての席で共有する
+同時に思考する部屋が多いとワーカーの空き待ちになり、その手番はプレイアウトなしになる
+そのため、--processesは同時に思考する部屋の数以上にすること
+4席の自己対戦や、多数の対戦を同時に行う負荷試験をコンテナ1つで行うために使う
+
+例) python host.py http://localhost:8080 "Dealer 1" "Dealer 2" --players 4
+"""
+
+# 受信イベント -> Agentの受信処理名 (Noneの場合は記録のみ)
+HANDLERS = {
+    SocketConst.EMIT.JOIN_ROOM: None,
+    SocketConst.EMIT.RECEIVER_CARD: 'on_reciever_card',
+    SocketConst.EMIT.FIRST_PLAYER: 'on_first_player',
+    SocketConst.EMIT.COLOR_OF_WILD: 'on_color_of_wild',
+    SocketConst.EMIT.UPDATE_COLOR: 'on_update_color',
+    SocketConst.EMIT.SHUFFLE_WILD: 'on_shuffle_wild',
+    SocketConst.EMIT.NEXT_PLAYER: 'on_next_player',
+    SocketConst.EMIT.PLAY_CARD: 'on_play_card',
+    SocketConst.EMIT.DRAW_CARD: 'on_draw_card',
+    SocketConst.EMIT.PLAY_DRAW_CARD: 'on_play_draw_card',
+    SocketConst.EMIT.CHALLENGE: 'on_challenge',
+    SocketConst.EMIT.PUBLIC_CARD: 'on_public_card',
+    SocketConst.EMIT.POINTED_NOT_SAY_UNO: None,
+    SocketConst.EMIT.FINISH_TURN: 'on_finish_turn',
+    SocketConst.EMIT.FINISH_GAME: None,
+    SocketConst.EMIT.PENALTY: 'on_penalty',
+}
+
+
+class Seat:
+    """
+    1つの席(ディーラー名とプレイヤー名の組)
+    """
+    def __init__(self, host: str, room_name: str, player: str, think_time: int, think_pool: ThinkPool, speculate: bool=True) -> None:
+        """
+        Args:
+            host (str): 接続先
+            room_name (str): ディーラー名
+            player (str): プレイヤー名
+            think_time (int): 1手あたりの思考時間の上限(ms)
+            think_pool (ThinkPool): 全ての席で共有するプロセスプール
+            speculate (bool): 相手の手番の間に自分の手番の候補手を先読みするか(think_poolの起動中は行わない)
+        """
+        self.host = host
+        self.room_name = room_name
+        self.player = player
+        # 切断されたら再接続せずに席を終える
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.runtime = AsyncRuntime(self.sio)
+        self.metrics = Metrics()
+        self.agent = Agent(self.send_event, log=self.print, think_time=think_time, think_pool=think_pool, metrics=self.metrics, speculate=speculate)
+
+        self.runtime.on('connect')(self.on_connect)
+        self.runtime.on('disconnect')(self.on_disconnect)
+        for event, name in HANDLERS.items():
+            self.runtime.on(event)(self.make_handler(event, name))
+
+
+    def print(self, *args) -> None:
+        """席ごとのログ出力"""
+        print('[{} / {}]'.format(self.room_name, self.player), *args)
+
+
+    def send_event(self, event: str, data: any, callback=pass_func) -> None:
+        """
+        送信イベント共通処理(player_v3.pyのsend_eventと同じ)
+
+        Args:
+            event (str): Socket通信イベント名
+            data (Any): 送信するデータ
+            callback (func): 個別処理
+        """
+        sent = time.perf_counter()
+
+        def after_func(err, res):
+            received = time.perf_counter()
+            self.agent.latency.record(received - sent)
+            self.metrics.record('ack:' + event, received - sent)
+            if err:
+                return
+
+            callback(res)
+            self.metrics.record('callback:' + event, time.perf_counter() - received)
+
+        self.runtime.emit(event, data, after_func)
+
+
+    def make_handler(self, event: str, name: str):
+        """受信イベントの処理を作る"""
+        callback = getattr(self.agent, name) if name is not None else pass_func
+
+        def handler(data_res):
+            start = time.perf_counter()
+            callback(data_res)
+            self.metrics.record('handler:' + event, time.perf_counter() - start)
+
+            if event == SocketConst.EMIT.FINISH_GAME:
+                # 処理時間の分布を出力する
+                for line in self.metrics.report():
+                    self.print(line)
+
+        return handler
+
+
+    def on_connect(self) -> None:
+        self.print('Client connect successfully!')
+        data = {
+            'room_name': self.room_name,
+            'player': self.player,
+        }
+
+        def join_room_callback(*args):
+            self.print('Client join room successfully!')
+            self.agent.join_room_callback(args[0])
+
+        self.send_event(SocketConst.EMIT.JOIN_ROOM, data, join_room_callback)
+
+
+    def on_disconnect(self) -> None:
+        self.print('Client disconnect.')
+
+
+    async def run(self) -> None:
+        """接続して切断されるまで待つ"""
+        await self.runtime.connect_and_wait(self.host, transports=['websocket'])
+
+
+async def run_seats(seats: list) -> None:
+    """全ての席が切断されるまで待つ"""
+    await asyncio.gather(*(seat.run() for seat in seats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Join many rooms/seats from one process')
+    parser.add_argument('host', action='store', type=str, help='Host to connect')
+    parser.add_argument('room_names', action='store', nargs='+', type=str, help='Names of the rooms to join')
+    parser.add_argument('--players', action='store', type=int, default=4, help='Number of seats per room')
+    parser.add_argument('--prefix', action='store', type=str, default='Player ', help='Prefix of the player names (numbered from 1)')
+    parser.add_argument('--think_time', action='store', type=int, default=THINK_TIME, help='Max thinking time per move in ms (0 to disable)')
+    parser.add_argument('--processes', action='store', type=int, default=None, help='Number of worker processes for thinking shared by all seats (default: number of cores). Use at least the number of rooms thinking at the same time')
+    parser.add_argument('--no_speculate', action='store_true', help='Do not precompute our next move during opponents\' turns (never done while the think pool is running)')
+    args = parser.parse_args(sys.argv[1:])
+
+    think_pool = ThinkPool(args.processes)
+    if args.think_time and think_pool.processes > 1:
+        think_pool.start()
+        print('Think pool started: {} processes'.format(think_pool.processes))
+        if think_pool.processes < len(args.room_names):
+            print('Warning: fewer worker processes than rooms, moves may be made without playouts when rooms think at the same time')
+
+    seats = [
+        Seat(args.host, room_name, '{}{}'.format(args.prefix, i + 1), args.think_time, think_pool, not args.no_speculate)
+        for room_name in args.room_names
+        for i in range(args.players)
+    ]
+    print('Host: {}, Seats: {}'.format(args.host, len(seats)))
+
+    try:
+        asyncio.get_event_loop().run_until_complete(run_seats(seats))
+    finally:
+        think_pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from array import array
+import numpy as np
+from consts import SocketConst, ARR_COLOR
+from card import encode, NO_COLOR
+
+
+"""
+試合の列指向トレース
+
+受信イベントを1行=1事象の表にし、列ごとの固定長バイナリファイルに追記する(JSONのカードのdictを整数にする)
+    turn  (uint32): 対戦番号(1から数え、finish-turnごとに進める)
+    event (uint8) : 事象の種類(RECEIVE, PLAY, ...)
+    seat  (uint8) : プレイヤーの番号(meta.jsonのplayersの添字 該当なしはNO_SEAT)
+    card  (uint8) : カードの種類(card.pyの整数 該当なしはNO_CARD)
+    color (uint8) : 色の番号(ARR_COLORの添字 該当なしはNO_COLOR)
+    value (int32) : 事象ごとの値(枚数・得点・UNO宣言など)
+
+トレースはディレクトリで、列ごとのファイル(<列名>.bin)とmeta.json(列の型・プレイヤー名)からなる
+書き込み(TraceWriter): 受信処理ではメモリ上の配列に追記するだけにし、ファイルへの書き出しは別スレッドで行う
+読み込み(TraceReader): 列ごとのファイルをnumpy.memmapで開くため、大きなトレースでも読み込みは一瞬で終わる
+
+例) python player_v3.py http://localhost:8080 "Dealer 1" "Player 1" --trace match.trace
+    python match_trace.py convert match.log match.trace (replay.pyのログから変換する)
+    python match_trace.py summary match.trace
+"""
+TRACE_VERSION = 1
+COLUMNS = [
+    # (列名, arrayの型, numpyの型)
+    ('turn', 'I', '<u4'),
+    ('event', 'B', 'u1'),
+    ('seat', 'B', 'u1'),
+    ('card', 'B', 'u1'),
+    ('color', 'B', 'u1'),
+    ('value', 'i', '<i4'),
+]
+NO_SEAT = 255
+NO_CARD = 255
+FLUSH_ROWS = 1 << 16 # この行数を超えたら対戦の途中でも書き出す
+
+# 事象の種類
+RECEIVE = 0 # 手札にカードが追加された(seat: 自分, card, value: 0=配布・山札 1=ペナルティ 2=シャッフルワイルド)
+FIRST = 1 # 対戦の開始(seat: 最初のプレイヤー, card/color: 最初の場札)
+PLAY = 2 # カードが場に出た(seat, card, color: 出した後の場札の色, value: UNO宣言)
+PLAY_DRAW = 3 # 山札から引いたカードが場に出た(PLAYと同じ)
+DRAW = 4 # 山札からカードを引いた(seat, value: 引いたか)
+COLOR = 5 # 場札の色が変わった(color)
+SHUFFLE = 6 # シャッフルワイルドで配り直した(seat, value: 手札の枚数) プレイヤーごとに1行
+NEXT = 7 # 自分の番(seat: 自分, card/color: 場札, value: 手札の枚数)
+CHALLENGE = 8 # チャレンジの結果(seat: チャレンジしたプレイヤー, value: 0=しない 1=失敗 2=成功)
+PUBLIC = 9 # チャレンジで公開された手札(seat, card) カードごとに1行
+PENALTY = 10 # ペナルティ(seat, value: 手札の枚数)
+WIN = 11 # 対戦の勝者(seat)
+SCORE = 12 # 対戦終了時の得点(seat, value: 得点) プレイヤーごとに1行
+EVENT_NAMES = ['receive', 'first', 'play', 'play_draw', 'draw', 'color', 'shuffle', 'next', 'challenge', 'public', 'penalty', 'win', 'score']
+
+_COLOR_INDEX = {color: i for i, color in enumerate(ARR_COLOR)}
+
+
+def color_index(color: str) -> int:
+    """色の名前を色の番号に変換する(4色以外はNO_COLOR)"""
+    return _COLOR_INDEX.get(color, NO_COLOR)
+
+
+class TraceWriter:
+    """
+    受信イベントをトレースに追記する
+    """
+    def __init__(self, path: str, header: dict=None) -> None:
+        """
+        Args:
+            path (str): トレースのディレクトリ(既存の列ファイルは上書きする)
+            header (dict): meta.jsonに残す設定
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.header = header or {}
+        self.players = [] # 番号 -> プレイヤーID
+        self.seats = {} # プレイヤーID -> 番号
+        self.me = None # 自分のプレイヤーID
+        self.turn = 1 # 対戦番号
+        self.rows = 0
+        self.buffers = self.new_buffers()
+        self.files = [open(os.path.join(path, name + '.bin'), 'wb') for name, _, _ in COLUMNS]
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+
+    @staticmethod
+    def new_buffers() -> list:
+        return [array(typecode) for _, typecode, _ in COLUMNS]
+
+
+    def seat_of(self, player: str) -> int:
+        """プレイヤーIDの番号(初めて見たIDには番号を振る)"""
+        if player is None:
+            return NO_SEAT
+        seat = self.seats.get(player)
+        if seat is None:
+            seat = self.seats[player] = len(self.players)
+            self.players.append(player)
+        return seat
+
+
+    def append(self, event: int, seat: int=NO_SEAT, card: int=NO_CARD, color: int=NO_COLOR, value: int=0) -> None:
+        """
+        1行追記する
+
+        Args:
+            event (int): 事象の種類
+            seat (int): プレイヤーの番号
+            card (int): カードの種類
+            color (int): 色の番号
+            value (int): 事象ごとの値
+        """
+        turn, events, seats, cards, colors, values = self.buffers
+        turn.append(self.turn)
+        events.append(event)
+        seats.append(seat)
+        cards.append(card)
+        colors.append(color)
+        values.append(int(value))
+        self.rows += 1
+        if self.rows >= FLUSH_ROWS:
+            self.flush()
+
+
+    def append_card(self, event: int, seat: int, card: dict, color: str=None, value: int=0) -> None:
+        """dictのカードの行を追記する(colorを省略した場合はカードの色)"""
+        self.append(event, seat, encode(card), color_index(color or card.get('color')), value)
+
+
+    def on_event(self, event: str, data: dict) -> None:
+        """
+        受信イベントを行に変換して追記する
+
+        Args:
+            event (str): Socket通信イベント名
+            data (dict): 受信したデータ
+        """
+        if event == SocketConst.EMIT.RECEIVER_CARD:
+            me = self.seat_of(self.me)
+            is_penalty = 1 if data.get('is_penalty') else 0
+            for card in data.get('cards_receive', []):
+                self.append_card(RECEIVE, me, card, value=is_penalty)
+        elif event == SocketConst.EMIT.FIRST_PLAYER:
+            for player in data.get('play_order', []):
+                self.seat_of(player)
+            self.append_card(FIRST, self.seat_of(data.get('first_player')), data['first_card'])
+        elif event == SocketConst.EMIT.PLAY_CARD:
+            card = data['card_play']
+            self.append_card(PLAY, self.seat_of(data.get('player')), card, data.get('color_of_wild'), bool(data.get('yell_uno')))
+        elif event == SocketConst.EMIT.PLAY_DRAW_CARD:
+            if data.get('is_play_card'):
+                card = data['card_play']
+                self.append_card(PLAY_DRAW, self.seat_of(data.get('player')), card, data.get('color_of_wild'), bool(data.get('yell_uno')))
+        elif event == SocketConst.EMIT.DRAW_CARD:
+            self.append(DRAW, self.seat_of(data.get('player')), value=bool(data.get('is_draw')))
+        elif event == SocketConst.EMIT.UPDATE_COLOR:
+            self.append(COLOR, color=color_index(data.get('color')))
+        elif event == SocketConst.EMIT.SHUFFLE_WILD:
+            for player, count in data.get('number_card_of_player', {}).items():
+                self.append(SHUFFLE, self.seat_of(player), value=count)
+            me = self.seat_of(self.me)
+            for card in data.get('cards_receive', []):
+                self.append_card(RECEIVE, me, card, value=2)
+        elif event == SocketConst.EMIT.NEXT_PLAYER:
+            card = data.get('card_before')
+            seat = self.seat_of(data.get('next_player'))
+            count = len(data.get('card_of_player', []))
+            if card:
+                self.append_card(NEXT, seat, card, value=count)
+            else:
+                self.append(NEXT, seat, value=count)
+        elif event == SocketConst.EMIT.CHALLENGE:
+            result = 0 if not data.get('is_challenge') else (2 if data.get('is_challenge_success') else 1)
+            self.append(CHALLENGE, self.seat_of(data.get('challenger')), value=result)
+        elif event == SocketConst.EMIT.PUBLIC_CARD:
+            seat = self.seat_of(data.get('card_of_player'))
+            for card in data.get('cards', []):
+                self.append_card(PUBLIC, seat, card)
+        elif event == SocketConst.EMIT.PENALTY:
+            self.append(PENALTY, self.seat_of(data.get('player')), value=data.get('number_card_of_player', 0))
+        elif event == SocketConst.EMIT.FINISH_TURN:
+            if data.get('winner'):
+                self.append(WIN, self.seat_of(data['winner']))
+            for player, score in data.get('score', {}).items():
+                self.append(SCORE, self.seat_of(player), value=score)
+            # 対戦ごとに書き出す
+            self.turn += 1
+            self.flush()
+
+
+    def flush(self) -> None:
+        """溜めた行を書き出しスレッドに渡す(書き出しの完了は待たない)"""
+        if not self.rows:
+            return
+        buffers = self.buffers
+        self.buffers = self.new_buffers()
+        self.rows = 0
+        self.queue.put(buffers)
+
+
+    def write_loop(self) -> None:
+        """書き出しスレッド"""
+        while True:
+            buffers = self.queue.get()
+            if buffers is None:
+                return
+            for buffer, file in zip(buffers, self.files):
+                if sys.byteorder == 'big':
+                    buffer.byteswap()
+                file.write(buffer.tobytes())
+                file.flush()
+
+
+    def close(self) -> None:
+        """残りの行を書き出してファイルを閉じる"""
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        for file in self.files:
+            file.close()
+        meta = {
+            'version': TRACE_VERSION,
+            'columns': [(name, dtype) for name, _, dtype in COLUMNS],
+            'events': EVENT_NAMES,
+            'players': self.players,
+            'me': self.me,
+            'header': self.header,
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+
+class TraceReader:
+    """
+    トレースを読み込む(列ごとのnumpy配列としてメモリマップする)
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): トレースのディレクトリ
+        """
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            # 書き込み中・異常終了したトレース(プレイヤー名は分からない)
+            self.meta = {'version': TRACE_VERSION, 'columns': [(name, dtype) for name, _, dtype in COLUMNS], 'players': [], 'me': None, 'header': {}}
+        if self.meta['version'] != TRACE_VERSION:
+            raise ValueError('Unsupported trace version: {}'.format(self.meta['version']))
+
+        columns = {}
+        for name, dtype in self.meta['columns']:
+            file = os.path.join(path, name + '.bin')
+            if os.path.getsize(file):
+                columns[name] = np.memmap(file, dtype=dtype, mode='r')
+            else:
+                columns[name] = np.zeros(0, dtype=dtype)
+        # 書き込み途中の列があっても全ての列が揃っている行までにする
+        length = min(len(column) for column in columns.values())
+        self.columns = {name: column[:length] for name, column in columns.items()}
+        self.players = self.meta['players']
+
+
+    def __len__(self) -> int:
+        return len(self.columns['turn'])
+
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+    def rows_of(self, event: int) -> np.ndarray:
+        """事象の種類が一致する行の添字"""
+        return np.flatnonzero(self.columns['event'] == event)
+
+
+    def turn_starts(self) -> np.ndarray:
+        """対戦ごとの先頭行の添字"""
+        turn = self.columns['turn']
+        if not len(turn):
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(([0], np.flatnonzero(turn[1:] != turn[:-1]) + 1))
+
+
+    def summary(self) -> list:
+        """事象の種類ごとの行数とプレイヤーごとの合計得点"""
+        lines = ['rows: {}, turns: {}'.format(len(self), len(self.turn_starts()))]
+        counts = np.bincount(self.columns['event'], minlength=len(EVENT_NAMES))
+        lines += ['    {:<10} {}'.format(name, count) for name, count in zip(EVENT_NAMES, counts) if count]
+        rows = self.rows_of(SCORE)
+        if len(rows):
+            scores = np.bincount(self.columns['seat'][rows], weights=self.columns['value'][rows])
+            wins = np.bincount(self.columns['seat'][self.rows_of(WIN)], minlength=len(scores))
+            for seat, (score, win) in enumerate(zip(scores, wins)):
+                name = self.players[seat] if seat < len(self.players) else str(seat)
+                lines.append('    {:<20} score {:>8.0f} wins {}'.format(name, score, win))
+        return lines
+
+
+def convert(log_path: str, trace_path: str) -> int:
+    """
+    replay.pyのログをトレースに変換する
+
+    Args:
+        log_path (str): ログのパス
+        trace_path (str): トレースのディレクトリ
+    Returns:
+        int: 変換した受信イベント数
+    """
+    from replay import read_log, RECEIVE as LOG_RECEIVE, ACK as LOG_ACK
+
+    header, records = read_log(log_path)
+    writer = TraceWriter(trace_path, header)
+    count = 0
+    for kind, event, _, data in records:
+        if kind == LOG_ACK and event == SocketConst.EMIT.JOIN_ROOM:
+            writer.me = data.get('your_id')
+        elif kind == LOG_RECEIVE:
+            writer.on_event(event, data)
+            count += 1
+    writer.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar trace of match events')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parser_convert = subparsers.add_parser('convert', help='Convert a match log of replay.py into a trace')
+    parser_convert.add_argument('log', action='store', type=str, help='Path of the match log')
+    parser_convert.add_argument('trace', action='store', type=str, help='Directory of the trace')
+    parser_summary = subparsers.add_parser('summary', help='Print the event counts and scores of a trace')
+    parser_summary.add_argument('trace', action='store', type=str, help='Directory of the trace')
+    args = parser.parse_args(sys.argv[1:])
+
+    start = time.perf_counter()
+    if args.command == 'convert':
+        count = convert(args.log, args.trace)
+        print('converted {} events in {:.2f} sec'.format(count, time.perf_counter() - start))
+    else:
+        reader = TraceReader(args.trace)
+        for line in reader.summary():
+            print(line)
+        print('{:.3f} sec'.format(time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import math
+
+
+"""
+処理時間の計測
+
+イベントごとの処理時間・判断時間・送信の往復時間を固定長のヒストグラムに記録し、
+試合終了時にパーセンタイル(p50/p95/p99)を出力する
+ヒストグラムは対数間隔の階級で持つため、記録の回数に関係なくメモリ使用量は一定になる
+"""
+MIN_LATENCY = 1e-6 # 記録する最小の時間(秒) これより短い時間は最初の階級に入れる
+MAX_LATENCY = 100.0 # 記録する最大の時間(秒) これより長い時間は最後の階級に入れる
+BUCKETS_PER_DECADE = 20 # 1桁あたりの階級数(階級の幅は約12%)
+PERCENTILES = [50, 95, 99] # 出力するパーセンタイル
+
+
+class LatencyHistogram:
+    """
+    対数間隔の階級を持つ固定長のヒストグラム
+    """
+    NUM_BUCKETS = int(round(math.log10(MAX_LATENCY / MIN_LATENCY) * BUCKETS_PER_DECADE)) + 1
+
+    def __init__(self) -> None:
+        self.buckets = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+    def record(self, seconds: float) -> None:
+        """
+        時間を記録する
+
+        Args:
+            seconds (float): 秒
+        """
+        if seconds <= MIN_LATENCY:
+            index = 0
+        else:
+            index = min(self.NUM_BUCKETS - 1, int(math.log10(seconds / MIN_LATENCY) * BUCKETS_PER_DECADE) + 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+    def percentile(self, p: float) -> float:
+        """
+        パーセンタイルを求める(該当する階級の上限を返すため、最大で階級の幅だけ大きくなる)
+
+        Args:
+            p (float): 0〜100
+        Returns:
+            float: 秒 (記録がない場合はnan)
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = max(1, math.ceil(self.count * p / 100))
+        cumulative = 0
+        for index, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= rank:
+                return min(self.max, MIN_LATENCY * 10 ** (index / BUCKETS_PER_DECADE))
+        return self.max
+
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+
+class Metrics:
+    """
+    名前ごとのヒストグラムの集まり
+    名前は '種類:イベント名' とする (handler: 受信処理, callback: 送信の応答処理, ack: 送信の往復時間, decision: 判断処理, speculation: 使えた先読みの時間)
+    """
+    def __init__(self) -> None:
+        self.histograms = {}
+
+
+    def record(self, name: str, seconds: float) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(seconds)
+
+
+    def report(self) -> list:
+        """
+        パーセンタイルの一覧
+
+        Returns:
+            list: 名前ごとの1行の文字列(ミリ秒)
+        """
+        lines = []
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            values = ' '.join('p{}={:.3f}'.format(p, histogram.percentile(p) * 1000) for p in PERCENTILES)
+            lines.append('{:<36} n={:<6} {} max={:.3f} (ms)'.format(name, histogram.count, values, histogram.max * 1000))
+        return lines
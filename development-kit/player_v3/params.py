@@ -0,0 +1,79 @@
+"""
+戦略の閾値
+
+strategy.pyの判断に使う閾値を1つのオブジェクトにまとめる
+Statusが対戦ごとに持ち(Status.params)、strategy.pyの関数はgame_status.paramsから読む
+既定値は従来のstrategy.pyに書かれていた値で、tuner.pyで探索する範囲はSEARCH_SPACEで決める
+"""
+DEFAULTS = {
+    # チャレンジ(challenge_dicision)
+    'challenge_hand_size': 6, # 直前のプレイヤーの手札がこの枚数以上かでチャレンジの確率の閾値を変える
+    'challenge_p_large': 0.6, # 手札が多い相手にチャレンジする、出せるカードを持っている確率の下限
+    'challenge_p_small': 0.9, # 手札が少ない相手にチャレンジする、出せるカードを持っている確率の下限
+    'challenge_success_floor': 0.3, # チャレンジ成功率がこの値以下の相手にはチャレンジしない
+    # ワイルドドロー4を出すか(play_draw4_dicision)
+    'draw4_hand_size': 6, # 自分の手札がこの枚数以上かで出す確率の閾値を変える
+    'draw4_p_large': 0.5, # 手札が多い時に出す、他の出せるカードを持っている確率の上限
+    'draw4_p_small': 0.8, # 手札が少ない時に出す、他の出せるカードを持っている確率の上限
+    'draw4_challenge_rate_high': 0.9, # 次のプレイヤーのチャレンジ率がこの値以上なら出さない
+    'draw4_challenge_rate_low': 0.05, # 次のプレイヤーのチャレンジ率がこの値以下なら出す
+    'draw4_challenged_success': 0.8, # 次のプレイヤーのチャレンジ成功率がこの値以上なら出さない
+    # チャレンジ率・成功率を使い始めるまでの対戦数
+    'warmup_games': 300,
+    # 戦況の判断(analyze_situation)
+    'offensive_hand_size': 5, # 自分の手札がこの枚数未満なら攻撃
+    'danger_hand_size': 5, # 他のプレイヤーの最少手札がこの枚数未満なら防御を考える
+    'hand_gap': 5, # 最少手札との差がこの枚数未満なら、最少手札が2枚の時だけ防御
+    'defensive_gap': 8, # 最少手札との差がこの枚数以上なら防御
+}
+
+# tuner.pyで探索する範囲 (下限, 上限) 整数の閾値は整数で探索する
+SEARCH_SPACE = {
+    'challenge_hand_size': (3, 10),
+    'challenge_p_large': (0.3, 1.0),
+    'challenge_p_small': (0.5, 1.0),
+    'challenge_success_floor': (0.0, 0.6),
+    'draw4_hand_size': (3, 10),
+    'draw4_p_large': (0.2, 1.0),
+    'draw4_p_small': (0.4, 1.0),
+    'warmup_games': (0, 500),
+    'offensive_hand_size': (2, 8),
+    'danger_hand_size': (2, 8),
+    'hand_gap': (2, 10),
+    'defensive_gap': (4, 15),
+}
+
+
+class StrategyParams:
+    """
+    戦略の閾値 (属性名はDEFAULTSのキー)
+    """
+    def __init__(self, **kwargs) -> None:
+        """
+        Args:
+            kwargs: 既定値から変更する閾値
+        """
+        unknown = set(kwargs) - set(DEFAULTS)
+        if unknown:
+            raise ValueError('Unknown parameters: {}'.format(', '.join(sorted(unknown))))
+        for name, value in DEFAULTS.items():
+            setattr(self, name, kwargs.get(name, value))
+
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in DEFAULTS}
+
+
+    def replace(self, **kwargs) -> 'StrategyParams':
+        """一部の閾値を変更した複製を返す"""
+        values = self.to_dict()
+        values.update(kwargs)
+        return StrategyParams(**values)
+
+
+    def __repr__(self) -> str:
+        changed = ['{}={!r}'.format(name, value) for name, value in self.to_dict().items() if value != DEFAULTS[name]]
+        return 'StrategyParams({})'.format(', '.join(changed))
+
+
+DEFAULT_PARAMS = StrategyParams()
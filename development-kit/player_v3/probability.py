@@ -0,0 +1,55 @@
+import math
+
+
+"""
+確率計算用のテーブル
+"""
+MAX_N = 112 # 全カードの枚数
+MAX_X = 25 # 手札の最大枚数
+
+
+def build_miss_table(max_n: int=MAX_N, max_x: int=MAX_X) -> list:
+    """
+    comb(n - k, x) / comb(n, x) の表を作成する
+    整数同士の割り算で求めるため、math.combで都度計算した値と一致する
+    1要素ずつ参照するため、numpyの配列ではなく入れ子のリストにする(numpyのスカラー参照より速い)
+
+    Args:
+        max_n (int): nの最大値
+        max_x (int): xの最大値
+    Returns:
+        list: table[n][k][x]の入れ子のリスト (max_n + 1) x (max_n + 1) x (max_x + 1) (k > n または x > n の要素はnan)
+    """
+    combs = [[math.comb(n, x) for x in range(max_x + 1)] for n in range(max_n + 1)]
+    empty = [math.nan] * (max_x + 1)
+    table = []
+    for n in range(max_n + 1):
+        comb_n = combs[n]
+        rows = [[combs[n - k][x] / comb_n[x] if comb_n[x] else math.nan for x in range(max_x + 1)] for k in range(n + 1)]
+        rows += [empty] * (max_n - n)
+        table.append(rows)
+
+    return table
+
+
+# 起動時に1度だけ作成する
+MISS_TABLE = build_miss_table()
+
+
+def miss_probability(n: int, k: int, x: int) -> float:
+    """
+    n枚の中に当たりがk枚あるとき、x枚引いて当たりを1枚も引かない確率
+    comb(n - k, x) / comb(n, x)
+
+    表の範囲外の場合はmath.combで計算する(負の枚数などはmath.combと同じく例外になる)
+
+    Args:
+        n (int): 全体の枚数
+        k (int): 当たりの枚数
+        x (int): 引く枚数
+    Returns:
+        float:
+    """
+    if 0 <= k <= n <= MAX_N and 0 <= x <= MAX_X and x <= n:
+        return MISS_TABLE[n][k][x]
+    return math.comb(n - k, x) / math.comb(n, x)
@@ -0,0 +1,240 @@
+import argparse
+import gzip
+import json
+import struct
+import sys
+import threading
+import time
+from consts import SocketConst
+from agent import Agent
+from engine import HANDLERS
+from metrics import Metrics
+from params import StrategyParams
+from selector import create_selector
+
+
+"""
+試合の記録と再生
+
+記録(Recorder): player_v3.pyの受信イベント・送信・送信の応答を、起きた順にバイナリのログに書き出す
+再生(Replayer): ログの受信イベントと応答をSocket通信なしでAgentの処理にそのまま渡し、
+              Agentの送信が記録と一致するか比べ、イベントごとの処理時間を測る
+
+ログの形式(全体をgzipで圧縮する)
+    ファイルヘッダ: MAGIC, 形式の版(1byte), ヘッダ(JSON)の長さ(4byte), ヘッダ(JSON: シード・プレイヤー名・戦略の設定など)
+    レコード: 種類(1byte), イベント番号(1byte), 記録開始からの時間(µs, 8byte), 内容(JSON)の長さ(4byte), 内容(JSON)
+
+乱数シード(--seed)を指定し、think_timeが0(プレイアウトによる改善なし)であれば、
+再生したAgentの送信は記録と一致する(思考時間で打ち切るプレイアウトは時間に依存するため一致しない)
+
+例) python player_v3.py http://localhost:8080 "Dealer 1" "Player 1" --seed 1 --record match.log
+    python replay.py match.log --repeat 100
+"""
+MAGIC = b'UNOLOG'
+LOG_VERSION = 1
+RECORD_HEADER = struct.Struct('<BBQI') # 種類, イベント番号, 時間(µs), 内容の長さ
+FILE_HEADER = struct.Struct('<BI') # 形式の版, ヘッダの長さ
+
+# レコードの種類
+RECEIVE = 0 # 受信イベント
+SEND = 1 # 送信
+ACK = 2 # 送信の応答
+ERROR = 3 # 送信のエラー応答
+KIND_NAMES = {RECEIVE: 'receive', SEND: 'send', ACK: 'ack', ERROR: 'error'}
+
+# イベント名 <-> イベント番号 (表にないイベントはOTHER_EVENTとし、内容を[イベント名, 内容]にする)
+EVENTS = [value for name, value in vars(SocketConst.EMIT).items() if not name.startswith('_')]
+EVENT_INDEX = {event: i for i, event in enumerate(EVENTS)}
+OTHER_EVENT = 255
+
+
+def encode_payload(data: any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class Recorder:
+    """
+    受信イベント・送信・応答をログに書き出す(どのスレッドからでも呼び出せる)
+    """
+    def __init__(self, path: str, header: dict) -> None:
+        """
+        Args:
+            path (str): ログのパス
+            header (dict): 再生に必要な設定(seed, player, room_name, version, think_time, selector, params)
+        """
+        self.file = gzip.open(path, 'wb')
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        data = encode_payload(header)
+        self.file.write(MAGIC + FILE_HEADER.pack(LOG_VERSION, len(data)) + data)
+
+
+    def record(self, kind: int, event: str, data: any) -> None:
+        """
+        1件記録する
+
+        Args:
+            kind (int): RECEIVE, SEND, ACK, ERROR
+            event (str): Socket通信イベント名
+            data (any): 内容(JSONに変換できる値)
+        """
+        elapsed = int((time.perf_counter() - self.start) * 1e6)
+        index = EVENT_INDEX.get(event, OTHER_EVENT)
+        payload = encode_payload(data if index != OTHER_EVENT else [event, data])
+        with self.lock:
+            self.file.write(RECORD_HEADER.pack(kind, index, elapsed, len(payload)) + payload)
+            if event == SocketConst.EMIT.FINISH_TURN:
+                # 対戦ごとに書き出し、途中で終了してもそれまでの対戦は再生できるようにする
+                self.file.flush()
+
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+
+def read_log(path: str) -> tuple:
+    """
+    ログを読み込む
+
+    Args:
+        path (str): ログのパス
+    Returns:
+        tuple: (ヘッダ, [(種類, イベント名, 時間(µs), 内容)])
+    """
+    with gzip.open(path, 'rb') as f:
+        buffer = f.read()
+
+    if not buffer.startswith(MAGIC):
+        raise ValueError('Not a match log: {}'.format(path))
+    offset = len(MAGIC)
+    version, length = FILE_HEADER.unpack_from(buffer, offset)
+    if version != LOG_VERSION:
+        raise ValueError('Unsupported log version: {}'.format(version))
+    offset += FILE_HEADER.size
+    header = json.loads(buffer[offset:offset + length])
+    offset += length
+
+    records = []
+    size = RECORD_HEADER.size
+    end = len(buffer)
+    while offset + size <= end:
+        kind, index, elapsed, length = RECORD_HEADER.unpack_from(buffer, offset)
+        offset += size
+        if offset + length > end:
+            # 書き込み途中で終了したレコードは捨てる
+            break
+        data = json.loads(buffer[offset:offset + length])
+        offset += length
+        if index == OTHER_EVENT:
+            event, data = data
+        else:
+            event = EVENTS[index]
+        records.append((kind, event, elapsed, data))
+    return header, records
+
+
+class Replayer:
+    """
+    記録した受信イベント・応答をAgentに渡して試合を再生する
+    """
+    def __init__(self, header: dict, records: list, think_time: int=None) -> None:
+        """
+        Args:
+            header (dict): ログのヘッダ
+            records (list): ログのレコード
+            think_time (int): 1手あたりの思考時間(ms) Noneの場合は記録時の設定
+        """
+        self.header = header
+        self.records = records
+        self.think_time = header.get('think_time', 0) if think_time is None else think_time
+
+
+    def run(self) -> dict:
+        """
+        1回再生する
+
+        Returns:
+            dict: {'events': 受信イベント数, 'sent': 送信数, 'mismatch': 記録と異なる送信の数,
+                   'first_mismatch': 最初に異なった送信 (記録, 再生), 'elapsed': 処理時間(秒), 'metrics': Metrics}
+        """
+        header = self.header
+        seed = header.get('seed')
+        metrics = Metrics()
+        pending = {} # イベント名 -> 応答待ちのコールバック(送信順)
+        sent = [] # 再生したAgentの送信
+
+        def send_event(event, data, callback=None):
+            sent.append((event, json.loads(encode_payload(data))))
+            pending.setdefault(event, []).append(callback)
+
+        agent = Agent(send_event, version=header.get('version'), time_delay=0, think_time=self.think_time, seed=seed,
+                      metrics=metrics, selector=create_selector(header.get('selector', 'ladder'), seed=seed),
+                      params=StrategyParams(**header.get('params', {})))
+        send_event(SocketConst.EMIT.JOIN_ROOM, {'room_name': header.get('room_name'), 'player': header.get('player')}, agent.join_room_callback)
+
+        expected = []
+        events = 0
+        start = time.perf_counter()
+        for kind, event, _, data in self.records:
+            if kind == RECEIVE:
+                handler = getattr(agent, HANDLERS.get(event, ''), None)
+                events += 1
+                if handler is not None:
+                    handled = time.perf_counter()
+                    handler(data)
+                    metrics.record('handler:' + event, time.perf_counter() - handled)
+            elif kind == SEND:
+                expected.append((event, data))
+            else:
+                callbacks = pending.get(event)
+                callback = callbacks.pop(0) if callbacks else None
+                if kind == ACK and callback is not None:
+                    callback(data)
+        elapsed = time.perf_counter() - start
+
+        mismatch = sum(1 for a, b in zip(expected, sent) if a != b) + abs(len(expected) - len(sent))
+        first_mismatch = next(((a, b) for a, b in zip(expected, sent) if a != b), None)
+        return {
+            'events': events,
+            'sent': len(sent),
+            'mismatch': mismatch,
+            'first_mismatch': first_mismatch,
+            'elapsed': elapsed,
+            'metrics': metrics,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded match through the player without sockets')
+    parser.add_argument('log', action='store', type=str, help='Path of the match log')
+    parser.add_argument('-r', '--repeat', action='store', type=int, default=1, help='Number of replays (for profiling)')
+    parser.add_argument('--think_time', action='store', type=int, default=None, help='Max thinking time per move in ms (default: as recorded)')
+    parser.add_argument('--dump', action='store_true', help='Print the records instead of replaying')
+    args = parser.parse_args(sys.argv[1:])
+
+    header, records = read_log(args.log)
+    if args.dump:
+        print(json.dumps(header, ensure_ascii=False))
+        for kind, event, elapsed, data in records:
+            print('{:>12.3f} {:<7} {:<20} {}'.format(elapsed / 1000, KIND_NAMES[kind], event, json.dumps(data, ensure_ascii=False)))
+        return
+
+    replayer = Replayer(header, records, args.think_time)
+    total = 0.0
+    for i in range(args.repeat):
+        result = replayer.run()
+        total += result['elapsed']
+        if result['mismatch']:
+            print('replay {}: {} of {} sends differ from the record, first: {}'.format(i + 1, result['mismatch'], result['sent'], result['first_mismatch']))
+
+    recorded = records[-1][2] / 1e6 if records else 0.0
+    print('records: {}, events: {}, sends: {}, recorded: {:.1f} sec'.format(len(records), result['events'], result['sent'], recorded))
+    print('replays: {}, {:.3f} sec per replay ({:.0f} events/sec)'.format(args.repeat, total / args.repeat, result['events'] * args.repeat / total if total else 0.0))
+    # 最後の再生の処理時間の分布
+    for line in result['metrics'].report():
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
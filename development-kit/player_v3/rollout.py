@@ -0,0 +1,266 @@
+import random
+import numpy as np
+from card import NUM_KINDS_OF_COLOR, NUM_CARD_KINDS, WILD, WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD, CARD_NUMBER, NO_COLOR, NO_KIND, PLAYABLE_MASK
+from consts import Special, ARR_COLOR
+from status import CARD_CELL
+
+
+"""
+確定化したプレイアウトによる手の評価
+
+見えていない札を他のプレイヤーの手札と山札に無作為に配り(確定化)、
+全員が簡易な方策で対戦終了まで進めたときの自分の得点を求める
+
+簡略化しているルール
+    チャレンジは行わない
+    白いワイルドは次のプレイヤーが2枚引いてスキップされるものとする
+    UNO宣言漏れの指摘は行わない
+"""
+MAX_STEP = 200 # プレイアウトの最大手数(超えた場合は勝者なしとして得点を計算する)
+
+DRAW_2_KIND = 10
+SKIP_KIND = 11
+REVERSE_KIND = 12
+
+# カードごとの点数
+CARD_SCORE = tuple(
+    CARD_NUMBER[card] if CARD_NUMBER[card] is not None else
+    50 if card in (WILD, WILD_DRAW_4) else
+    40 if card in (WILD_SHUFFLE, WHITE_WILD) else
+    20
+    for card in range(NUM_CARD_KINDS)
+)
+_CELL_INDEX = np.array(CARD_CELL) # カード -> cards_statusの要素番号
+_CARD_IDS = np.arange(NUM_CARD_KINDS)
+_COLOR_INDEX = {color: i for i, color in enumerate(ARR_COLOR)}
+_KIND_OF_SPECIAL = {Special.DRAW_2: DRAW_2_KIND, Special.SKIP: SKIP_KIND, Special.REVERSE: REVERSE_KIND}
+
+
+def top_of(card: dict) -> tuple:
+    """
+    場札(dict)をプレイアウトで扱う(色, 種類)に変換する
+
+    Args:
+        card (dict): 場札のカード
+    Returns:
+        tuple: (色の番号 or NO_COLOR, 0〜12の種類 or NO_KIND)
+    """
+    color = _COLOR_INDEX.get(card.get('color'), NO_COLOR)
+    number = card.get('number')
+    if number is not None:
+        return color, int(number)
+    return color, _KIND_OF_SPECIAL.get(card.get('special'), NO_KIND)
+
+
+def playable_mask(top_color: int, top_kind: int) -> int:
+    """場札の(色, 種類)に対して出せるカードの種類のビットマスク(card.PLAYABLE_MASK)"""
+    return PLAYABLE_MASK[top_color * (NO_KIND + 1) + top_kind]
+
+
+def is_playable(card: int, top_color: int, top_kind: int) -> bool:
+    """場札に対して出せるカードであるかを判定する"""
+    return playable_mask(top_color, top_kind) >> card & 1 == 1
+
+
+def playable_cards(cards: list, top_color: int, top_kind: int) -> list:
+    """出せるカードの種類を重複なしで返す"""
+    mask = playable_mask(top_color, top_kind)
+    return sorted({card for card in cards if mask >> card & 1})
+
+
+def unseen_cards(cards_status: np.ndarray) -> np.ndarray:
+    """cards_statusから見えていない札をカードの種類の配列に展開する"""
+    counts = np.maximum(cards_status.reshape(-1)[_CELL_INDEX], 0)
+    return np.repeat(_CARD_IDS, counts)
+
+
+def determinize(pool: list, my_cards: list, card_counts: list, open_cards: list, rng: any) -> tuple:
+    """
+    見えていない札を他のプレイヤーの手札と山札に無作為に配る
+
+    Args:
+        pool (list): 見えていない札
+        my_cards (list): 自分の手札
+        card_counts (list): 手番順(自分の次から)の他のプレイヤーの手札枚数
+        open_cards (list): 手番順の他のプレイヤーの公開済みの手札
+        rng (random.Random): 乱数生成器
+    Returns:
+        tuple: (手番順(自分が先頭)の手札のリスト, 山札)
+    """
+    pool = list(pool)
+    rng.shuffle(pool)
+    hands = [list(my_cards)]
+    for count, known in zip(card_counts, open_cards):
+        hand = []
+        for card in known:
+            # 公開済みの手札は確定で持たせる
+            if card in pool and len(hand) < count:
+                pool.remove(card)
+                hand.append(card)
+        rest = count - len(hand)
+        hand += pool[:rest]
+        del pool[:rest]
+        hands.append(hand)
+    return hands, pool
+
+
+def simulate_round(pool: list, my_cards: list, card_counts: list, open_cards: list, top_color: int, top_kind: int, moves: list, rng: any) -> list:
+    """
+    1回の確定化で全ての候補手を同じ乱数列でプレイアウトする(共通乱数法)
+
+    Args:
+        pool (list): 見えていない札
+        my_cards (list): 自分の手札
+        card_counts (list): 手番順(自分の次から)の他のプレイヤーの手札枚数
+        open_cards (list): 手番順の他のプレイヤーの公開済みの手札
+        top_color (int): 場札の色
+        top_kind (int): 場札の種類
+        moves (list): 候補手(Noneは山札から引く)
+        rng (random.Random): 乱数生成器
+    Returns:
+        list: 候補手ごとの自分の得点
+    """
+    hands, deck = determinize(pool, my_cards, card_counts, open_cards, rng)
+    seed = rng.random()
+    rewards = []
+    for move in moves:
+        rewards.append(playout([list(hand) for hand in hands], list(deck), top_color, top_kind, move, random.Random(seed))[0])
+    return rewards
+
+
+def choose_color(hand: list) -> int:
+    """手札で一番多い色を選ぶ"""
+    counts = [0] * len(ARR_COLOR)
+    for card in hand:
+        if card < WILD:
+            counts[card // NUM_KINDS_OF_COLOR] += 1
+    return counts.index(max(counts))
+
+
+def choose_card(hand: list, top_color: int, top_kind: int) -> any:
+    """
+    プレイアウト中の方策: 出せるカードのうち点数の高いものから出す(ワイルド系は最後に回す)
+
+    Returns:
+        int: 出すカード(出せるカードがない場合はNone)
+    """
+    mask = playable_mask(top_color, top_kind)
+    best = None
+    best_key = None
+    for card in hand:
+        if not mask >> card & 1:
+            continue
+        key = (card < WILD, CARD_SCORE[card])
+        if best_key is None or key > best_key:
+            best = card
+            best_key = key
+    return best
+
+
+def hand_score(hand: list) -> int:
+    return sum(CARD_SCORE[card] for card in hand)
+
+
+def playout(hands: list, deck: list, top_color: int, top_kind: int, first_card: any, rng: any, max_step: int=MAX_STEP) -> list:
+    """
+    確定化した盤面で対戦終了まで進める
+    先頭のプレイヤー(自分)はfirst_cardを出し、以降は全員choose_cardの方策で進める
+
+    Args:
+        hands (list): 手番順の手札のリスト(書き換えられる)
+        deck (list): 山札(書き換えられる)
+        top_color (int): 場札の色
+        top_kind (int): 場札の種類
+        first_card (int): 自分が最初に出すカード(Noneの場合は山札から引く)
+        rng (random.Random): 乱数生成器
+        max_step (int): 最大手数
+    Returns:
+        list: 手番順の得点
+    """
+    num = len(hands)
+    discard = []
+    seat = 0
+    step = 1
+    card = first_card
+    decided = True
+
+    for _ in range(max_step):
+        hand = hands[seat]
+        if not decided:
+            card = choose_card(hand, top_color, top_kind)
+        decided = False
+
+        if card is None:
+            # 出せるカードがない場合は1枚引き、出せるならそのまま出す
+            if not deck:
+                deck = discard
+                discard = []
+                rng.shuffle(deck)
+            if deck:
+                drawn = deck.pop()
+                hand.append(drawn)
+                if is_playable(drawn, top_color, top_kind):
+                    card = drawn
+            if card is None:
+                seat = (seat + step) % num
+                continue
+
+        hand.remove(card)
+        discard.append(card)
+        if not hand:
+            # 上がり
+            scores = [-hand_score(h) for h in hands]
+            scores[seat] = -sum(scores)
+            return scores
+
+        skip = False
+        penalty = 0
+        if card >= WILD:
+            if card != WHITE_WILD:
+                top_color = choose_color(hand)
+            top_kind = NO_KIND
+            if card == WILD_DRAW_4:
+                penalty = 4
+            elif card == WHITE_WILD:
+                penalty = 2
+            elif card == WILD_SHUFFLE:
+                shuffle_hands(hands, seat, step, rng)
+                top_color = choose_color(hands[seat]) if hands[seat] else top_color
+        else:
+            top_color = card // NUM_KINDS_OF_COLOR
+            top_kind = card % NUM_KINDS_OF_COLOR
+            if top_kind == DRAW_2_KIND:
+                penalty = 2
+            elif top_kind == SKIP_KIND:
+                skip = True
+            elif top_kind == REVERSE_KIND:
+                step = -step
+
+        if penalty:
+            target = hands[(seat + step) % num]
+            for _ in range(penalty):
+                if not deck:
+                    deck = discard
+                    discard = []
+                    rng.shuffle(deck)
+                if deck:
+                    target.append(deck.pop())
+            skip = True
+        seat = (seat + step * (2 if skip else 1)) % num
+
+    # 手数の上限に達した場合は勝者なし
+    return [-hand_score(h) for h in hands]
+
+
+def shuffle_hands(hands: list, seat: int, step: int, rng: any) -> None:
+    """シャッフルワイルドによる手札の再配布(次のプレイヤーから順に1枚ずつ配る)"""
+    num = len(hands)
+    cards = []
+    for hand in hands:
+        cards += hand
+    rng.shuffle(cards)
+    order = [(seat + step * i) % num for i in range(1, num + 1)]
+    for i in order:
+        hands[i][:] = []
+    for i, card in enumerate(cards):
+        hands[order[i % num]].append(card)
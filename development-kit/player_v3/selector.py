@@ -0,0 +1,167 @@
+import math
+import random
+
+
+"""
+対戦ごとに使用する戦略のバージョンを選ぶ選択器
+
+どの選択器も select() で次の対戦のバージョンを選び、update() で対戦の得点を受け取る
+1対戦あたり数µsで動くよう、バージョンごとの対戦数と得点の合計だけを持つ
+"""
+STRATEGY_VERSIONS = ['v2', 'v3'] # player_v3で選べる戦略のバージョン
+SCORE_SCALE = 300 # 1対戦の得点のばらつきの目安(UCB1の探索項・Thompson samplingの事前分布に使う)
+
+
+class LadderSelector:
+    """
+    これまでの対戦数と得点の合計の閾値で 'v2' か 'v3' を選ぶ(従来の選び方)
+    """
+    def __init__(self) -> None:
+        self.num_game = 0
+        self.scores = {'v2': 0, 'v3': 0}
+
+
+    def select(self) -> str:
+        num_game = self.num_game
+        score_v2 = self.scores['v2']
+        score_v3 = self.scores['v3']
+        self.num_game += 1
+
+        if num_game < 300:
+            if score_v2 < -1300 and score_v2 < score_v3:
+                return 'v3'
+            else:
+                return 'v2'
+        elif num_game < 500:
+            if score_v2 < -200:
+                if num_game < 400 and score_v3 > -500:
+                    return 'v3'
+                elif score_v3 > -300:
+                    return 'v3'
+                elif score_v2 < -1000 and score_v2 < score_v3:
+                    return 'v3'
+                else:
+                    return 'v2'
+            else:
+                return 'v2'
+        else:
+            if score_v2 < score_v3:
+                return 'v3'
+            else:
+                return 'v2'
+
+
+    def update(self, version: str, score: int) -> None:
+        self.scores[version] += score
+
+
+class UCB1Selector:
+    """
+    UCB1: 平均得点 + scale * sqrt(2 ln(総対戦数) / 対戦数) が最大のバージョンを選ぶ
+    まだ使っていないバージョンがあれば先に使う
+    """
+    def __init__(self, versions: list=STRATEGY_VERSIONS, scale: float=SCORE_SCALE) -> None:
+        """
+        Args:
+            versions (list): 選ぶバージョン
+            scale (float): 探索項の大きさ(得点の単位)
+        """
+        self.versions = list(versions)
+        self.scale = scale
+        self.counts = [0] * len(self.versions)
+        self.totals = [0.0] * len(self.versions)
+        self.num_game = 0
+        self.index = {version: i for i, version in enumerate(self.versions)}
+
+
+    def select(self) -> str:
+        counts = self.counts
+        for i, n in enumerate(counts):
+            if n == 0:
+                return self.versions[i]
+
+        log_total = 2 * math.log(self.num_game)
+        totals = self.totals
+        scale = self.scale
+        best = 0
+        best_value = -math.inf
+        for i, n in enumerate(counts):
+            value = totals[i] / n + scale * math.sqrt(log_total / n)
+            if value > best_value:
+                best = i
+                best_value = value
+        return self.versions[best]
+
+
+    def update(self, version: str, score: int) -> None:
+        i = self.index[version]
+        self.counts[i] += 1
+        self.totals[i] += score
+        self.num_game += 1
+
+
+class ThompsonSelector:
+    """
+    Thompson sampling: 平均得点の事後分布(正規分布)から1つずつ引き、最大のバージョンを選ぶ
+    事前分布は平均0、1対戦の得点の標準偏差はscaleとする
+    """
+    def __init__(self, versions: list=STRATEGY_VERSIONS, scale: float=SCORE_SCALE, seed: int=None) -> None:
+        """
+        Args:
+            versions (list): 選ぶバージョン
+            scale (float): 1対戦の得点の標準偏差
+            seed (int): 乱数シード
+        """
+        self.versions = list(versions)
+        self.scale = scale
+        self.counts = [0] * len(self.versions)
+        self.totals = [0.0] * len(self.versions)
+        self.index = {version: i for i, version in enumerate(self.versions)}
+        self.rng = random.Random(seed)
+
+
+    def select(self) -> str:
+        gauss = self.rng.gauss
+        scale = self.scale
+        best = 0
+        best_value = -math.inf
+        for i, n in enumerate(self.counts):
+            # 事前分布を1対戦分の重みで持たせる(対戦数0でも分散が有限になる)
+            value = gauss(self.totals[i] / (n + 1), scale / math.sqrt(n + 1))
+            if value > best_value:
+                best = i
+                best_value = value
+        return self.versions[best]
+
+
+    def update(self, version: str, score: int) -> None:
+        i = self.index[version]
+        self.counts[i] += 1
+        self.totals[i] += score
+
+
+SELECTORS = {
+    'ladder': LadderSelector,
+    'ucb1': UCB1Selector,
+    'thompson': ThompsonSelector,
+}
+
+
+def create_selector(name: str, versions: list=STRATEGY_VERSIONS, seed: int=None) -> any:
+    """
+    名前から選択器を作る
+
+    Args:
+        name (str): 'ladder', 'ucb1', 'thompson'
+        versions (list): 選ぶバージョン('ladder'は'v2'と'v3'のみ)
+        seed (int): 乱数シード('thompson'のみ)
+    Returns:
+        選択器
+    """
+    if name == 'ladder':
+        return LadderSelector()
+    if name == 'ucb1':
+        return UCB1Selector(versions)
+    if name == 'thompson':
+        return ThompsonSelector(versions, seed=seed)
+    raise ValueError('Unknown selector: {}'.format(name))
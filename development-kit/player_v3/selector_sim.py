@@ -0,0 +1,91 @@
+import argparse
+import math
+import random
+import sys
+import time
+from selector import SELECTORS, create_selector
+
+
+"""
+バージョン選択器のシミュレーション
+
+バージョンごとの1対戦の得点を正規分布(平均はバージョンごと、標準偏差は共通)とみなし、
+1000対戦の試合を何度も行って、選択器ごとの後悔(最良のバージョンを使い続けた場合との期待得点の差)を比べる
+
+例) python selector_sim.py --means v2=0 v3=30 --matches 1000
+"""
+DEFAULT_SCENARIOS = [ # --meansを指定しない場合に比べる、バージョンごとの1対戦の平均得点
+    {'v2': 0, 'v3': 0},
+    {'v2': 30, 'v3': 0},
+    {'v2': 0, 'v3': 30},
+    {'v2': 0, 'v3': 100},
+]
+
+
+def run_match(selector: any, means: dict, stdev: float, num_games: int, rng: random.Random) -> float:
+    """
+    1試合を行い、後悔を返す
+
+    Args:
+        selector (any): 選択器
+        means (dict): バージョン -> 1対戦の平均得点
+        stdev (float): 1対戦の得点の標準偏差
+        num_games (int): 1試合の対戦数
+        rng (random.Random): 得点の乱数生成器
+    Returns:
+        float: 後悔(最良のバージョンの平均得点 * 対戦数 - 選んだバージョンの平均得点の合計)
+    """
+    best = max(means.values())
+    regret = 0.0
+    for _ in range(num_games):
+        version = selector.select()
+        mean = means[version]
+        regret += best - mean
+        selector.update(version, round(rng.gauss(mean, stdev)))
+    return regret
+
+
+def parse_means(items: list) -> dict:
+    """['v2=0', 'v3=30'] -> {'v2': 0.0, 'v3': 30.0}"""
+    means = {}
+    for item in items:
+        version, value = item.split('=', 1)
+        means[version] = float(value)
+    return means
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure regret of version selectors')
+    parser.add_argument('--means', action='store', nargs='+', type=str, default=None, help='Mean score per game of each version (e.g. v2=0 v3=30)')
+    parser.add_argument('--stdev', action='store', type=float, default=300, help='Standard deviation of the score per game')
+    parser.add_argument('--selectors', action='store', nargs='+', type=str, default=list(SELECTORS), choices=list(SELECTORS), help='Selectors to compare')
+    parser.add_argument('-m', '--matches', action='store', type=int, default=1000, help='Number of matches per selector')
+    parser.add_argument('-g', '--games', action='store', type=int, default=1000, help='Number of games per match')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=0, help='Random seed')
+    args = parser.parse_args(sys.argv[1:])
+
+    scenarios = [parse_means(args.means)] if args.means else DEFAULT_SCENARIOS
+    for means in scenarios:
+        print('means: {}, stdev: {}'.format(' '.join('{}={:g}'.format(k, v) for k, v in means.items()), args.stdev))
+        for name in args.selectors:
+            if name == 'ladder' and set(means) != {'v2', 'v3'}:
+                # 閾値による選択はv2とv3の2つにしか使えない
+                continue
+            # 得点の乱数は選択器の間で共通にする
+            rng = random.Random(args.seed)
+            regrets = []
+            start = time.perf_counter()
+            for match in range(args.matches):
+                selector = create_selector(name, list(means), seed=args.seed * 1000003 + match)
+                regrets.append(run_match(selector, means, args.stdev, args.games, rng))
+            elapsed = time.perf_counter() - start
+
+            n = len(regrets)
+            mean = sum(regrets) / n
+            stderr = math.sqrt(sum((r - mean) ** 2 for r in regrets) / (n - 1) / n) if n > 1 else float('nan')
+            per_game = elapsed / (n * args.games) * 1e6
+            print('    {:<9} regret {:9.1f} ± {:6.1f} / {:.2f} µs per game (including score sampling)'.format(name, mean, stderr, per_game))
+
+
+if __name__ == '__main__':
+    main()
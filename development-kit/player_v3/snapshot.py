@@ -0,0 +1,364 @@
+import argparse
+from array import array
+import pickle
+import sys
+import time
+from card import NUM_KINDS_OF_COLOR, NUM_CARD_KINDS, WILD, WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD, NO_COLOR, NO_KIND, encode
+from rollout import DRAW_2_KIND, SKIP_KIND, REVERSE_KIND, top_of
+from status import INIT_CARDS_STATUS, CARD_CELL
+
+
+"""
+探索用の盤面(Statusのスナップショット)
+
+Statusは入れ子のdict・lambdaを持つdefaultdict・dequeを持つため、copy.deepcopyが遅く、
+lambdaのためにプロセスプールへpickleで渡すこともできない
+探索で使う値だけを整数の配列(array)1本に詰め、複製を配列のコピー1回(メモリのコピー)で行えるようにする
+
+    [HAND, HAND + 56)      自分の手札のカードの種類ごとの枚数
+    [UNSEEN, UNSEEN + 56)  見えていない札のカードの種類ごとの枚数
+    [COUNTS, COUNTS + 4)   席ごとの手札枚数
+    [WHITE, WHITE + 4)     席ごとの白いワイルドの効果の残り(Status.is_white_activate)
+    SEAT                   手番の席
+    STEP                   手番の向き(1 or -1)
+    PENDING                次にカードを引くプレイヤーが引く枚数(ドロー2: 2, ワイルドドロー4: 4, 白いワイルド: 1, なし: 0)
+    TOP_CARD               場札のカードの種類
+    TOP_COLOR, TOP_KIND    場札の(色, 種類) (rollout.top_of)
+    DECK                   山札の枚数
+    FIELD                  場にあるカードの枚数
+
+席は自分を0とし、時計回りに1〜3とする(Status.seatsの添字)
+変更は全て履歴に積み、undo()で1手ずつ戻せる
+
+例) python snapshot.py -n 1000000 (複製・1手進めて戻す処理の速度を測る)
+"""
+NUM_SEATS = 4
+MAX_CARD_OF_PLAYER = 25 # 引いた後の手札の上限(ペナルティ・出せるカードがない場合)
+
+HAND = 0
+UNSEEN = HAND + NUM_CARD_KINDS
+COUNTS = UNSEEN + NUM_CARD_KINDS
+WHITE = COUNTS + NUM_SEATS
+SEAT = WHITE + NUM_SEATS
+STEP = SEAT + 1
+PENDING = STEP + 1
+TOP_CARD = PENDING + 1
+TOP_COLOR = TOP_CARD + 1
+TOP_KIND = TOP_COLOR + 1
+DECK = TOP_KIND + 1
+FIELD = DECK + 1
+NUM_VALUES = FIELD + 1
+
+INIT_UNSEEN = tuple(int(INIT_CARDS_STATUS.flat[cell]) for cell in CARD_CELL) # カードの種類ごとの見えていない札の初期枚数
+
+
+class Snapshot:
+    """
+    探索用の盤面
+    """
+    __slots__ = ('values', 'players', 'trail', 'marks')
+
+    def __init__(self, values: array, players: tuple) -> None:
+        """
+        Args:
+            values (array): 盤面の値(NUM_VALUES個の符号付き整数)
+            players (tuple): 席 -> プレイヤーのID(複製しても共有する)
+        """
+        self.values = values
+        self.players = players
+        self.trail = [] # 変更前の値の履歴 (添字, 値)
+        self.marks = [] # 1手ごとの履歴の開始位置
+
+
+    @classmethod
+    def from_status(cls, status: any, seat: int=0) -> 'Snapshot':
+        """
+        Statusから盤面を作る
+
+        Args:
+            status (Status): 自分のStatus(set_play_orderで席が決まっていること)
+            seat (int): 手番の席
+        Returns:
+            Snapshot: 盤面
+        """
+        values = array('h', [0]) * NUM_VALUES
+        for card in status.my_cards:
+            values[HAND + card] += 1
+        cells = status.cards_status.reshape(-1).tolist()
+        for card in range(NUM_CARD_KINDS):
+            values[UNSEEN + card] = max(cells[CARD_CELL[card]], 0)
+        for i, player in enumerate(status.seats):
+            values[COUNTS + i] = status.player_card_counts.get(player, 0)
+            values[WHITE + i] = status.is_white_activate.get(player, 0)
+        values[SEAT] = seat
+        values[STEP] = 1 if status.turn_right else -1
+
+        top_card = status.field_cards[-1]
+        special = top_card.get('special')
+        if status.is_card_activate:
+            values[PENDING] = 2 if special == 'draw_2' else 4 if special == 'wild_draw_4' else 1 if special == 'white_wild' else 0
+        values[TOP_CARD] = encode(top_card)
+        values[TOP_COLOR], values[TOP_KIND] = top_of(top_card)
+        values[DECK] = status.num_of_deck
+        values[FIELD] = status.num_of_field
+        return cls(values, tuple(status.seats))
+
+
+    def clone(self) -> 'Snapshot':
+        """盤面を複製する(履歴は引き継がない)"""
+        new = Snapshot.__new__(Snapshot)
+        new.values = self.values[:]
+        new.players = self.players
+        new.trail = []
+        new.marks = []
+        return new
+
+
+    def __getstate__(self) -> tuple:
+        return self.values, self.players
+
+
+    def __setstate__(self, state: tuple) -> None:
+        self.values, self.players = state
+        self.trail = []
+        self.marks = []
+
+
+    def set(self, index: int, value: int) -> None:
+        """値を変更し、変更前の値を履歴に積む"""
+        values = self.values
+        self.trail.append((index, values[index]))
+        values[index] = value
+
+
+    def apply_play(self, card: int, color: int=NO_COLOR) -> None:
+        """
+        手番のプレイヤーがカードを出し、手番を進める
+
+        Args:
+            card (int): 出したカード
+            color (int): ワイルド系で指定した色の番号(白いワイルドは場札の色のまま)
+        """
+        self.marks.append(len(self.trail))
+        values = self.values
+        set_value = self.set
+        seat = values[SEAT]
+        step = values[STEP]
+
+        if seat == 0:
+            set_value(HAND + card, values[HAND + card] - 1)
+        else:
+            set_value(UNSEEN + card, values[UNSEEN + card] - 1)
+        set_value(COUNTS + seat, values[COUNTS + seat] - 1)
+        set_value(FIELD, values[FIELD] + 1)
+        set_value(TOP_CARD, card)
+        if values[WHITE + seat] > 0:
+            # カードを出せば白いワイルドの効果は切れる
+            set_value(WHITE + seat, 0)
+
+        skip = False
+        pending = 0
+        if card >= WILD:
+            if card != WHITE_WILD:
+                set_value(TOP_COLOR, color)
+            set_value(TOP_KIND, NO_KIND)
+            if card == WILD_DRAW_4:
+                pending = 4
+            elif card == WHITE_WILD:
+                pending = 1
+            elif card == WILD_SHUFFLE:
+                self.shuffle_hands(seat, step)
+        else:
+            kind = card % NUM_KINDS_OF_COLOR
+            set_value(TOP_COLOR, card // NUM_KINDS_OF_COLOR)
+            set_value(TOP_KIND, kind)
+            if kind == DRAW_2_KIND:
+                pending = 2
+            elif kind == SKIP_KIND:
+                skip = True
+            elif kind == REVERSE_KIND:
+                step = -step
+                set_value(STEP, step)
+        set_value(PENDING, pending)
+        set_value(SEAT, (seat + step * (2 if skip else 1)) % NUM_SEATS)
+
+
+    def apply_draw(self, cards: list=None, pass_turn: bool=True) -> int:
+        """
+        手番のプレイヤーが山札から引く(Status.draw_cardと同じ枚数の決め方)
+
+        Args:
+            cards (list): 引いたカード(自分が引いた場合のみ 他のプレイヤーの場合は枚数だけ数える)
+            pass_turn (bool): 引いた後に手番を進めるか(引いたカードを出す場合はFalseにしてapply_playを続ける)
+        Returns:
+            int: 引いた枚数
+        """
+        self.marks.append(len(self.trail))
+        values = self.values
+        set_value = self.set
+        seat = values[SEAT]
+        pending = values[PENDING]
+        white = values[WHITE + seat]
+
+        limited = False
+        if pending == 1:
+            num_of_draw = 1
+            set_value(WHITE + seat, white + 1)
+        elif pending:
+            num_of_draw = pending
+            if white > 0:
+                set_value(WHITE + seat, white - 1)
+        elif white > 0:
+            num_of_draw = 1
+            set_value(WHITE + seat, white - 1)
+        else:
+            num_of_draw = 1
+            limited = True
+        if pending:
+            set_value(PENDING, 0)
+        if limited:
+            num_of_draw = max(0, min(MAX_CARD_OF_PLAYER - values[COUNTS + seat], num_of_draw))
+
+        set_value(COUNTS + seat, values[COUNTS + seat] + num_of_draw)
+        if seat == 0 and cards:
+            for card in cards:
+                set_value(HAND + card, values[HAND + card] + 1)
+                set_value(UNSEEN + card, values[UNSEEN + card] - 1)
+        set_value(DECK, values[DECK] - num_of_draw)
+        if values[DECK] <= 0:
+            self.deck_empty()
+        if pass_turn:
+            set_value(SEAT, (seat + values[STEP]) % NUM_SEATS)
+        return num_of_draw
+
+
+    def undo(self) -> None:
+        """最後のapply_play・apply_drawを取り消す"""
+        start = self.marks.pop()
+        trail = self.trail
+        values = self.values
+        while len(trail) > start:
+            index, value = trail.pop()
+            values[index] = value
+
+
+    def shuffle_hands(self, seat: int, step: int) -> None:
+        """
+        シャッフルワイルドによる手札の再配布(次のプレイヤーから順に1枚ずつ配る)
+        配り直された自分の手札は分からないため、見えていない札に戻す
+        """
+        values = self.values
+        set_value = self.set
+        total = sum(values[COUNTS:COUNTS + NUM_SEATS])
+        for card in range(NUM_CARD_KINDS):
+            n = values[HAND + card]
+            if n:
+                set_value(UNSEEN + card, values[UNSEEN + card] + n)
+                set_value(HAND + card, 0)
+        for i in range(NUM_SEATS):
+            # 次のプレイヤーからi番目の席に配られる枚数
+            target = (seat + step * (i + 1)) % NUM_SEATS
+            set_value(COUNTS + target, total // NUM_SEATS + (1 if i < total % NUM_SEATS else 0))
+
+
+    def deck_empty(self) -> None:
+        """山札が無くなった時に場札以外を山札に戻す(Status.deck_empty)"""
+        values = self.values
+        set_value = self.set
+        top_card = values[TOP_CARD]
+        for card in range(NUM_CARD_KINDS):
+            n = INIT_UNSEEN[card] - values[HAND + card] - (1 if card == top_card else 0)
+            if values[UNSEEN + card] != n:
+                set_value(UNSEEN + card, n)
+        set_value(DECK, values[FIELD] - 1 + values[DECK])
+        set_value(FIELD, 1)
+
+
+    def hand(self) -> list:
+        """自分の手札をカードの種類のリストに展開する"""
+        values = self.values
+        return [card for card in range(NUM_CARD_KINDS) for _ in range(values[HAND + card])]
+
+
+    def unseen(self) -> list:
+        """見えていない札をカードの種類のリストに展開する(rollout.unseen_cardsと同じ並び)"""
+        values = self.values
+        return [card for card in range(NUM_CARD_KINDS) for _ in range(values[UNSEEN + card])]
+
+
+def benchmark(snapshot: Snapshot, n: int) -> dict:
+    """
+    複製・1手進めて戻す処理の速度を測る
+
+    Args:
+        snapshot (Snapshot): 測定に使う盤面
+        n (int): 繰り返し回数
+    Returns:
+        dict: 処理名 -> 1秒あたりの回数
+    """
+    results = {}
+    start = time.perf_counter()
+    for _ in range(n):
+        snapshot.clone()
+    results['clone'] = n / (time.perf_counter() - start)
+
+    card = next(card for card in range(NUM_CARD_KINDS) if snapshot.values[UNSEEN + card] and card < WILD)
+    snapshot.values[SEAT] = 1
+    start = time.perf_counter()
+    for _ in range(n):
+        snapshot.apply_play(card)
+        snapshot.undo()
+    results['apply_play+undo'] = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        snapshot.apply_draw()
+        snapshot.undo()
+    results['apply_draw+undo'] = n / (time.perf_counter() - start)
+    snapshot.values[SEAT] = 0
+
+    data = pickle.dumps(snapshot)
+    m = max(1, n // 10)
+    start = time.perf_counter()
+    for _ in range(m):
+        pickle.loads(data)
+    results['unpickle'] = m / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    import copy
+    from agent import Agent
+    from engine import Engine
+
+    parser = argparse.ArgumentParser(description='Benchmark cloning of the search state')
+    parser.add_argument('-n', '--number', action='store', type=int, default=1000000, help='Number of iterations')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=0, help='Random seed of the game used for the state')
+    args = parser.parse_args(sys.argv[1:])
+
+    # エンジンで進めた対戦の途中(最初の自分の手番)の盤面を使う
+    agents = [Agent(time_delay=0) for _ in range(NUM_SEATS)]
+    agent = agents[0]
+    snapshots = []
+
+    def on_next_player(data_res):
+        if not snapshots:
+            snapshots.append((Snapshot.from_status(agent.game_status), copy.deepcopy(agent.game_status)))
+        Agent.on_next_player(agent, data_res)
+
+    agent.on_next_player = on_next_player
+    Engine(agents, total_turn=1, seed=args.seed).run()
+    snapshot, status = snapshots[0]
+
+    for name, rate in benchmark(snapshot, args.number).items():
+        print('{:<16} {:>12,.0f} /s'.format(name, rate))
+
+    m = max(1, args.number // 1000)
+    start = time.perf_counter()
+    for _ in range(m):
+        copy.deepcopy(status)
+    print('{:<16} {:>12,.0f} /s'.format('Status deepcopy', m / (time.perf_counter() - start)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+from rollout import simulate_round
+
+
+"""
+相手の手番の間の先読み
+
+相手の手番の間は受信イベントの記録しか行わないため、局面が変わるたびに
+「今の局面で自分の手番が来た場合」の候補手を裏のスレッドでプレイアウトしておく
+自分の手番では、実際の局面(場札・手札・手札枚数など)が先読みした局面と一致した場合のみ結果を使い、
+一致しない場合は捨ててその場で計算する
+
+先読みの結果は初期解によらない形(1巡ごとの候補手ごとの得点)で持ち、
+自分の手番で決まった初期解との得点差に変換して集計に加える
+
+先読みのスレッドは受信スレッドとGILを取り合うため、1巡ごとにGILを手放し、受信処理を待たせないようにする
+(手放さないと、受信スレッドはGILの切り替え間隔(5ms)だけ待たされる)
+思考処理をプロセスプールに任せている場合(ThinkPoolの起動中)は、受信処理を優先するため先読みしない(agent.pyで判断する)
+"""
+
+
+class Speculator:
+    """
+    先読み用の常駐スレッド
+    """
+    def __init__(self, seed: int=None) -> None:
+        """
+        Args:
+            seed (int): プレイアウトの乱数シード
+        """
+        self.cond = threading.Condition()
+        self.rng = random.Random(seed)
+        self.generation = 0 # 先読みする局面が変わるたびに増やす(古い局面の結果を捨てるため)
+        self.task = None # (局面の識別子, 盤面, 候補手, 先読みする時間の上限(秒))
+        self.running = False
+        self.rows = [] # 1巡ごとの候補手ごとの得点
+        self.elapsed = 0.0 # 先読みに使った時間(秒)
+        self.thread = None
+
+
+    def submit(self, key: tuple, state: tuple, moves: list, budget: float) -> None:
+        """
+        局面の先読みを始める(同じ局面を先読み中の場合はそのまま続ける)
+
+        Args:
+            key (tuple): 局面の識別子
+            state (tuple): 盤面 (見えていない札, 自分の手札, 他のプレイヤーの手札枚数, 公開済みの手札, 場札の色, 場札の種類)
+            moves (list): 候補手
+            budget (float): 先読みする時間の上限(秒) 自分の手番の思考時間を超えて先読みしても使わないため
+        """
+        with self.cond:
+            if self.task is not None and self.task[0] == key:
+                return
+            self.generation += 1
+            self.task = (key, state, moves, budget)
+            self.running = True
+            self.rows = []
+            self.elapsed = 0.0
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+
+    def take(self) -> tuple:
+        """
+        先読みを止めて結果を受け取る
+
+        Returns:
+            tuple: (局面の識別子, 1巡ごとの候補手ごとの得点, 先読みに使った時間(秒)) 先読みしていない場合はNone
+        """
+        with self.cond:
+            task = self.task
+            rows = self.rows
+            elapsed = self.elapsed
+            self.generation += 1
+            self.task = None
+            self.running = False
+            self.rows = []
+            self.elapsed = 0.0
+        if task is None:
+            return None
+        return task[0], rows, elapsed
+
+
+    def run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.running:
+                    self.cond.wait()
+                generation = self.generation
+                _, state, moves, budget = self.task
+
+            pool, cards, card_counts, open_cards, top_color, top_kind = state
+            start = time.perf_counter()
+            rewards = simulate_round(pool, cards, card_counts, open_cards, top_color, top_kind, moves, self.rng)
+            elapsed = time.perf_counter() - start
+            # GILを手放し、待っている受信スレッドに譲る
+            time.sleep(0)
+
+            with self.cond:
+                if self.generation != generation:
+                    # 先読み中に局面が変わった
+                    continue
+                self.rows.append(rewards)
+                self.elapsed += elapsed
+                if self.elapsed >= budget:
+                    self.running = False
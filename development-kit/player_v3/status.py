@@ -1,15 +1,73 @@
 from collections import defaultdict, deque
 from typing import Union
 import random
+import numpy as np
+from card import CARD_KEY, WILD_SHUFFLE, encode
+from params import DEFAULT_PARAMS
 
 
 NUM_OF_ALL_CARDS = 112
+DEBUG = False # Trueの場合は集計値を毎ターンcards_statusから再計算して照合する
+HISTORY_LENGTH = 16 # 場札・プレイヤーごとのログを保持する件数(古いものから捨てる)
+UNCOLORED = ('white', None) # 色の判断に使えない場札の色
+
+# 自分から見た他のプレイヤーの位置 (UNO宣言中のプレイヤーは位置のビットの和で表す)
+POS_NEXT = 1 # 直後
+POS_MID = 2 # 対面
+POS_BEFORE = 4 # 直前
+POS_NAME = {POS_NEXT: "直後", POS_MID: "対面", POS_BEFORE: "直前"}
+NUM_OF_POS = tuple(bin(mask).count('1') for mask in range(8)) # 位置のビットの和 -> 人数
+
+
+def _build_uno_positions() -> tuple:
+    """(時計回りか, 席のビットの和) -> 位置のビットの和 の表を作成する"""
+    seat_pos = {
+        False: {1: POS_BEFORE, 2: POS_MID, 3: POS_NEXT},
+        True: {1: POS_NEXT, 2: POS_MID, 3: POS_BEFORE},
+    }
+    table = []
+    for turn_right in (False, True):
+        row = []
+        for seats in range(16):
+            row.append(sum(pos for seat, pos in seat_pos[turn_right].items() if seats >> seat & 1))
+        table.append(tuple(row))
+    return tuple(table)
+
+
+UNO_POSITIONS = _build_uno_positions()
+
+# cards_statusの行(色)と列(数字・記号)の並び
+# 行の並びは同じ枚数の色を並べるときの優先順位にもなる
+STATUS_COLORS = ['blue', 'green', 'red', 'yellow', 'black', 'white']
+STATUS_TYPES = [str(i) for i in range(10)] + ['draw_2', 'skip', 'reverse']
+COLOR_ROW = {color: i for i, color in enumerate(STATUS_COLORS)} # 色 -> 行
+TYPE_COL = dict({t: i for i, t in enumerate(STATUS_TYPES)}, wild=0, wild_draw_4=1, wild_shuffle=2, white_wild=0) # 数字・記号 -> 列
+CARD_CELL = tuple(COLOR_ROW[color] * len(STATUS_TYPES) + TYPE_COL[t] for color, t in CARD_KEY) # カード -> cards_statusの要素番号(1次元)
+
+# 場に出ていない札の初期枚数
+INIT_CARDS_STATUS = np.zeros((len(STATUS_COLORS), len(STATUS_TYPES)), dtype=np.int64)
+INIT_CARDS_STATUS[:4, :] = 2
+INIT_CARDS_STATUS[:4, TYPE_COL['0']] = 1
+INIT_CARDS_STATUS[COLOR_ROW['black'], [TYPE_COL['wild'], TYPE_COL['wild_draw_4'], TYPE_COL['wild_shuffle']]] = [4, 4, 1]
+INIT_CARDS_STATUS[COLOR_ROW['white'], TYPE_COL['white_wild']] = 3
+CARD_ROW = tuple(cell // len(STATUS_TYPES) for cell in CARD_CELL) # カード -> cards_statusの行
+# ワイルドドロー4以外のワイルド系カードであるか
+CARD_IS_WILD = tuple(t in ('wild', 'wild_shuffle', 'white_wild') for _, t in CARD_KEY)
+WILD_CELLS = [CARD_CELL[card] for card in range(len(CARD_KEY)) if CARD_IS_WILD[card]]
 
 class Status:
-    def __init__(self) -> None:
+    def __init__(self, params: any=DEFAULT_PARAMS) -> None:
+        """
+        Args:
+            params (StrategyParams): 戦略の閾値
+        """
+        self.params = params
         self.cards_status = self.init_cards_status()
+        self.init_unseen_counts()
         self.my_cards = []
-        self.order_dic = {}
+        self.seats = [] # 自分から手番順(時計回り)に並べたプレイヤーのid
+        self.seat_index = {} # プレイヤーのid -> seatsの添字
+        self.uno_seats = 0 # UNO宣言中のプレイヤーの席(seatsの添字)のビットの和
         self.uno_declared = {}
         self.my_uno_flag = False
         self.num_of_deck = NUM_OF_ALL_CARDS - 4 * 7 - 1 # 山札の枚数
@@ -24,17 +82,25 @@ class Status:
         # プレイヤーごとに手札の枚数を記録しておくディクショナリ
         self.player_card_counts = defaultdict(int)
 
-        # 「誰が」「どのカードを」出したかを記録するディクショナリ
-        self.player_card_log = defaultdict(lambda: deque(maxlen=None))
+        # 「誰が」「どのカードを」出したかを記録するディクショナリ(直近HISTORY_LENGTH件)
+        self.player_card_log = defaultdict(lambda: deque(maxlen=HISTORY_LENGTH))
 
-        # 「誰が」「どの色」に変更したかを記録するディクショナリ
-        self.player_color_log = defaultdict(lambda: deque(maxlen=None))
+        # プレイヤーごとの最後にワイルドで指定した色・最後に出せなかった場札の色
+        self.last_chosen_color = {}
+        self.last_cant_play_color = {}
+        # プレイヤーごとの最後の色の記録の理由('wild' or 'cant_play_card')と、その記録がまだ有効か
+        # (出せなかった色の記録は、その後そのプレイヤーがカードを引くと無効になる)
+        self.last_color_reason = {}
+        self.last_color_valid = {}
 
         # 最後にカードをプレイしたプレイヤーを記録しておく文字列型フィールド
         self.who_played_last = None
 
-        # 場に出されたカードを記録する配列
-        self.field_cards = deque(maxlen=None)
+        # 場に出されたカードを記録する配列(直近HISTORY_LENGTH件)
+        self.field_cards = deque(maxlen=HISTORY_LENGTH)
+        # field_cardsの各位置までで最後の、色が白・色なし以外のカード
+        # 古い場札が捨てられても直前の色のある場札をO(1)で引けるようにする
+        self.colored_field_cards = deque(maxlen=HISTORY_LENGTH)
 
         # 誰がどの手札を公開したか記録するdict(list(card))
         self.other_open_cards = defaultdict(list)
@@ -42,19 +108,47 @@ class Status:
         self.my_open_cards = defaultdict(list)
 
 
-    def init_cards_status(self) -> dict:
+    def init_cards_status(self) -> np.ndarray:
         """
-        カードカウンティング用変数(cards_status)と自分の手札(my_cards)の初期化
+        カードカウンティング用変数(cards_status)の初期化
+        6色 × 13種類の整数配列で、行・列の並びはSTATUS_COLORS・STATUS_TYPESに従う
         """
-        cards_status = {
-            "blue"  : {"0": 1, "1": 2, "2": 2, "3": 2, "4": 2, "5": 2, "6": 2, "7": 2, "8": 2, "9": 2, "draw_2": 2, "skip": 2, "reverse": 2},
-            "green" : {"0": 1, "1": 2, "2": 2, "3": 2, "4": 2, "5": 2, "6": 2, "7": 2, "8": 2, "9": 2, "draw_2": 2, "skip": 2, "reverse": 2},
-            "red"   : {"0": 1, "1": 2, "2": 2, "3": 2, "4": 2, "5": 2, "6": 2, "7": 2, "8": 2, "9": 2, "draw_2": 2, "skip": 2, "reverse": 2},
-            "yellow": {"0": 1, "1": 2, "2": 2, "3": 2, "4": 2, "5": 2, "6": 2, "7": 2, "8": 2, "9": 2, "draw_2": 2, "skip": 2, "reverse": 2},
-            "black" : {"wild": 4, "wild_draw_4": 4, "wild_shuffle": 1},
-            "white" : {"white_wild": 3},
-        }
-        return cards_status
+        return INIT_CARDS_STATUS.copy()
+
+
+    def init_unseen_counts(self) -> None:
+        """
+        cards_statusの集計値を初期化する
+        以後はcards_statusの更新に合わせて差分だけ更新する
+        """
+        self.num_unseen = int(INIT_CARDS_STATUS.sum()) # 見えていない札の合計
+        self.num_unseen_color = [int(n) for n in INIT_CARDS_STATUS.sum(axis=1)] # 色(行)ごとの見えていない札
+        self.num_unseen_wild = int(INIT_CARDS_STATUS.flat[WILD_CELLS].sum()) # 見えていないワイルド系カード(ワイルドドロー4を除く)
+
+
+    def add_cards_status(self, cards: list, n: int) -> None:
+        """
+        cards_statusと集計値をカード1枚ごとに更新する
+
+        Args:
+            cards (list): 対象のカード
+            n (int): 1枚あたりの増減 (見えた場合は-1, 見えなくなった場合は+1)
+        """
+        cells = self.cards_status.reshape(-1)
+        num_unseen_color = self.num_unseen_color
+        for card in cards:
+            cells[CARD_CELL[card]] += n
+            num_unseen_color[CARD_ROW[card]] += n
+            if CARD_IS_WILD[card]:
+                self.num_unseen_wild += n
+        self.num_unseen += n * len(cards)
+
+
+    def check_unseen_counts(self) -> None:
+        """集計値がcards_statusの再計算と一致しているか確認する(デバッグ用)"""
+        assert self.num_unseen == int(self.cards_status.sum()), 'num_unseen'
+        assert self.num_unseen_color == [int(n) for n in self.cards_status.sum(axis=1)], 'num_unseen_color'
+        assert self.num_unseen_wild == int(self.cards_status.flat[WILD_CELLS].sum()), 'num_unseen_wild'
 
 
     def init_player_card_counts(self, player_id_list: list) -> None:
@@ -68,23 +162,21 @@ class Status:
 
 
     def set_my_cards(self, cards:list) -> None:
-        """自分の手札(my_cards)の更新"""
+        """自分の手札(my_cards)の更新 ※カードは整数で扱う"""
         self.my_cards = cards.copy()
 
 
-    def update_cards_status(self, cards: Union[dict, list]) -> None:
+    def update_cards_status(self, cards: Union[int, list]) -> None:
         """
         場に出たカード、手札に来たカードからcards_statusを更新するメソッド
         Args:
-            cards (dict|list): 場に出たカード or 手札に来たカード
+            cards (int|list): 場に出たカード or 手札に来たカード
         """
-        if isinstance(cards, dict):
+        if isinstance(cards, int):
             # 場に出されたカードの場合は記録しておく
             cards = [cards]
 
-        for card in cards:
-            card_color, card_type = self.get_keys_for_card_status(card)
-            self.cards_status[card_color][card_type] -= 1
+        self.add_cards_status(cards, -1)
 
         # print("場札または手札にないのは")
         # print("カードステータス:", self.cards_status)
@@ -94,20 +186,46 @@ class Status:
         """
         シャッフルによって場に戻った手札の分cards_statusを更新する
         """
-        for card in self.my_cards:
-            card_color, card_type = self.get_keys_for_card_status(card)
-            if card_type != 'wild_shuffle':
-                self.cards_status[card_color][card_type] += 1
+        self.restore_cards_status([card for card in self.my_cards if card != WILD_SHUFFLE])
+
+
+    def restore_cards_status(self, cards: Union[int, list]) -> None:
+        """
+        見えていたカードが再び見えなくなった分cards_statusを戻すメソッド
+        Args:
+            cards (int|list): 見えなくなったカード
+        """
+        if isinstance(cards, int):
+            cards = [cards]
+
+        self.add_cards_status(cards, 1)
+
+
+    def count_color(self, color: str) -> int:
+        """指定した色の場に出ていない札の枚数"""
+        return self.num_unseen_color[COLOR_ROW[color]]
+
+
+    def count_colors(self) -> list:
+        """4色それぞれの場に出ていない札の枚数 (STATUS_COLORSの先頭4色の順)"""
+        return self.num_unseen_color[:4]
+
+
+    def count_wild(self) -> int:
+        """場に出ていないワイルド系カード(ワイルドドロー4を除く)の枚数"""
+        return self.num_unseen_wild
+
+
+    def count_unseen(self) -> int:
+        """場に出ていない(自分から見えていない)札の合計枚数"""
+        return self.num_unseen
 
 
     def wild_shuffle_flag(self) -> bool:
         """
         自分の手札にワイルドシャッフルがあるかどうかを返す
         """
-        for card in self.my_cards:
-            if card.get("special") == 'wild_shuffle':
-                return True
-        return False
+        return WILD_SHUFFLE in self.my_cards
 
 
     def check_player_card_counts(self, player: str, card_num: int) -> None:
@@ -162,89 +280,160 @@ class Status:
             # print("その前は" + str(self.player_card_log[player][-2]))
 
 
+    def push_field_card(self, card: dict) -> None:
+        """
+        場に出たカードを記録する
+
+        Args:
+            card (dict): 場札のカード
+        """
+        self.field_cards.append(card)
+        if card.get('color') not in UNCOLORED or not self.colored_field_cards:
+            self.colored_field_cards.append(card)
+        else:
+            self.colored_field_cards.append(self.colored_field_cards[-1])
+
+
+    def pop_field_card(self) -> dict:
+        """最後に場に出たカードを取り除く(チャレンジ成功時)"""
+        self.colored_field_cards.pop()
+        return self.field_cards.pop()
+
+
+    def set_top_color(self, color: str) -> None:
+        """
+        場札(ワイルド系)の色を指定された色に変更する
+
+        Args:
+            color (str): 指定された色
+        """
+        top_card = self.field_cards[-1]
+        top_card['color'] = color
+        if color not in UNCOLORED or len(self.colored_field_cards) < 2:
+            self.colored_field_cards[-1] = top_card
+        else:
+            self.colored_field_cards[-1] = self.colored_field_cards[-2]
+
+
+    def colored_card_before_top(self) -> dict:
+        """
+        場札の1枚前までに出されたカードのうち、色が白・色なし以外の最後のカード
+        (ワイルドドロー4の直前の色を知るために使う)
+
+        Returns:
+            dict: カード (場札しかない場合は場札)
+        """
+        if len(self.colored_field_cards) < 2:
+            return self.colored_field_cards[-1]
+        return self.colored_field_cards[-2]
+
+
+    def log_color(self, player: str, color: str, reason: str) -> None:
+        """
+        プレイヤーの色に関する記録を残す
+
+        Args:
+            player (str): プレイヤー
+            color (str): 色
+            reason (str): 'wild'(ワイルドで指定した色) or 'cant_play_card'(出せるカードがなかった場札の色)
+        """
+        if reason == 'wild':
+            self.last_chosen_color[player] = color
+        else:
+            self.last_cant_play_color[player] = color
+        self.last_color_reason[player] = reason
+        self.last_color_valid[player] = True
+
+
+    def last_color(self, player: str) -> tuple:
+        """
+        プレイヤーの最後の色の記録
+
+        Args:
+            player (str): プレイヤー
+        Returns:
+            tuple: (色, 理由, 有効か) 記録がない場合はNone
+        """
+        reason = self.last_color_reason.get(player)
+        if reason is None:
+            return None
+        color = self.last_chosen_color[player] if reason == 'wild' else self.last_cant_play_color[player]
+        return color, reason, self.last_color_valid[player]
+
+
     def set_play_order(self, order: list, my_id: str) -> None:
         """順番を記憶させる関数"""
         my_pos = order.index(my_id)
-        self.order_dic[order[(my_pos + 1) % 4]] = {"位置": "直後", "UNO": False}
-        self.order_dic[order[(my_pos + 2) % 4]] = {"位置": "対面", "UNO": False}
-        self.order_dic[order[(my_pos + 3) % 4]] = {"位置": "直前", "UNO": False}
+        self.seats = [order[(my_pos + i) % 4] for i in range(4)]
+        self.seat_index = {player_id: i for i, player_id in enumerate(self.seats)}
+        self.uno_seats = 0
 
 
     def reverse_order(self) -> None:
-        """順番逆転に対応させる関数"""
-        # print("反転発動")
-        # print(self.order_dic)
+        """順番逆転に対応させる関数(直後・直前はturn_rightから求める)"""
         self.turn_right = not self.turn_right
-        for k, v in self.order_dic.items():
-            if v["位置"] == "直前":
-                self.order_dic[k]["位置"] = "直後"
-            elif v["位置"] == "直後":
-                self.order_dic[k]["位置"] = "直前"
 
 
     def get_before_id(self) -> str:
         """直前のプレイヤーのidを入手する関数"""
-        for k, v in self.order_dic.items():
-            if v["位置"] == "直前":
-                return k
-
-        return ""
+        if not self.seats:
+            return ""
+        return self.seats[3 if self.turn_right else 1]
 
 
     def get_next_id(self) -> str:
         """直後のプレイヤーのidを入手する関数"""
-        for k, v in self.order_dic.items():
-            if v["位置"] == "直後":
-                return k
-
-        return ""
+        if not self.seats:
+            return ""
+        return self.seats[1 if self.turn_right else 3]
 
 
     def get_mid_id(self) -> str:
         """対面のプレイヤーのidを入手する関数"""
-        for k, v in self.order_dic.items():
-            if v["位置"] == "対面":
-                return k
-
-        return ""
+        if not self.seats:
+            return ""
+        return self.seats[2]
 
 
     def set_uno_player(self, player_id: str) -> None:
         """UNO宣言したやつの記憶"""
-        # print(player_id + "がUNOしました" )
-        self.order_dic[player_id]["UNO"] = True
+        self.uno_seats |= 1 << self.seat_index[player_id]
 
 
     def undo_uno_player(self, player_id: str) -> None:
         """UNO宣言解除したやつの記憶"""
-        # print(player_id + "がUNO解除しました" )
-        self.order_dic[player_id]["UNO"] = False
+        self.uno_seats &= ~(1 << self.seat_index[player_id])
+
+
+    def uno_positions(self) -> int:
+        """UNO宣言中のプレイヤーの位置(POS_NEXT・POS_MID・POS_BEFOREのビットの和)"""
+        return UNO_POSITIONS[self.turn_right][self.uno_seats]
+
+
+    def uno_count(self) -> int:
+        """UNO宣言中のプレイヤーの人数"""
+        return NUM_OF_POS[self.uno_positions()]
 
 
     def check_uno_player(self, my_id: str, number_card_of_player: dict) -> None:
         """UNO宣言のチェック"""
         for k, v in number_card_of_player.items():
-            if k != my_id and k in self.order_dic:
-                self.order_dic[k]["UNO"] = v == 1
-        # print(self.order_dic)
+            seat = self.seat_index.get(k)
+            if k != my_id and seat is not None:
+                if v == 1:
+                    self.uno_seats |= 1 << seat
+                else:
+                    self.uno_seats &= ~(1 << seat)
 
 
     def deck_empty(self) -> None:
         """山札が0になった場合にcard_statusをリセットするメソッド"""
         # print("山札が切れました")
         # card_statusのリセット
+        # 最後に場に出されたカードと自分の手札カードは山札に戻らないのでcard_statusから除外する
         self.cards_status = self.init_cards_status()
-
-        # 最後に場に出されたカードは山札に戻らないのでcard_statusから除外する
-        card_color, card_type = self.get_keys_for_card_status(self.field_cards[-1])
-        # if card_type == "white_wild":
-        #     card_color = "white"
-        self.cards_status[card_color][card_type] -= 1
-
-        # 自分の手札カードも山札に戻らないのでcard_statusから除外する
-        for card in self.my_cards:
-            card_color, card_type = self.get_keys_for_card_status(card)
-            self.cards_status[card_color][card_type] -= 1
+        self.init_unseen_counts()
+        self.update_cards_status([encode(self.field_cards[-1])] + self.my_cards)
 
         # 山札枚数を再計算する
         # 最後の1枚を除いて山札に戻す、山札がマイナス(借金状態)な時も考慮する
@@ -256,38 +445,17 @@ class Status:
         # self.debug_print()
 
 
-    def get_keys_for_card_status(self, card) -> tuple:
+    def get_keys_for_card_status(self, card: int) -> tuple:
         """
         card_status用のkeyを取得するメソッド
+        ワイルド系のカードは指定された色に関係なく黒(白)のキーになる
 
         Args:
-            card(any):カード
+            card(int):カード
         Returns
             tuple: (color, type)
         """
-
-        # カードの色を取得
-        card_color = card["color"]
-
-        # draw4とwildカード系は使用時に変更先の色として使われるので特殊処理する
-        if "special" in card and card["special"] in ["wild_draw_4", "wild", "wild_shuffle"]:
-            card_color = "black"
-            card_type = card["special"]
-
-        elif "special" in card and card["special"] == "white_wild":
-            card_color = "white"
-            card_type = card["special"]
-
-        elif card_color in ["black", "white"]:
-            card_type = card["special"]
-
-        else:
-            if "number" in card:
-                card_type = str(card["number"])
-            else:
-                card_type = card["special"]
-
-        return (card_color, card_type)
+        return CARD_KEY[card]
 
 
     def draw_card(self, player:str, penalty_draw:int=0) -> None:
@@ -311,10 +479,8 @@ class Status:
         top_card = self.field_cards[-1]
         top_card_special = top_card.get("special")
 
-        if len(self.player_color_log[player]) > 0:
-            color_log = self.player_color_log[player][-1]
-            if color_log[1] != 'wild':
-                self.player_color_log[player][-1][2] = False
+        if self.last_color_reason.get(player) == 'cant_play_card':
+            self.last_color_valid[player] = False
 
         # ペナルティの場合は指定した回数分だけ引く
         if penalty_draw:
@@ -355,7 +521,7 @@ class Status:
 
                 # プレイヤーが出せなかった色を記録しておく
                 top_card_color = top_card.get("color")
-                self.player_color_log[player].append([top_card_color, "cant_play_card", True])
+                self.log_color(player, top_card_color, "cant_play_card")
 
                 # print(f"引く理由: 場に出すカードがない(再行動可能)")
 
@@ -413,9 +579,9 @@ class Status:
                 "color": new_color,
                 "special": "white_wild",
             }
-            self.field_cards.append(new_card) # 場に出たカードの記録
+            self.push_field_card(new_card) # 場に出たカードの記録
         else:
-            self.field_cards.append(card) # 場に出たカードの記録
+            self.push_field_card(card) # 場に出たカードの記録
         self.update_player_card_log(player, card) # プレイヤーごとのログを取る
 
         # 場のカードが更新されたのでこれから場に出されるドロー系カードの効力は復活する
@@ -458,12 +624,12 @@ class Status:
         # print(self.other_open_cards[id])
 
 
-    def remove_other_player_cards(self, id:str, card:dict) -> None:
+    def remove_other_player_cards(self, id:str, card:int) -> None:
         """
         手札公開していたやつが使ったカードを公開していた手札から消去する関数
         args:
             id:str = 公開したプレイヤーのid
-            card:dict = 使ったカード
+            card:int = 使ったカード
         """
 
         if len(self.other_open_cards[id]) > 0: # そいつがカードを公開していて
@@ -482,11 +648,11 @@ class Status:
         self.other_open_cards = defaultdict(list)
 
 
-    def remove_my_open_cards(self, card: dict) -> None:
+    def remove_my_open_cards(self, card: int) -> None:
         """
         自分が公開した手札から使ったカードを消去する関数
         args:
-            card:dict = 使ったカード
+            card:int = 使ったカード
         """
         challenge_success = False
         for k, v in self.my_open_cards.items():
@@ -515,16 +681,29 @@ class Status:
 
 
     def calculate_num_of_deck(self, my_id: str, number_card_of_player: dict):
-        self.num_of_deck = 0
-        for v in self.cards_status.values():
-            for n in v.values():
-                self.num_of_deck += n
+        """
+        見えていない札の合計から他のプレイヤーの手札枚数を引いて山札の枚数を求める
+
+        Args:
+            my_id (str): 自分のID
+            number_card_of_player (dict): ディーラーから通知された各プレイヤーの手札枚数
+        Returns:
+            int: 山札の枚数
+        """
+        if DEBUG:
+            self.check_unseen_counts()
+
+        self.num_of_deck = self.num_unseen
 
         for k, v in number_card_of_player.items():
             # print(f"{k}の枚数:", v)
             if k != my_id:
                 self.num_of_deck -= v
 
+        if DEBUG and self.num_of_deck < 0:
+            # 他のプレイヤーの手札枚数と見えていない札の枚数が合わない
+            print('num_of_deck < 0:', self.num_of_deck, number_card_of_player)
+
         return self.num_of_deck
 
 
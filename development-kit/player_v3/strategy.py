@@ -1,5 +1,9 @@
 from collections import defaultdict
-import math
+import numpy as np
+from card import CARD_COLOR, CARD_NUMBER, CARD_SPECIAL, ARR_WILD, WILD_DRAW_4, WILD_SHUFFLE, PLAYABLE_MASK, top_key
+from status import STATUS_COLORS, COLOR_ROW, POS_NEXT, POS_MID, POS_BEFORE, POS_NAME, NUM_OF_POS
+from probability import miss_probability
+from params import DEFAULT_PARAMS
 
 def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_counts: dict, num_of_deck: int, before_card: dict, game_status: any, games: any) -> dict:
     """
@@ -15,7 +19,7 @@ def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_count
         game_status: Statusインスタンス
         games: Gamesインスタンス
     Return:
-        best_card(dict): 最善手
+        best_card(int): 最善手 (出せるカードがない場合はNone)
         play_mode(str): どのモードかを表す文字列{"offensive", "deffensive", "uno", "other"}
     """
 
@@ -23,29 +27,21 @@ def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_count
     cards_wild = [] # ワイルド・シャッフルワイルド・白いワイルドを格納
     cards_wild4 = [] # ワイルドドロー4を格納
 
-    # 場札と照らし合わせ出せるカードを抽出する
+    # 場札と照らし合わせ出せるカードを抽出する(場札ごとの出せるカードは事前計算した表から引く)
+    playable = PLAYABLE_MASK[top_key(before_card)]
     for card in my_cards:
-        card_special = card.get('special')
-        card_number = card.get('number')
-        before_card_number = before_card.get('number')
-        if card_special == 'wild_draw_4': # ワイルドドロー4
+        if not playable >> card & 1:
+            continue
+        if card == WILD_DRAW_4: # ワイルドドロー4
             # ワイルドドロー4は場札に関係なく出せる
             cards_wild4.append(card)
 
-        elif card_special in ['wild', 'wild_shuffle', 'white_wild']:
+        elif card in ARR_WILD:
             # ワイルド・シャッフルワイルド・白いワイルドも場札に関係なく出せる
             cards_wild.append(card)
 
-        elif card['color'] == before_card['color']:
-            # 場札と同じ色のカード
-            cards_valid.append(card)
-
-        elif card_special is not None and card_special == before_card.get('special'):
-            # 場札と記号が同じカード
-            cards_valid.append(card)
-
-        elif card_number is not None and before_card_number is not None and int(card_number) == int(before_card_number):
-            # 場札と数字が同じカード
+        else:
+            # 場札と同じ色 または 同じ数字・記号のカード
             cards_valid.append(card)
 
     """
@@ -63,9 +59,7 @@ def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_count
     should_play_draw4 = play_draw4_dicision(valid_card_list, before_card, my_cards, my_id, next_id, player_card_counts, num_of_deck, challenge_success, game_status, games)
     # print('should_play_draw4:', should_play_draw4)
 
-    shuffle_wild = {'color':'black', 'special':'wild_shuffle'}
-
-    play_mode = analyze_situation(my_id, my_cards, player_card_counts, wild_shuffle_flag)
+    play_mode = analyze_situation(my_id, my_cards, player_card_counts, wild_shuffle_flag, game_status.params)
     if len(valid_card_list) > 0:
         try:
             # UNOプレイヤーがいるとき
@@ -73,9 +67,9 @@ def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_count
                 # シャッフルワイルドを持っていて、自分の手札が7枚以上のとき --> シャッフルワイルドを切る
                 if len(my_cards) >= 7 and wild_shuffle_flag:
                     game_status.special_logic_flag[1] = True
-                    return (shuffle_wild, play_mode)
+                    return (WILD_SHUFFLE, play_mode)
 
-                uno_cnt = uno_player_cnt(game_status.order_dic)
+                uno_cnt = game_status.uno_count()
                 if uno_cnt == 3: #自分以外の3人がUNO
                     tmp_list = card_choice_at_uno_all(valid_card_list, next_id, should_play_draw4, game_status)
                     if len(tmp_list) == 0:
@@ -90,13 +84,13 @@ def select_play_card(my_cards: list, my_id: str, next_id: str, player_card_count
                     else:
                         return (tmp_list[0], play_mode)
 
-                for v in game_status.order_dic.values():
-                    if v["UNO"]: #UNO宣言してるやついたら
-                        tmp_list = card_choice_at_uno(valid_card_list, before_card, v["位置"], should_play_draw4, game_status)
-                        if len(tmp_list) == 0:
-                            return (None, play_mode)
-                        else:
-                            return (tmp_list[0], play_mode)
+                uno_pos = game_status.uno_positions()
+                if uno_pos: #UNO宣言してるやついたら
+                    tmp_list = card_choice_at_uno(valid_card_list, before_card, POS_NAME[uno_pos], should_play_draw4, game_status)
+                    if len(tmp_list) == 0:
+                        return (None, play_mode)
+                    else:
+                        return (tmp_list[0], play_mode)
 
             elif play_mode == "deffensive": #防御モード
                 if game_status.version == 'v2':
@@ -144,14 +138,14 @@ def card_choice_at_uno_all(valid_card_list: list, next_id: str, should_play_draw
     # 有効カード情報を取得
     for card in valid_card_list:
         #スペシャルカードと数字カードを振り分け
-        card_special = card.get('special')
-        card_number = card.get('number')
+        card_special = CARD_SPECIAL[card]
+        card_number = CARD_NUMBER[card]
 
         if card_number is None:
             specials_dict[card_special].append(card)
         else:
             nums_list.append(card)
-            # card_color = card.get('color')
+            # card_color = CARD_COLOR[card]
             # nums_dict[card_color][card_number] = card
 
     # スペシャルカード(キー)を優先度順に格納したリスト
@@ -181,20 +175,22 @@ def card_choice_at_uno_two(valid_card_list: list, should_play_draw4: bool, game_
     # 有効カード情報を取得
     for card in valid_card_list:
         #スペシャルカードと数字カードを振り分け
-        card_special = card.get('special')
-        card_number = card.get('number')
+        card_special = CARD_SPECIAL[card]
+        card_number = CARD_NUMBER[card]
 
         if card_number is None:
             specials_dict[card_special].append(card)
         else:
             nums_list.append(card)
-            card_color = card.get('color')
+            card_color = CARD_COLOR[card]
             nums_dict[card_color][card_number] = card
 
     rtn_list = []
 
+    uno_pos = game_status.uno_positions()
+
     #直前、対面がUNOってた時
-    if get_uno_player_pos(game_status.order_dic) == ["直前","対面"] or get_uno_player_pos(game_status.order_dic) == ["対面","直前"] :
+    if uno_pos == POS_BEFORE | POS_MID:
         # スペシャルカード(キー)を優先度順に格納したリスト
         if should_play_draw4:
             specials_key_list = ['wild_shuffle', 'wild', 'white_wild', 'wild_draw_4', 'draw_2', 'reverse', 'skip']
@@ -207,7 +203,7 @@ def card_choice_at_uno_two(valid_card_list: list, should_play_draw4: bool, game_
             rtn_list += specials_dict.get('wild_draw_4', [])
 
     #直後、対面がUNOってた時
-    elif get_uno_player_pos(game_status.order_dic) == ["直後","対面"] or get_uno_player_pos(game_status.order_dic) == ["対面", "直後"]:
+    elif uno_pos == POS_NEXT | POS_MID:
         # スペシャルカード(キー)を優先度順に格納したリスト
         if should_play_draw4:
             specials_key_list = ['white_wild', 'wild_shuffle', 'wild', 'wild_draw_4', 'draw_2', 'reverse', 'skip']
@@ -220,7 +216,7 @@ def card_choice_at_uno_two(valid_card_list: list, should_play_draw4: bool, game_
             rtn_list += specials_dict.get('wild_draw_4', [])
 
     #直後,直前がUNOってた時
-    elif get_uno_player_pos(game_status.order_dic) == ["直後","直前"] or get_uno_player_pos(game_status.order_dic) == ["直前","直後"]:
+    elif uno_pos == POS_NEXT | POS_BEFORE:
 
         #考慮すべき相手(直後)のidを入手する
         target_id = game_status.get_next_id()
@@ -238,7 +234,7 @@ def card_choice_at_uno_two(valid_card_list: list, should_play_draw4: bool, game_
                 rtn_list += specials_dict.get(key, [])
 
             # #直後の人が持っていない色を認識
-            if game_status.other_open_cards[target_id][0]["color"] not in {"black", "white"}:
+            if CARD_COLOR[game_status.other_open_cards[target_id][0]] not in {"black", "white"}:
                 rtn_list += target_dont_have_num_color(game_status.other_open_cards[target_id], nums_dict)
 
             #白いワイルドを手札に加える
@@ -287,14 +283,14 @@ def card_choice_at_uno(valid_card_list: list, before_card: dict, pos: str, shoul
     # 有効カード情報を取得
     for card in valid_card_list:
         #スペシャルカードと数字カードを振り分け
-        card_special = card.get('special')
-        card_number = card.get('number')
+        card_special = CARD_SPECIAL[card]
+        card_number = CARD_NUMBER[card]
 
         if card_number is None:
             specials_dict[card_special].append(card)
         else:
             nums_list.append(card)
-            card_color = card.get('color')
+            card_color = CARD_COLOR[card]
             nums_dict[card_color][card_number] = card
 
 
@@ -307,7 +303,7 @@ def card_choice_at_uno(valid_card_list: list, before_card: dict, pos: str, shoul
         rtn_list = []
 
         #もし直後のやつが手札公開していて、その手札公開した札の中でまだ使用していない札があれば
-        if len(game_status.other_open_cards[target_id]) > 0 and game_status.other_open_cards[target_id][0]["color"] not in {"black", "white"}: #特殊処理が走る
+        if len(game_status.other_open_cards[target_id]) > 0 and CARD_COLOR[game_status.other_open_cards[target_id][0]] not in {"black", "white"}: #特殊処理が走る
             rtn_list += specials_dict.get('draw_2', [])
             rtn_list += specials_dict.get('skip', [])
 
@@ -366,8 +362,8 @@ def card_choice_at_uno(valid_card_list: list, before_card: dict, pos: str, shoul
         before_card_type = before_card.get("number") or before_card.get("special")
         if len(game_status.other_open_cards[target_id]) > 0: #特殊処理が走る
             open_card = game_status.other_open_cards[target_id][0]
-            open_card_color = open_card.get("color")
-            open_card_type = open_card.get("number") or open_card.get("special")
+            open_card_color = CARD_COLOR[open_card]
+            open_card_type = CARD_NUMBER[open_card] or CARD_SPECIAL[open_card]
             if open_card_color not in {"black", "white"} and before_card_color != open_card_color and before_card_type != open_card_type:
                 if should_play_draw4:
                     specials_key_list = [ 'white_wild', 'wild_shuffle', 'wild', 'reverse', 'wild_draw_4', 'draw_2' ,'skip']
@@ -414,25 +410,6 @@ def card_choice_at_uno(valid_card_list: list, before_card: dict, pos: str, shoul
 
 
 
-def uno_player_cnt(order_dic: dict):
-    uno_cnt = 0
-    for i in order_dic.values():
-        if i["UNO"]:
-            uno_cnt += 1
-
-    return uno_cnt
-
-
-def get_uno_player_pos(order_dic: dict):
-    uno_pos_lis = []
-    for i in order_dic.values():
-        if i["UNO"]:
-            uno_pos_lis.append(i["位置"])
-
-    return uno_pos_lis
-
-
-
 def get_uno_card_order(specials_dict: dict, nums_list: list, specials_pri_list: list, target_id: str, game_status: any) -> list:
     # 返り値の作成
     rtn_list = []
@@ -444,7 +421,7 @@ def get_uno_card_order(specials_dict: dict, nums_list: list, specials_pri_list:
     color_lis = deffesive_color_order(target_id, game_status)
 
     color_lis.reverse()
-    nums_list = sorted(nums_list, key=lambda x: (x["number"], color_lis.index(x["color"])), reverse=True)
+    nums_list = sorted(nums_list, key=lambda x: (CARD_NUMBER[x], color_lis.index(CARD_COLOR[x])), reverse=True)
     rtn_list += nums_list
 
     return rtn_list
@@ -455,7 +432,7 @@ def get_big_number_order_lis(nums_list: list, target_id: str, game_status: any)
     color_lis = deffesive_color_order(target_id, game_status)
 
     color_lis.reverse()
-    rtn_list = sorted(nums_list, key=lambda x: (x["number"], color_lis.index(x["color"])), reverse=True)
+    rtn_list = sorted(nums_list, key=lambda x: (CARD_NUMBER[x], color_lis.index(CARD_COLOR[x])), reverse=True)
 
     return rtn_list
 
@@ -465,14 +442,14 @@ def target_dont_have_num_color(open_cards: list, nums_dict: dict):
     #直後の人が持っていない色を認識
     color_candidate = ["red", "blue", "green", "yellow"]
     for card in open_cards:
-        if card["color"] in color_candidate:
-            color_candidate.remove(card["color"])
+        if CARD_COLOR[card] in color_candidate:
+            color_candidate.remove(CARD_COLOR[card])
 
     #直後の人が持っていない数字を取得
     number_candidate = list(range(10))
     for card in open_cards:
-        if card.get("number", -1) in number_candidate:
-            number_candidate.remove(card["number"])
+        if CARD_NUMBER[card] in number_candidate:
+            number_candidate.remove(CARD_NUMBER[card])
 
     #直後の人が持っていない色＆数字を満たす札をtmp_num_rtn_listに入れる
     tmp_num_rtn_lis = []
@@ -488,7 +465,7 @@ def target_dont_have_num_color(open_cards: list, nums_dict: dict):
 
 
 
-def analyze_situation(my_id: str, my_cards: list, player_card_counts: dict, wild_shuffle_flag: bool) -> str:
+def analyze_situation(my_id: str, my_cards: list, player_card_counts: dict, wild_shuffle_flag: bool, params: any=DEFAULT_PARAMS) -> str:
     """
     全体の手札の状況から戦況判断する関数
     Args:
@@ -496,6 +473,7 @@ def analyze_situation(my_id: str, my_cards: list, player_card_counts: dict, wild
         my_cards(list): 自分の手札
         player_card_counts: プレイヤーのカード枚数
         wild_shuffle_flag: シャッフルワイルド持ってるか
+        params: 戦略の閾値(StrategyParams)
 
     Returns:
         str: モード
@@ -507,11 +485,11 @@ def analyze_situation(my_id: str, my_cards: list, player_card_counts: dict, wild
     if min_cards_num == 1:
         return "uno"
 
-    elif num_my_cards < 5: # 自分が4枚以下
+    elif num_my_cards < params.offensive_hand_size: # 自分が4枚以下
         return "offensive"
 
-    elif min_cards_num < 5: # 4枚以下のプレイヤーがいる
-        if num_my_cards - min_cards_num < 5: # 最少手札との差が5枚未満
+    elif min_cards_num < params.danger_hand_size: # 4枚以下のプレイヤーがいる
+        if num_my_cards - min_cards_num < params.hand_gap: # 最少手札との差が5枚未満
             if min_cards_num == 2: # 2枚のプレイヤーがいる
                 return "deffensive"
             else:
@@ -521,7 +499,7 @@ def analyze_situation(my_id: str, my_cards: list, player_card_counts: dict, wild
             if min_cards_num <= 3: # 3枚以下のプレイヤーがいる
                 return "deffensive"
             else:
-                if num_my_cards - min_cards_num >= 8: # 最少手札との差が10枚以上
+                if num_my_cards - min_cards_num >= params.defensive_gap: # 最少手札との差が8枚以上
                     return "deffensive"
                 else:
                     return "offensive"
@@ -566,31 +544,109 @@ def select_change_color(my_cards: list, g_status: any, mode: str="offensive", ta
     return select_color
 
 
+def select_color_of_wild(cards: list, my_id: str, before_player: str, num_card_of_player: dict, play_mode: str, game_status: any) -> str:
+    """
+    ワイルド・ワイルドドロー4を出すときに変更する色を選出する
+    UNO宣言しているプレイヤーの人数と位置に応じて守りの色を優先する
+
+    Args:
+        cards(list): 自分の手札
+        my_id(str): 自分のid
+        before_player(str): 直前のプレイヤーのid
+        num_card_of_player(dict): {キー:プレイヤーID, 値:手札の枚数}
+        play_mode(str): select_play_cardで選ばれたモード
+        game_status: Statusインスタンス
+
+    Returns:
+        str: 選択された色
+    """
+    next_player = game_status.get_next_id()
+    mid_player = game_status.get_mid_id()
+    uno_pos = game_status.uno_positions()
+    uno_cnt = NUM_OF_POS[uno_pos]
+
+    #UNOplayer3人の時は
+    if uno_cnt == 3:
+        color_lis = deffesive_color_order(next_player, game_status)
+        color = color_lis[0]
+
+    elif uno_cnt == 2:
+        if uno_pos == POS_BEFORE | POS_MID:
+            color_lis = deffesive_color_order(mid_player, game_status)
+            color = color_lis[0]
+
+        elif uno_pos == POS_NEXT | POS_MID:
+            color_lis = deffesive_color_order(next_player, game_status)
+            color = color_lis[0]
 
+        elif uno_pos == POS_NEXT | POS_BEFORE:
+            color_lis = deffesive_color_order(next_player, game_status)
+            color = color_lis[0]
+
+        else:
+            color = select_change_color(game_status.my_cards, game_status, play_mode)
+
+    elif uno_cnt == 1:
+        if uno_pos == POS_NEXT or uno_pos == POS_BEFORE:
+            target_id = next_player if uno_pos == POS_NEXT else before_player
+            if len(game_status.other_open_cards[target_id]) > 0: #特殊処理が走る
+                #UNOの人が持っていない色を認識
+                my_colors = offensive_color_order(cards, game_status.cards_status)
+                open_card = game_status.other_open_cards[target_id][0]
+                open_card_coler = CARD_COLOR[open_card]
+
+                if open_card_coler in {"black", "white"}:
+                    color = my_colors[0]
+                else:
+                    for my_coler in my_colors:
+                        if my_coler != open_card_coler:
+                            color = my_coler
+                            break
+            else:
+                color_lis = deffesive_color_order(target_id, game_status)
+                color = color_lis[0]
+
+        elif uno_pos == POS_MID:
+            color_lis = deffesive_color_order(mid_player, game_status)
+            color = color_lis[0]
+
+        else:
+            color = select_change_color(game_status.my_cards, game_status, play_mode)
+
+    else:
+        target_id = None
+        if play_mode == "deffensive":
+            # プレイヤーの手札枚数が最も少ないプレイヤーを取得する
+            cnt_min = 112
+            for k, v in num_card_of_player.items():
+                if k != my_id and v < cnt_min:
+                    target_id = k
+                    cnt_min = v
+        color = select_change_color(game_status.my_cards, game_status, play_mode, target_id)
 
-def color_counting(color: str, card_status: dict) -> int:
+    return color
+
+
+
+
+def color_counting(color: str, card_status: np.ndarray) -> int:
     """
     色を指定し、その色の場に出ていない札が何枚残っているか返す関数
 
     Args:
         color(str): 指定した色
-        card_status(dict): 場に出ていない札を管理する変数
+        card_status(np.ndarray): 場に出ていない札を管理する変数
 
     Returns:
         int:何枚残っているか
 
     """
-    card_nums = card_status[color]
-    color_num = 0
-    for v in card_nums.values():
-        color_num += v
-
-    return color_num
+    return int(card_status[COLOR_ROW[color]].sum())
 
 
 
 
-def offensive_mode_v2(cards: list, my_card: list, cards_status: dict, challenge_sucess: bool, games: any) -> list:
+def offensive_mode_v2(cards: list, my_card: list, cards_status: np.ndarray, challenge_sucess: bool, games: any) -> list:
     """
     攻撃モード
     cards :自分の中で出せるカード
@@ -602,9 +658,6 @@ def offensive_mode_v2(cards: list, my_card: list, cards_status: dict, challenge_
     if len(my_card) == 1:
         return cards
 
-    shuffle_wild = {'color':'black', 'special':'wild_shuffle'}
-    wild_draw_4 = {'color':'black', 'special':'wild_draw_4'}
-    # white_wild = {'color':'white', 'special':'white_wild'}
 
     ans_list = []
     color_order = offensive_color_order(my_card, cards_status)
@@ -612,64 +665,64 @@ def offensive_mode_v2(cards: list, my_card: list, cards_status: dict, challenge_
     if games.num_game <= 3:
         spe_lis = []
         for card in cards: #スキップ、リバースを優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "skip" or card_special == "reverse":
-                spe_lis.append([card, (color_order.index(card["color"]), 0)])
+                spe_lis.append([card, (color_order.index(CARD_COLOR[card]), 0)])
 
         for card in cards: #ドロー2はスキップ、リバースの次に優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "draw_2":
-                spe_lis.append([card, (color_order.index(card["color"]), 1)])
+                spe_lis.append([card, (color_order.index(CARD_COLOR[card]), 1)])
 
         ans_list += [card for card, _ in sorted(spe_lis, key=lambda x: (x[1][0], x[1][1]))]
 
         num_lis = []
         for card in cards: #3色をキープして戦う = 手札の中で最も多い色から消費する
-            if card.get("number") is not None:
-                num_lis.append([card, (color_order.index(card["color"]), card["number"])])
+            if CARD_NUMBER[card] is not None:
+                num_lis.append([card, (color_order.index(CARD_COLOR[card]), CARD_NUMBER[card])])
 
         ans_list += [card for card, _ in sorted(num_lis, key=lambda x: (x[1][0], -x[1][1]))]
 
     else:
         skip_reverse_lis = []
         for card in cards: #スキップ、リバースを優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "skip" or card_special == "reverse":
                 skip_reverse_lis.append(card)
-        skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_order.index(x["color"]))
+        skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_order.index(CARD_COLOR[x]))
         ans_list += skip_reverse_lis
 
         draw_2_lis = []
         for card in cards: #ドロー2はスキップ、リバースの次に優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "draw_2":
                 draw_2_lis.append(card)
-        draw_2_lis = sorted(draw_2_lis, key=lambda x: color_order.index(x["color"]))
+        draw_2_lis = sorted(draw_2_lis, key=lambda x: color_order.index(CARD_COLOR[x]))
         ans_list += draw_2_lis
 
         num_lis = []
         for card in cards: #3色をキープして戦う = 手札の中で最も多い色から消費する
-            if card.get("number") is not None:
-                num_lis.append((card, color_order.index(card["color"]), card["number"]))
+            if CARD_NUMBER[card] is not None:
+                num_lis.append((card, color_order.index(CARD_COLOR[card]), CARD_NUMBER[card]))
         num_lis_2 = [item[0] for item in sorted(num_lis, key=lambda x: (x[1], -x[2]))]
         ans_list += num_lis_2
 
 
     wild_lis = []
     for card in cards:# ワイルド系カードを1枚だけ残して、それで上がれるようにする
-        if card.get("special") in ["wild", "white_wild", "wild_draw_4", "wild_shuffle"]:
-            if card.get("special") == "wild_shuffle" and len(my_card) == 1: # シャッフルワイルドは手札1枚の時にしか出さない
+        if CARD_SPECIAL[card] in ["wild", "white_wild", "wild_draw_4", "wild_shuffle"]:
+            if CARD_SPECIAL[card] == "wild_shuffle" and len(my_card) == 1: # シャッフルワイルドは手札1枚の時にしか出さない
                 wild_lis.append((card, 4))
 
-            elif card.get("special") != "wild_shuffle": # ワイルド、白いワイルドの方を優先度高く出す
-                wild_lis.append((card, ["wild", "white_wild", "wild_draw_4"].index(card.get("special"))))
+            elif CARD_SPECIAL[card] != "wild_shuffle": # ワイルド、白いワイルドの方を優先度高く出す
+                wild_lis.append((card, ["wild", "white_wild", "wild_draw_4"].index(CARD_SPECIAL[card])))
 
     wild_lis_2 = [item[0] for item in sorted(wild_lis, key=lambda x: x[1])]
     ans_list += wild_lis_2
 
     #シャッフルワイルドとワイルドドロー4を持っているときは先にワイルドドロー4を出し、チャレンジ成功されたら次のターンでシャッフル
-    if wild_draw_4 in cards and shuffle_wild in cards and challenge_sucess:
-        return [shuffle_wild]
+    if WILD_DRAW_4 in cards and WILD_SHUFFLE in cards and challenge_sucess:
+        return [WILD_SHUFFLE]
     else:
         # print("出せるのは(offensive)")
         # print(ans_list)
@@ -691,9 +744,6 @@ def offensive_mode_v3(cards: list, my_card: list, challenge_success: bool, g_sta
     if len(my_card) == 1:
         return cards
 
-    shuffle_wild = {'color':'black', 'special':'wild_shuffle'}
-    wild_draw_4 = {'color':'black', 'special':'wild_draw_4'}
-    # white_wild = {'color':'white', 'special':'white_wild'}
     num_my_cards = len(my_card)
 
     ans_list = []
@@ -704,28 +754,28 @@ def offensive_mode_v3(cards: list, my_card: list, challenge_success: bool, g_sta
     color_order = offensive_color_order(my_card, g_status.cards_status)
 
     for card in cards: #スキップ、リバースを優先的に出す
-        card_special = card.get("special")
+        card_special = CARD_SPECIAL[card]
         if card_special == "skip" or card_special == "reverse":
             skip_reverse_lis.append(card)
-    skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_order.index(x["color"]))
+    skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_order.index(CARD_COLOR[x]))
 
     for card in cards: #ドロー2はスキップ、リバースの次に優先的に出す
-        card_special = card.get("special")
+        card_special = CARD_SPECIAL[card]
         if card_special == "draw_2":
             draw_2_lis.append(card)
-    draw_2_lis = sorted(draw_2_lis, key=lambda x: color_order.index(x["color"]))
+    draw_2_lis = sorted(draw_2_lis, key=lambda x: color_order.index(CARD_COLOR[x]))
 
     for card in cards: #3色をキープして戦う = 手札の中で最も多い色から消費する
-        if card.get("number") is not None:
-            num_lis.append([card, (color_order.index(card["color"]), card["number"])])
+        if CARD_NUMBER[card] is not None:
+            num_lis.append([card, (color_order.index(CARD_COLOR[card]), CARD_NUMBER[card])])
     num_lis_2 = [card for card, _ in sorted(num_lis, key=lambda x: (x[1][0], -x[1][1]))]
 
     wild_order = ["wild", "white_wild", "wild_draw_4", "wild_shuffle"]
     for card in cards: # ワイルド系カードを1枚だけ残して、それで上がれるようにする
-        card_special = card.get("special")
+        card_special = CARD_SPECIAL[card]
         if card_special in wild_order:
             wild_lis.append(card)
-    wild_lis_2 = sorted(wild_lis, key=lambda x: wild_order.index(x["special"]))
+    wild_lis_2 = sorted(wild_lis, key=lambda x: wild_order.index(CARD_SPECIAL[x]))
 
     # 答えのリストに追加する
     ans_list += skip_reverse_lis
@@ -734,9 +784,9 @@ def offensive_mode_v3(cards: list, my_card: list, challenge_success: bool, g_sta
     ans_list += wild_lis_2
 
     #シャッフルワイルドとワイルドドロー4を持っているときは先にワイルドドロー4を出し、チャレンジ成功されたら次のターンでシャッフル
-    if wild_draw_4 in cards and shuffle_wild in cards and challenge_success:
-        return [shuffle_wild]
-    elif len(ans_list) > 0 and ans_list[0] == shuffle_wild and num_my_cards <= 3:
+    if WILD_DRAW_4 in cards and WILD_SHUFFLE in cards and challenge_success:
+        return [WILD_SHUFFLE]
+    elif len(ans_list) > 0 and ans_list[0] == WILD_SHUFFLE and num_my_cards <= 3:
         return []
     else:
         # print("出せるのは(offensive)")
@@ -747,7 +797,7 @@ def offensive_mode_v3(cards: list, my_card: list, challenge_success: bool, g_sta
 
 
 
-def offensive_color_order(cards: dict, card_status: dict) -> list:
+def offensive_color_order(cards: list, card_status: np.ndarray) -> list:
     """
     手札から出すべき色の優先度を吐く
     Args:
@@ -759,21 +809,22 @@ def offensive_color_order(cards: dict, card_status: dict) -> list:
     """
     can_play_colors = set()
     for card in cards:
-        card_color = card["color"]
+        card_color = CARD_COLOR[card]
         if card_color not in ["black","white"]:
             can_play_colors.add(card_color)
 
     color_list = []
     color_dic = {'red':[0, 0], 'blue':[0, 0], 'green':[0, 0], 'yellow':[0, 0]}
+    color_nums = card_status.sum(axis=1)
     for k in color_dic.keys():
-        color_dic[k][0] = color_counting(k, card_status)
+        color_dic[k][0] = int(color_nums[COLOR_ROW[k]])
     color_tuple = sorted(color_dic.items(), key=lambda x: x[1][0])
     for k, v in color_tuple:
         if v[0] <= 4 and k in can_play_colors:
             color_list.append(k)
 
     for card in cards:
-        card_color = card["color"]
+        card_color = CARD_COLOR[card]
         if card_color not in ["black","white"]:
             color_dic[card_color][1] += 1
     color_tuple = sorted(color_dic.items(), key=lambda x: (-x[1][1], x[1][0]))
@@ -807,17 +858,16 @@ def deffesive_mode_v2(my_id: list, cards: list, player_cards_cnt: dict, should_p
             cnt_min = v
     color_list = deffesive_color_order(tgt_id, g_status)
 
-    wild_draw_4 = {'color':'black', 'special':'wild_draw_4'}
     ans_list = []
     for card in cards:
-        card_color = card.get("color")
-        if "special" in card.keys():
-            card_special = card.get("special")
+        card_color = CARD_COLOR[card]
+        if CARD_SPECIAL[card] is not None:
+            card_special = CARD_SPECIAL[card]
             if card_special == "wild_shuffle":
                 #シャッフルワイルドを持っているときは3枚以下のプレイヤーが出たときに使う
                 if min_cards_check(my_id, player_cards_cnt) <= 3:
                     ans_list.append([card, (0, 1, 1)])
-                elif challenge_success and wild_draw_4 in cards:
+                elif challenge_success and WILD_DRAW_4 in cards:
                     ans_list.append([card, (4, 1, 1)])
                 # else:
                 #     ans_list.append([card, (9, 1, 1)])
@@ -840,8 +890,8 @@ def deffesive_mode_v2(my_id: list, cards: list, player_cards_cnt: dict, should_p
             elif card_special == "skip" or card_special == "reverse":
                 ans_list.append([card, (6, 1, color_list.index(card_color))])
 
-        elif "number" in card.keys():
-            ans_list.append([card, (7, card.get("number"), color_list.index(card_color))])
+        elif CARD_NUMBER[card] is not None:
+            ans_list.append([card, (7, CARD_NUMBER[card], color_list.index(card_color))])
 
     if len(ans_list) > 0:
         rtn_list = [card for card, _ in sorted(ans_list, key=lambda x: (x[1][0], -x[1][1], x[1][2]))]
@@ -864,8 +914,6 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
     """
     # print("---防御モード発動---")
 
-    shuffle_wild = {'color':'black', 'special':'wild_shuffle'}
-    wild_draw_4 = {'color':'black', 'special':'wild_draw_4'}
     min_cards_num = min_cards_check(my_id, player_cards_cnt)
 
     ans_list = []
@@ -876,12 +924,12 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
 
     if not wild_shuffle_flag:
         for card in cards: # ワイルドを優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "wild":
                 wild_lis.append(card)
 
         for card in cards: # 白いワイルドを優先的に出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "white_wild":
                 wild_lis.append(card)
 
@@ -889,20 +937,20 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
         # そうでなければこの優先順位でワイルドドロー4を出す
         if should_play_draw4:
             for card in cards: # ワイルドドロー4を優先的に出す
-                card_special = card.get("special")
+                card_special = CARD_SPECIAL[card]
                 if card_special == "wild_draw_4":
                     wild_lis.append(card)
     else:
         if min_cards_num <= 2:
-            wild_lis.append(shuffle_wild) # シャッフル最優先で出す
+            wild_lis.append(WILD_SHUFFLE) # シャッフル最優先で出す
 
             for card in cards: # ワイルドを優先的に出す
-                card_special = card.get("special")
+                card_special = CARD_SPECIAL[card]
                 if card_special == "wild":
                     wild_lis.append(card)
 
             for card in cards: # 白いワイルドを優先的に出す
-                card_special = card.get("special")
+                card_special = CARD_SPECIAL[card]
                 if card_special == "white_wild":
                     wild_lis.append(card)
 
@@ -910,13 +958,13 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
             # そうでなければこの優先順位でワイルドドロー4を出す
             if should_play_draw4:
                 for card in cards: # ワイルドドロー4を優先的に出す
-                    card_special = card.get("special")
+                    card_special = CARD_SPECIAL[card]
                     if card_special == "wild_draw_4":
                         wild_lis.append(card)
 
         else:
             for card in cards: # 白いワイルドを優先的に出す
-                card_special = card.get("special")
+                card_special = CARD_SPECIAL[card]
                 if card_special == "white_wild":
                     wild_lis.append(card)
 
@@ -924,15 +972,15 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
             # そうでなければこの優先順位でワイルドドロー4を出す
             if not challenge_success:
                 for card in cards: # ワイルドドロー4を優先的に出す
-                    card_special = card.get("special")
+                    card_special = CARD_SPECIAL[card]
                     if card_special == "wild_draw_4":
                         wild_lis.append(card)
 
             # 白いワイルド, ワイルドドロー4の次の優先度でシャッフル出す
-            wild_lis.append(shuffle_wild)
+            wild_lis.append(WILD_SHUFFLE)
 
             for card in cards: # ワイルドを優先的に出す
-                card_special = card.get("special")
+                card_special = CARD_SPECIAL[card]
                 if card_special == "wild":
                     wild_lis.append(card)
 
@@ -951,28 +999,28 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
     color_list = deffesive_color_order(tgt_id, g_status)
 
     for card in cards: #ドロー2を優先的に出す
-        card_special = card.get("special")
+        card_special = CARD_SPECIAL[card]
         if card_special == "draw_2":
             draw_2_lis.append(card)
 
     # ドロー2カードを出すべき色順に並び替える
-    draw_2_lis = sorted(draw_2_lis, key=lambda x: color_list.index(x["color"]))
+    draw_2_lis = sorted(draw_2_lis, key=lambda x: color_list.index(CARD_COLOR[x]))
 
     for card in cards: #スキップ・リバースを優先的に出す
-        card_special = card.get("special")
+        card_special = CARD_SPECIAL[card]
         if card_special in ["skip", "reverse"]:
             skip_reverse_lis.append(card)
 
     # スキップ・リバースカードを出すべき色順に並び替える
-    skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_list.index(x["color"]))
+    skip_reverse_lis = sorted(skip_reverse_lis, key=lambda x: color_list.index(CARD_COLOR[x]))
 
     for card in cards: #数字カードは大きい数を優先的に出す
-        if card.get("number") is not None:
+        if CARD_NUMBER[card] is not None:
             num_lis.append(card)
-            # num_lis.append((card, int(card["number"])))
+            # num_lis.append((card, int(CARD_NUMBER[card])))
 
     color_list.reverse()
-    num_lis_2 = sorted(num_lis, key=lambda x: (x["number"], color_list.index(x["color"])), reverse=True)
+    num_lis_2 = sorted(num_lis, key=lambda x: (CARD_NUMBER[x], color_list.index(CARD_COLOR[x])), reverse=True)
     # num_lis_2 = [item[0] for item in sorted(num_lis, key=lambda x: x[1], reverse=True)]
 
     # 答えのリストに追加する
@@ -982,9 +1030,9 @@ def deffesive_mode_v3(my_id: str, cards: list, player_cards_cnt: dict, wild_shuf
     ans_list += num_lis_2
 
     # チャレンジが成功された場合は, ワイルドドロー4の優先順位は最低になる
-    if wild_draw_4 in cards and wild_draw_4 not in ans_list:
+    if WILD_DRAW_4 in cards and WILD_DRAW_4 not in ans_list:
         for card in cards: # ワイルドドロー4を出す
-            card_special = card.get("special")
+            card_special = CARD_SPECIAL[card]
             if card_special == "wild_draw_4":
                 ans_list.append(card)
 
@@ -1004,16 +1052,15 @@ def deffesive_color_order(player: str, g_status: any) -> list:
     """
     # cards_statusを参照して既知なカードのうち、
     # 最も場に出されている色順に結果を出力したい
-    dic = g_status.cards_status.copy()
-    del dic["white"], dic["black"] # 白、黒は除外する
-    tmp_lis = sorted(dic.items(), key=lambda x:sum(x[1].values()))
-    color_list = [item[0] for item in tmp_lis]
+    # 白、黒は除外する (同じ枚数の色はSTATUS_COLORSの順に並べる)
+    color_list = [STATUS_COLORS[i] for i in np.argsort(g_status.count_colors(), kind='stable')]
 
     # game_statusインスタンスから, そのプレイヤーの色に関するゲーム記録を取得する
     # 指定したプレイヤーの色に関する記録があれば参照する
-    if len(g_status.player_color_log[player]) > 0:
+    last_color = g_status.last_color(player)
+    if last_color is not None:
         # プレイヤーの苦手な色を取得
-        last_chose_color, chose_reason, just_before = g_status.player_color_log[player][-1]
+        last_chose_color, chose_reason, just_before = last_color
 
         # 最後に記録された色は除外する
         # print("除外するか？", last_chose_color in color_list)
@@ -1032,7 +1079,7 @@ def deffesive_color_order(player: str, g_status: any) -> list:
 
 
 
-def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_card_counts: dict, num_of_deck: int, game_status: any, games: any):
+def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_card_counts: dict, num_of_deck: int, game_status: any, games: any, inputs: dict=None):
     """
     チャレンジの判断関数
     args:
@@ -1043,25 +1090,25 @@ def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_car
         num_of_deck: int = 山札の枚数
         game_status: Statusインスタンス
         games: Gamesインスタンス
+        inputs: dict = 判断材料を書き込む辞書(capture.pyで記録する 不要ならNone)
     return:
         bool値 = チャレンジするか否か
     """
+    if inputs is None:
+        inputs = {}
     try:
         # チャレンジ後開示された手札を記憶し、次ワイルドドロー4が出されたときに記憶した手札から場に出されたカードを消したものの中で出せるものがあれば必ずチャレンジ
         if len(game_status.other_open_cards[before_id]) > 0: # カードをオープンしてたら
             card_color = before_card.get("color") #wild_draw_4前のカードの色を取得
             card_number = before_card.get("number")
             card_special = before_card.get("special")
+            inputs.update(by_open_cards=True, hand_size=player_card_counts[before_id])
             for card in game_status.other_open_cards[before_id]: # オープンカードを片っ端からチェック
-                if card.get("color") == card_color: # 同じ色あったら
-                    # print('記憶したカードでチャレンジ')
-                    game_status.special_logic_flag[0] = True
-                    return True
-                elif card_number is not None and card_number == card.get("number"):
+                if CARD_COLOR[card] == card_color: # 同じ色あったら
                     # print('記憶したカードでチャレンジ')
                     game_status.special_logic_flag[0] = True
                     return True
-                elif card_special is not None and card_special == card.get("spacial"):
+                elif card_number is not None and card_number == CARD_NUMBER[card]:
                     # print('記憶したカードでチャレンジ')
                     game_status.special_logic_flag[0] = True
                     return True
@@ -1077,9 +1124,7 @@ def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_car
 
         # 色が何枚残っているか確認
         card_color = before_card.get("color")
-        color_num = 0
-        for i in game_status.cards_status[card_color].values():
-            color_num += i
+        color_num = game_status.count_color(card_color)
 
         # print("残っている色の枚数は" + str(color_num))
 
@@ -1094,12 +1139,7 @@ def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_car
         x = player_card_counts[before_id]
 
         #見えていないワイルドカードの枚数を確認
-        wild_num = 0
-        for k, i in game_status.cards_status["black"].items():
-            if k != "wild_draw_4":
-                wild_num += i
-
-        wild_num += game_status.cards_status["white"]["white_wild"]
+        wild_num = game_status.count_wild()
 
         # print("xの枚数は" + str(x))
         # print("x+y+zの枚数は" + str(other_card_num))
@@ -1107,7 +1147,8 @@ def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_car
         # print("ワイルドカードの枚数は" + str(wild_num))
 
         #確率計算
-        p = 1 - (math.comb(num_of_deck + other_card_num - color_num - wild_num, x) / math.comb(num_of_deck + other_card_num, x))
+        p = 1 - miss_probability(num_of_deck + other_card_num, color_num + wild_num, x)
+        inputs.update(by_open_cards=False, hand_size=x, p=p, num_of_deck=num_of_deck, other_card_num=other_card_num)
 
         # print("他の出せるカードを"+ before_id +"が持っている確率は :" + str(p))
 
@@ -1119,21 +1160,23 @@ def challenge_dicision(before_card: dict, my_id: str, before_id: str, player_car
             return True
 
 
+        params = game_status.params
+
         # 300戦した後のチャレンジ成功率が30%以下のとき、チャレンジしない
-        if games.num_game > 300 and games.challenge_cnt[before_id][0] != 0:
+        if games.num_game > params.warmup_games and games.challenge_cnt[before_id][0] != 0:
             p_success = games.challenge_cnt[before_id][1] / games.challenge_cnt[before_id][0]
             # print(before_id, 'に対するチャレンジ成功率:', p_success)
             # print('チャレンジ回数:', games.challenge_cnt[before_id][0], '成功回数:', games.challenge_cnt[before_id][1])
-            if p_success <= 0.3:
+            if p_success <= params.challenge_success_floor:
                 return False
 
 
         # 相手が6枚以上持っているとき
-        if player_card_counts[before_id] >= 6:
-            return p >= 0.6 # 相手が出せるカードを持っている確率が60%以上のときチャレンジ
+        if player_card_counts[before_id] >= params.challenge_hand_size:
+            return p >= params.challenge_p_large # 相手が出せるカードを持っている確率が60%以上のときチャレンジ
         # 相手が6枚未満の時
         else:
-            return p >= 0.9 # 相手が出せるカードを持っている確率が90%以上のときチャレンジ
+            return p >= params.challenge_p_small # 相手が出せるカードを持っている確率が90%以上のときチャレンジ
 
     except:
         print('Error: challenge')
@@ -1161,7 +1204,7 @@ def play_draw4_dicision(valid_cards: list, before_card: dict, my_cards: list, my
     try:
         # 他に出せるカードがないとき必ず出す
         for card in valid_cards:
-            if card != {"special": "wild_draw_4", "color": "black"}:
+            if card != WILD_DRAW_4:
                 break
         else:
             return True
@@ -1173,20 +1216,22 @@ def play_draw4_dicision(valid_cards: list, before_card: dict, my_cards: list, my
         if challenge_success:
             return False
 
-        if games.num_game > 300 and games.challenged_cnt[next_id][0] != 0:
+        params = game_status.params
+
+        if games.num_game > params.warmup_games and games.challenged_cnt[next_id][0] != 0:
             p_challenge = games.challenged_cnt[next_id][1] / games.challenged_cnt[next_id][0]
             # print(next_id, 'のチャレンジ率:', p_challenge)
             # print('ドロ4出した回数:', games.challenged_cnt[next_id][0], 'チャレンジ回数:', games.challenged_cnt[next_id][1])
-            if p_challenge >= 0.9: # 300戦した後、自分がドロー4出したときの相手のチャレンジ率が90%以上のとき、出さない
+            if p_challenge >= params.draw4_challenge_rate_high: # 300戦した後、自分がドロー4出したときの相手のチャレンジ率が90%以上のとき、出さない
                 return False
-            elif p_challenge <= 0.05: # 300戦した後、自分がドロー4出したときの相手のチャレンジ率が5%以下のとき、出す
+            elif p_challenge <= params.draw4_challenge_rate_low: # 300戦した後、自分がドロー4出したときの相手のチャレンジ率が5%以下のとき、出す
                 return True
 
-        if games.num_game > 300 and games.challenged_cnt[next_id][1] != 0:
+        if games.num_game > params.warmup_games and games.challenged_cnt[next_id][1] != 0:
             p_success = games.challenged_cnt[next_id][2] / games.challenged_cnt[next_id][1]
             # print(next_id, 'のチャレンジ成功率:', p_success)
             # print('チャレンジ回数:', games.challenged_cnt[next_id][1], '成功回数:', games.challenged_cnt[next_id][2])
-            if p_success >= 0.8: # 300戦した後の被チャレンジ成功率が 80%以上のとき、出さない
+            if p_success >= params.draw4_challenged_success: # 300戦した後の被チャレンジ成功率が 80%以上のとき、出さない
                 return False
 
 
@@ -1195,9 +1240,7 @@ def play_draw4_dicision(valid_cards: list, before_card: dict, my_cards: list, my
 
         # 色が何枚残っているか確認
         card_color = before_card.get("color")
-        color_num = 0
-        for i in game_status.cards_status[card_color].values():
-            color_num += i
+        color_num = game_status.count_color(card_color)
 
 
         # 他プレイヤーが何枚残っているか確認
@@ -1213,17 +1256,12 @@ def play_draw4_dicision(valid_cards: list, before_card: dict, my_cards: list, my
         w = player_card_counts[my_id]
 
         # 見えていないワイルドカードの枚数を確認
-        wild_num = 0
-        for k, i in game_status.cards_status["black"].items():
-            if k != "wild_draw_4":
-                wild_num += i
-
-        wild_num += game_status.cards_status["white"]["white_wild"]
+        wild_num = game_status.count_wild()
 
         for card in my_cards:
-            if card.get("color") == card_color:
+            if CARD_COLOR[card] == card_color:
                 color_num += 1
-            elif card.get("color") in {"black", "white"} and card.get("special") != "wild_draw_4":
+            elif CARD_COLOR[card] in {"black", "white"} and card != WILD_DRAW_4:
                 wild_num += 1
 
 
@@ -1234,16 +1272,16 @@ def play_draw4_dicision(valid_cards: list, before_card: dict, my_cards: list, my
         # print("ワイルドカードの枚数は" + str(wild_num))
 
         #確率計算
-        p = 1 - (math.comb(num_of_deck + other_card_num - color_num - wild_num, w) / math.comb(num_of_deck + other_card_num, w))
+        p = 1 - miss_probability(num_of_deck + other_card_num, color_num + wild_num, w)
 
         # print("他の出せるカードを"+ my_id +"が持っている確率は :" + str(p))
 
         # 相手が6枚以上持っているとき
-        if player_card_counts[my_id] >= 6:
-            return p < 0.5 # 自分が出せるカードを持っている確率が50%以上のとき出さない
+        if player_card_counts[my_id] >= params.draw4_hand_size:
+            return p < params.draw4_p_large # 自分が出せるカードを持っている確率が50%以上のとき出さない
         # 相手が6枚未満の時
         else:
-            return p < 0.8 # 自分が出せるカードを持っている確率が80%以上のとき出さない
+            return p < params.draw4_p_small # 自分が出せるカードを持っている確率が80%以上のとき出さない
 
     except:
         print('Error: draw 4')
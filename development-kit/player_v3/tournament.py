@@ -0,0 +1,353 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import math
+import multiprocessing
+import os
+import sys
+import time
+from agent import Agent
+from engine import Engine, MAX_PLAYER, WHITE_WILD_BIND_2
+
+
+"""
+定数
+"""
+DEVELOPMENT_KIT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..') # 各バージョンのプレイヤーの配置場所
+LEGACY_VERSIONS = ['v0', 'v1', 'v2'] # Socketクライアントとして実装されているバージョン
+LEGACY_MODULES = ['strategy', 'status', 'card_status'] # 各バージョンのディレクトリ内で同名になっているモジュール
+SEARCH_VERSIONS = ['v4'] # Agentクラスを持ち、探索で手を選ぶバージョン
+SEARCH_MODULES = ['agent', 'anytime', 'card', 'consts', 'ismcts', 'probability', 'rollout', 'status', 'strategy'] # player_v3と同名になっているモジュール
+DEFAULT_LINEUP = ['v0', 'v1', 'v2', 'v3'] # 標準の席割り
+DEFAULT_THINK_TIME = 100 # 探索を行うバージョンの1手あたりの思考時間(ms)
+DUMMY_ARGV = ['player', 'http://localhost:8080', 'tournament', 'player'] # 旧バージョン読み込み時のコマンドライン引数
+
+
+class LegacyAgent:
+    """
+    旧バージョン(player_v0〜v2)をSocket通信なしで動かすためのラッパー
+    プレイヤーのスクリプトを席ごとに独立したモジュールとして読み込み、受信イベントをそのまま渡す
+    """
+    HANDLERS = [
+        'on_reciever_card', 'on_first_player', 'on_color_of_wild', 'on_update_color', 'on_shuffle_wild',
+        'on_next_player', 'on_play_card', 'on_draw_card', 'on_play_draw_card', 'on_challenge',
+        'on_public_card', 'on_pointed_not_say_uno', 'on_finish_turn', 'on_finish_game', 'on_penalty',
+    ]
+
+    def __init__(self, version: str, name: str) -> None:
+        """
+        Args:
+            version (str): 'v0', 'v1', 'v2'
+            name (str): モジュール名の重複を避けるための識別子
+        """
+        self.version = version
+        self.module = load_legacy_module(version, name)
+        self.module.TIME_DELAY = 0
+        for handler in self.HANDLERS:
+            if hasattr(self.module, handler):
+                setattr(self, handler, getattr(self.module, handler))
+
+
+    @property
+    def send_event(self):
+        return self.module.send_event
+
+
+    @send_event.setter
+    def send_event(self, send_event) -> None:
+        self.module.send_event = send_event
+
+
+    def join_room_callback(self, data_res: dict) -> None:
+        """試合参加の結果を受け取る"""
+        self.module.id = data_res.get('your_id')
+        self.module.once_connected = True
+
+
+def silent_print(*args, **kwargs) -> None:
+    """ログを出力しない"""
+    pass
+
+
+def load_module(directory: str, filename: str, name: str, modules: list) -> any:
+    """
+    他のバージョンのディレクトリにあるスクリプトを読み込む
+
+    各バージョンはstrategy.py等を同名のフラットなimportで参照しているため、
+    読み込みの間だけsys.pathとsys.modulesを差し替えて他のバージョンと混ざらないようにする
+
+    Args:
+        directory (str): バージョンのディレクトリ
+        filename (str): 読み込むスクリプト
+        name (str): 読み込んだモジュールに付ける名前
+        modules (list): 他のバージョンと同名になっているモジュール
+    Returns:
+        tuple: (module, 読み込まれた同名のモジュールのリスト)
+    """
+    path = os.path.join(directory, filename)
+
+    saved_modules = {key: sys.modules.pop(key) for key in modules if key in sys.modules}
+    saved_path = list(sys.path)
+    saved_argv = list(sys.argv)
+    sys.path.insert(0, directory)
+    sys.argv = list(DUMMY_ARGV)
+    submodules = []
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        with contextlib.redirect_stdout(io.StringIO()):
+            spec.loader.exec_module(module)
+    finally:
+        for key in modules:
+            submodule = sys.modules.pop(key, None)
+            if submodule is not None:
+                submodules.append(submodule)
+        sys.modules.update(saved_modules)
+        sys.path[:] = saved_path
+        sys.argv = saved_argv
+
+    return module, submodules
+
+
+def load_legacy_module(version: str, name: str) -> any:
+    """
+    旧バージョンのプレイヤーを読み込む
+    対戦ログの出力はプレイヤー本体・戦略モジュールともに抑止する
+
+    Args:
+        version (str): 'v0', 'v1', 'v2'
+        name (str): 読み込んだモジュールに付ける名前
+    Returns:
+        module:
+    """
+    directory = os.path.join(DEVELOPMENT_KIT_DIR, 'player_{}'.format(version))
+    module, submodules = load_module(directory, 'player_{}.py'.format(version), name, LEGACY_MODULES)
+    module.print = silent_print
+    for submodule in submodules:
+        submodule.print = silent_print
+
+    return module
+
+
+_search_agent_modules = {} # 読み込み済みの探索バージョンのagentモジュール(プロセスごとに1度だけ読み込む)
+
+
+def load_agent_class(version: str) -> any:
+    """
+    探索を行うバージョンのAgentクラスを読み込む
+    モジュールに状態を持たないため、席ごとではなくプロセスごとに1度だけ読み込む
+
+    Args:
+        version (str): 'v4'
+    Returns:
+        class:
+    """
+    if version not in _search_agent_modules:
+        directory = os.path.join(DEVELOPMENT_KIT_DIR, 'player_{}'.format(version))
+        module, _ = load_module(directory, 'agent.py', 'agent_{}'.format(version), SEARCH_MODULES)
+        _search_agent_modules[version] = module
+    return _search_agent_modules[version].Agent
+
+
+def create_agent(version: str, name: str, think_time: int=DEFAULT_THINK_TIME, max_iteration: int=None, seed: int=None) -> any:
+    """
+    バージョン名からプレイヤーを生成する
+
+    Args:
+        version (str): 'v0', 'v1', 'v2', 'v3'(バージョン自動選択), 'v3:v2', 'v3:v3'(player_v3の戦略を固定), 'v4'
+        name (str): 識別子
+        think_time (int): 探索を行うバージョンの1手あたりの思考時間(ms)
+        max_iteration (int): 探索を行うバージョンの1手あたりの反復回数の上限
+        seed (int): 探索の乱数シード
+    Returns:
+        any:
+    """
+    if version in LEGACY_VERSIONS:
+        return LegacyAgent(version, name)
+    if version in SEARCH_VERSIONS:
+        return load_agent_class(version)(time_delay=0, think_time=think_time, max_iteration=max_iteration, seed=seed)
+    if version == 'v3':
+        return Agent(time_delay=0)
+    if version.startswith('v3:'):
+        return Agent(version=version.split(':', 1)[1], time_delay=0)
+    raise ValueError('Unknown version: {}'.format(version))
+
+
+def play_game(task: tuple) -> dict:
+    """
+    1試合を実行する(プロセスプールのワーカーで実行される)
+
+    Args:
+        task (tuple): (試合番号, 席割り, 対戦数, 乱数シード, 白いワイルドの種類, 思考時間, 反復回数の上限)
+    Returns:
+        dict: バージョンごとの得点・勝数
+    """
+    game_no, lineup, total_turn, seed, white_wild, think_time, max_iteration = task
+    # 試合ごとに席割りを回転させて座席の偏りをなくす
+    shift = game_no % len(lineup)
+    lineup = lineup[shift:] + lineup[:shift]
+
+    agents = [
+        create_agent(version, 'player_{}_{}'.format(version.replace(':', '_'), i), think_time, max_iteration,
+                     None if seed is None else (seed + game_no) * MAX_PLAYER + i)
+        for i, version in enumerate(lineup)
+    ]
+    engine = Engine(agents, total_turn, white_wild, None if seed is None else seed + game_no, raise_error=False)
+    result = engine.run()
+
+    summary = {}
+    for player, version in zip(engine.members, lineup):
+        record = summary.setdefault(version, {'score': 0, 'turn_win': 0, 'game_win': 0, 'seats': 0})
+        record['score'] += result['score'][player]
+        record['turn_win'] += result['order'][player]
+        record['game_win'] += 1 if result['winner'] == player else 0
+        record['seats'] += 1
+
+    return {
+        'summary': summary,
+        'turns': engine.turn,
+        'penalty': engine.num_penalty,
+        'timeout': engine.num_timeout,
+        'error': engine.num_error,
+    }
+
+
+class Tournament:
+    """
+    複数プロセスで試合を並列に実行し、バージョンごとの成績を集計する
+    """
+    def __init__(self, lineup: list=DEFAULT_LINEUP, num_game: int=100, total_turn: int=100,
+                 processes: int=None, seed: int=None, white_wild: str=WHITE_WILD_BIND_2,
+                 think_time: int=DEFAULT_THINK_TIME, max_iteration: int=None) -> None:
+        """
+        Args:
+            lineup (list): 4席に座らせるバージョン
+            num_game (int): 試合数
+            total_turn (int): 1試合あたりの対戦数
+            processes (int): ワーカープロセス数(Noneの場合はCPUコア数)
+            seed (int): 乱数シード
+            white_wild (str): 白いワイルドの種類
+            think_time (int): 探索を行うバージョンの1手あたりの思考時間(ms)
+            max_iteration (int): 探索を行うバージョンの1手あたりの反復回数の上限
+        """
+        if len(lineup) != MAX_PLAYER:
+            raise ValueError('lineup must have {} players'.format(MAX_PLAYER))
+        self.lineup = list(lineup)
+        self.num_game = num_game
+        self.total_turn = total_turn
+        self.processes = processes or os.cpu_count() or 1
+        self.seed = seed
+        self.white_wild = white_wild
+        self.think_time = think_time
+        self.max_iteration = max_iteration
+
+        # Games.scoresと同様にバージョンごとの得点を積み上げる
+        self.scores = {version: 0 for version in self.lineup}
+        self.turn_win = {version: 0 for version in self.lineup}
+        self.game_win = {version: 0 for version in self.lineup}
+        self.seats = {version: 0 for version in self.lineup}
+        self.game_scores = {version: [] for version in self.lineup} # 1席1試合あたりの得点(信頼区間の計算用)
+        self.num_turn = 0
+        self.num_penalty = 0
+        self.num_timeout = 0
+        self.num_error = 0
+
+
+    def tasks(self) -> list:
+        return [
+            (i, self.lineup, self.total_turn, self.seed, self.white_wild, self.think_time, self.max_iteration)
+            for i in range(self.num_game)
+        ]
+
+
+    def run(self, progress=None) -> dict:
+        """
+        全試合を実行する
+
+        Args:
+            progress (func): 1試合終了ごとに呼ばれる関数 progress(終了した試合数)
+        Returns:
+            dict: 集計結果
+        """
+        if self.processes == 1:
+            results = map(play_game, self.tasks())
+            self.collect(results, progress)
+        else:
+            with multiprocessing.Pool(self.processes) as pool:
+                chunksize = max(1, self.num_game // (self.processes * 4))
+                self.collect(pool.imap_unordered(play_game, self.tasks(), chunksize), progress)
+
+        return self.report()
+
+
+    def collect(self, results, progress=None) -> None:
+        """試合結果を集計する"""
+        for i, result in enumerate(results):
+            for version, record in result['summary'].items():
+                self.scores[version] += record['score']
+                self.turn_win[version] += record['turn_win']
+                self.game_win[version] += record['game_win']
+                self.seats[version] += record['seats']
+                self.game_scores[version].append(record['score'] / record['seats'])
+            self.num_turn += result['turns']
+            self.num_penalty += result['penalty']
+            self.num_timeout += result['timeout']
+            self.num_error += result['error']
+            if progress is not None:
+                progress(i + 1)
+
+
+    def report(self) -> dict:
+        """
+        バージョンごとの成績
+
+        Returns:
+            dict: {version: {'score', 'mean', 'ci95', 'turn_win', 'game_win'}}
+        """
+        report = {}
+        for version in self.scores:
+            samples = self.game_scores[version]
+            mean = sum(samples) / len(samples) if samples else 0.0
+            if len(samples) > 1:
+                var = sum((x - mean) ** 2 for x in samples) / (len(samples) - 1)
+                ci95 = 1.96 * math.sqrt(var / len(samples))
+            else:
+                ci95 = float('nan')
+            report[version] = {
+                'score': self.scores[version],
+                'mean': mean,
+                'ci95': ci95,
+                'turn_win': self.turn_win[version],
+                'game_win': self.game_win[version],
+            }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel tournament between player versions')
+    parser.add_argument('-g', '--num_game', action='store', type=int, default=100, help='Number of games')
+    parser.add_argument('-n', '--total_turn', action='store', type=int, default=100, help='Number of turns per game')
+    parser.add_argument('-p', '--processes', action='store', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=None, help='Random seed')
+    parser.add_argument('-l', '--lineup', action='store', nargs=MAX_PLAYER, default=DEFAULT_LINEUP, help='Versions to seat (v0 v1 v2 v3 v3:v2 v3:v3 v4)')
+    parser.add_argument('-t', '--think_time', action='store', type=int, default=DEFAULT_THINK_TIME, help='Thinking time per move in ms for searching versions')
+    parser.add_argument('-i', '--iteration', action='store', type=int, default=None, help='Max search iterations per move (reproducible with --seed)')
+    args = parser.parse_args(sys.argv[1:])
+
+    tournament = Tournament(args.lineup, args.num_game, args.total_turn, args.processes, args.seed,
+                            think_time=args.think_time, max_iteration=args.iteration)
+    start = time.perf_counter()
+    report = tournament.run()
+    elapsed = time.perf_counter() - start
+
+    print('games: {}, turns: {}, processes: {}'.format(args.num_game, tournament.num_turn, tournament.processes))
+    for version, record in sorted(report.items(), key=lambda item: -item[1]['mean']):
+        print('{:>6}: score {:>8} / mean {:>9.1f} ± {:.1f} / turn win {:>6} / game win {:>4}'.format(
+            version, record['score'], record['mean'], record['ci95'], record['turn_win'], record['game_win']))
+    print('penalty: {}, timeout: {}, error: {}'.format(tournament.num_penalty, tournament.num_timeout, tournament.num_error))
+    print('{:.2f} sec ({:.1f} turns/sec)'.format(elapsed, tournament.num_turn / elapsed))
+
+
+if __name__ == '__main__':
+    main()
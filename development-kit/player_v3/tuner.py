@@ -0,0 +1,189 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from agent import Agent
+from engine import Engine, MAX_PLAYER, WHITE_WILD_BIND_2
+from params import DEFAULTS, SEARCH_SPACE, DEFAULT_PARAMS, StrategyParams
+
+
+"""
+戦略の閾値(params.py)の探索
+
+閾値の候補を探索範囲(SEARCH_SPACE)から無作為に選び(ランダムサーチ)、engine.pyの自己対戦で評価する
+候補の閾値の席2つと既定値の席2つで対戦し、候補の席の1対戦あたりの平均得点を候補の成績とする
+全ての候補(既定値どうしを含む)を同じ乱数シードの試合で評価し(共通乱数法)、
+試合ごとに既定値どうしの成績との差をとって、差の平均と95%信頼区間を求める
+候補×試合をプロセスプールで並列に実行する
+
+2ラウンド目以降は、前のラウンドまでで差の平均が最大の候補の周りから候補を選ぶ(範囲はラウンドごとに半分にする)
+
+例) python tuner.py -c 32 -g 20 -n 100 -r 2
+"""
+
+
+def play_match(task: tuple) -> tuple:
+    """
+    1試合を実行する(プロセスプールのワーカーで実行される)
+
+    Args:
+        task (tuple): (候補の番号, 閾値, 試合番号, 乱数シード, 1試合あたりの対戦数, 白いワイルドの種類, 戦略のバージョン)
+    Returns:
+        tuple: (候補の番号, 試合番号, 候補の席の1対戦あたりの平均得点)
+    """
+    index, values, game_no, seed, total_turn, white_wild, version = task
+    params = StrategyParams(**values)
+    # 試合ごとに候補の席を入れ替えて座席の偏りをなくす
+    shift = game_no % 2
+    seats = [(i + shift) % 2 == 0 for i in range(MAX_PLAYER)]
+    agents = [Agent(version=version, time_delay=0, params=params if tuned else DEFAULT_PARAMS) for tuned in seats]
+    engine = Engine(agents, total_turn, white_wild, seed + game_no, raise_error=False)
+    result = engine.run()
+
+    score = sum(result['score'][player] for player, tuned in zip(engine.members, seats) if tuned)
+    return index, game_no, score / (seats.count(True) * max(engine.turn, 1))
+
+
+def sample_params(rng: random.Random, center: dict=None, scale: float=1.0) -> dict:
+    """
+    探索範囲から閾値を選ぶ
+
+    Args:
+        rng (random.Random): 乱数生成器
+        center (dict): 中心にする閾値(Noneの場合は範囲全体から一様に選ぶ)
+        scale (float): centerの周りから選ぶ範囲の幅(探索範囲の幅に対する比)
+    Returns:
+        dict: 閾値
+    """
+    values = dict(DEFAULTS)
+    for name, (low, high) in SEARCH_SPACE.items():
+        if center is None:
+            value = rng.uniform(low, high)
+        else:
+            width = (high - low) * scale / 2
+            value = min(high, max(low, rng.uniform(center[name] - width, center[name] + width)))
+        values[name] = int(round(value)) if isinstance(DEFAULTS[name], int) else round(value, 3)
+    return values
+
+
+class Tuner:
+    """
+    閾値の候補を複数プロセスで評価する
+    """
+    def __init__(self, num_game: int=20, total_turn: int=100, processes: int=None, seed: int=0,
+                 white_wild: str=WHITE_WILD_BIND_2, version: str='v3') -> None:
+        """
+        Args:
+            num_game (int): 候補ごとの試合数
+            total_turn (int): 1試合あたりの対戦数
+            processes (int): ワーカープロセス数(Noneの場合はCPUコア数)
+            seed (int): 乱数シード(全ての候補で同じ試合のシードを使う)
+            white_wild (str): 白いワイルドの種類
+            version (str): 使用する戦略のバージョン
+        """
+        self.num_game = num_game
+        self.total_turn = total_turn
+        self.processes = processes or os.cpu_count() or 1
+        self.seed = seed
+        self.white_wild = white_wild
+        self.version = version
+        self.candidates = [] # 評価した閾値
+        self.scores = [] # 候補ごとの試合ごとの得点
+        self.baseline = None # 既定値どうしの試合ごとの得点
+
+
+    def evaluate(self, candidates: list, progress=None) -> None:
+        """
+        候補を評価する(最初の呼び出しでは既定値どうしの試合も行う)
+
+        Args:
+            candidates (list): 閾値(dict)のリスト
+            progress (func): 1試合終了ごとに呼ばれる関数 progress(終了した試合数, 全試合数)
+        """
+        start = len(self.candidates)
+        if self.baseline is None:
+            candidates = [DEFAULT_PARAMS.to_dict()] + list(candidates)
+        self.candidates += candidates
+        self.scores += [[0.0] * self.num_game for _ in candidates]
+
+        tasks = [
+            (start + i, values, game_no, self.seed, self.total_turn, self.white_wild, self.version)
+            for i, values in enumerate(candidates)
+            for game_no in range(self.num_game)
+        ]
+        if self.processes == 1:
+            results = map(play_match, tasks)
+            self.collect(results, len(tasks), progress)
+        else:
+            with multiprocessing.Pool(self.processes) as pool:
+                chunksize = max(1, len(tasks) // (self.processes * 4))
+                self.collect(pool.imap_unordered(play_match, tasks, chunksize), len(tasks), progress)
+
+        if self.baseline is None:
+            self.baseline = self.scores[0]
+
+
+    def collect(self, results, total: int, progress=None) -> None:
+        """試合結果を集計する"""
+        for i, (index, game_no, score) in enumerate(results):
+            self.scores[index][game_no] = score
+            if progress is not None:
+                progress(i + 1, total)
+
+
+    def report(self) -> list:
+        """
+        候補ごとの既定値との得点差
+
+        Returns:
+            list: [(差の平均, 95%信頼区間の幅, 候補の平均得点, 閾値)] 差の平均の大きい順
+        """
+        report = []
+        n = self.num_game
+        for values, scores in zip(self.candidates, self.scores):
+            diffs = [score - base for score, base in zip(scores, self.baseline)]
+            mean = sum(diffs) / n
+            if n > 1:
+                var = sum((d - mean) ** 2 for d in diffs) / (n - 1)
+                ci95 = 1.96 * math.sqrt(var / n)
+            else:
+                ci95 = float('nan')
+            report.append((mean, ci95, sum(scores) / n, values))
+        report.sort(key=lambda item: -item[0])
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Random search of strategy thresholds with common random numbers')
+    parser.add_argument('-c', '--candidates', action='store', type=int, default=16, help='Number of candidates per round')
+    parser.add_argument('-r', '--rounds', action='store', type=int, default=1, help='Number of rounds (later rounds sample around the best candidate)')
+    parser.add_argument('-g', '--num_game', action='store', type=int, default=20, help='Number of games per candidate')
+    parser.add_argument('-n', '--total_turn', action='store', type=int, default=100, help='Number of turns per game')
+    parser.add_argument('-p', '--processes', action='store', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('-s', '--seed', action='store', type=int, default=0, help='Random seed')
+    parser.add_argument('-v', '--version', action='store', type=str, default='v3', choices=['v2', 'v3'], help='Strategy version to tune')
+    parser.add_argument('-t', '--top', action='store', type=int, default=5, help='Number of candidates to print')
+    args = parser.parse_args(sys.argv[1:])
+
+    tuner = Tuner(args.num_game, args.total_turn, args.processes, args.seed, version=args.version)
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for round_no in range(args.rounds):
+        if round_no == 0:
+            candidates = [sample_params(rng) for _ in range(args.candidates)]
+        else:
+            best = tuner.report()[0][3]
+            candidates = [sample_params(rng, best, 0.5 ** round_no) for _ in range(args.candidates)]
+        tuner.evaluate(candidates)
+
+        print('round {}: candidates {}, games {} x {} turns, {:.1f} sec'.format(
+            round_no + 1, len(tuner.candidates), args.num_game, args.total_turn, time.perf_counter() - start))
+        for mean, ci95, score, values in tuner.report()[:args.top]:
+            print('    diff {:+7.2f} ± {:5.2f} / score {:+7.2f} / {}'.format(mean, ci95, score, StrategyParams(**values)))
+
+
+if __name__ == '__main__':
+    main()
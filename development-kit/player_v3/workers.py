@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import random
+import time
+from anytime import Candidate, candidate_moves, evaluate
+from rollout import simulate_round
+
+
+"""
+思考処理の並列化
+
+python-socketioの受信スレッドで動く思考処理は1コアしか使えないため、
+接続前に常駐のプロセスプールを起動しておき、持ち時間内のプレイアウトを各ワーカーに分担させる
+ワーカーには盤面をStatusではなく整数のリスト(見えていない札・手札・手札枚数など)で渡し、
+候補手ごとの集計値(Candidate.stats)だけを返してもらって締め切り前に合算する
+締め切りは全プロセス共通のtime.time()で渡す
+プールを複数の席・部屋で共有すると、他の席のタスクの後ろで待たされることがある
+そのため、ワーカーは受け取った時点で締め切りを過ぎたタスクをすぐに捨てる
+同時に思考する部屋の数だけワーカーが足りるようにprocessesを決めること
+"""
+RESULT_SLACK = 0.02 # ワーカーの締め切りを全体の締め切りより早める時間(秒) 結果の返送に使う
+
+
+def warm_up(_) -> int:
+    """ワーカーの起動確認"""
+    return os.getpid()
+
+
+def playout_worker(task: tuple) -> list:
+    """
+    ワーカーで締め切りまでプレイアウトを行う
+
+    Args:
+        task (tuple): (盤面, 候補手, 初期解, time.time()基準の締め切り, 乱数シード)
+            盤面は (見えていない札, 自分の手札, 他のプレイヤーの手札枚数, 公開済みの手札, 場札の色, 場札の種類)
+    Returns:
+        list: 候補手ごとの集計値(締め切りを過ぎていた場合は空)
+    """
+    state, moves, incumbent, wall_deadline, seed = task
+    # 他のタスクの後ろで待たされて締め切りを過ぎていたら、プレイアウトせずにワーカーを空ける
+    budget = wall_deadline - time.time()
+    if budget <= 0:
+        return []
+    deadline = time.perf_counter() + budget
+    pool, cards, card_counts, open_cards, top_color, top_kind = state
+    rng = random.Random(seed)
+
+    def simulate(moves):
+        return simulate_round(pool, cards, card_counts, open_cards, top_color, top_kind, moves, rng)
+
+    return [candidate.stats() for candidate in evaluate(incumbent, moves, simulate, deadline)]
+
+
+class ThinkPool:
+    """
+    思考処理用の常駐プロセスプール
+    """
+    def __init__(self, processes: int=None) -> None:
+        """
+        Args:
+            processes (int): ワーカープロセス数(Noneの場合はCPUコア数)
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.pool = None
+        self.num_late = 0 # 締め切りに間に合わなかったワーカーの結果の数
+
+
+    @property
+    def running(self) -> bool:
+        return self.pool is not None
+
+
+    def start(self) -> None:
+        """
+        プールを起動し、全てのワーカーが応答するまで待つ
+        Socket通信のスレッドが動き出す前(接続前)に呼び出すこと
+        """
+        if self.pool is not None:
+            return
+        self.pool = multiprocessing.Pool(self.processes)
+        self.pool.map(warm_up, range(self.processes), chunksize=1)
+
+
+    def close(self) -> None:
+        """プールを停止する"""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+
+    def evaluate(self, state: tuple, moves: list, incumbent: any, deadline: float, rng: any) -> list:
+        """
+        全てのワーカーでプレイアウトを行い、締め切りまでに返ってきた結果を合算する
+
+        Args:
+            state (tuple): 盤面 (playout_workerを参照)
+            moves (list): 候補手
+            incumbent (any): 初期解
+            deadline (float): time.perf_counter()基準の締め切り
+            rng (random.Random): ワーカーごとの乱数シードを決める乱数生成器
+        Returns:
+            list: candidate_moves()の順の候補手ごとの評価
+        """
+        moves = candidate_moves(incumbent, moves)
+        candidates = [Candidate(move) for move in moves]
+        budget = deadline - time.perf_counter() - RESULT_SLACK
+        if budget <= 0 or len(candidates) < 2:
+            return candidates
+
+        wall_deadline = time.time() + budget
+        results = [
+            self.pool.apply_async(playout_worker, ((state, moves, incumbent, wall_deadline, rng.random()),))
+            for _ in range(self.processes)
+        ]
+        for result in results:
+            try:
+                stats = result.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except multiprocessing.TimeoutError:
+                # 締め切りに間に合わなかったワーカーの結果は使わない
+                self.num_late += 1
+                continue
+            for candidate, stat in zip(candidates, stats):
+                candidate.merge(*stat)
+        return candidates
@@ -0,0 +1,357 @@
+import math
+import time
+from card import NUM_KINDS_OF_COLOR, WILD, WILD_DRAW_4, WILD_SHUFFLE, WHITE_WILD, ARR_WILD
+from consts import ARR_COLOR
+from rollout import MAX_STEP, NO_KIND, DRAW_2_KIND, SKIP_KIND, REVERSE_KIND, PLAYABLE, top_index, choose_card, choose_color, shuffle_hands, hand_score
+
+
+"""
+確定化による情報集合モンテカルロ木探索 (Single-Observer ISMCTS)
+
+反復ごとに見えていない札を他のプレイヤーと山札に配り直し(確定化)、
+その盤面で出せる手だけを対象にUCBで木を降りて、末端からプレイアウトした得点を各手番のプレイヤーの報酬として逆伝播する
+木の節点は行動の列で共有し、確定化ごとに出せる手が変わるためUCBの試行回数には「出せた回数」を使う
+"""
+DRAW = -1 # 山札から引く行動
+UCB_C = 0.7 # UCBの探索係数
+REWARD_SCALE = 100.0 # 得点を報酬に変換する際の除数
+MIN_ITERATION = 100 # これ未満しか探索できなかった場合はヒューリスティックの答えを使う
+SWITCH_MARGIN = 0.2 # ヒューリスティックの手から差し替えるのに必要な平均報酬の差
+CHALLENGE_RATE = 0.5 # 出せるカードがあるのにワイルドドロー4を出した場合にチャレンジされる確率
+_COLOR_INDEX = {color: i for i, color in enumerate(ARR_COLOR)}
+
+
+class SimState:
+    """
+    探索用の盤面
+    席は自分を0とした手番順の番号で表し、複製が速いように手札・山札は整数のリストで持つ
+    """
+    __slots__ = ('hands', 'deck', 'discard', 'seat', 'step', 'top_color', 'top_kind', 'winner')
+
+    def __init__(self, hands: list, deck: list, top_color: int, top_kind: int, seat: int=0, step: int=1) -> None:
+        """
+        Args:
+            hands (list): 席ごとの手札
+            deck (list): 山札(末尾から引く)
+            top_color (int): 場札の色
+            top_kind (int): 場札の種類
+            seat (int): 手番の席
+            step (int): 手番の進む向き(1 or -1)
+        """
+        self.hands = hands
+        self.deck = deck
+        self.discard = []
+        self.seat = seat
+        self.step = step
+        self.top_color = top_color
+        self.top_kind = top_kind
+        self.winner = None
+
+
+    def clone(self) -> 'SimState':
+        state = SimState.__new__(SimState)
+        state.hands = [hand[:] for hand in self.hands]
+        state.deck = self.deck[:]
+        state.discard = self.discard[:]
+        state.seat = self.seat
+        state.step = self.step
+        state.top_color = self.top_color
+        state.top_kind = self.top_kind
+        state.winner = self.winner
+        return state
+
+
+    def legal_actions(self) -> list:
+        """手番のプレイヤーが選べる行動(出せるカードの種類 + 山札から引く)"""
+        playable = PLAYABLE[top_index(self.top_color, self.top_kind)]
+        actions = list({card for card in self.hands[self.seat] if playable[card]})
+        actions.append(DRAW)
+        return actions
+
+
+    def draw(self, rng: any) -> any:
+        """山札から1枚引く(山札が無くなった場合は捨て札を混ぜて戻す)"""
+        if not self.deck:
+            self.deck = self.discard
+            self.discard = []
+            rng.shuffle(self.deck)
+        if self.deck:
+            return self.deck.pop()
+        return None
+
+
+    def apply(self, action: int, rng: any) -> None:
+        """
+        手番のプレイヤーの行動を適用し、次に行動を選ぶプレイヤーまで手番を進める
+        山札から引いたカードが出せる場合はそのまま出す
+
+        Args:
+            action (int): 出すカード or DRAW
+            rng (random.Random): 乱数生成器
+        """
+        num = len(self.hands)
+        hand = self.hands[self.seat]
+        card = action
+        if action == DRAW:
+            card = self.draw(rng)
+            if card is None:
+                self.seat = (self.seat + self.step) % num
+                return
+            hand.append(card)
+            if not PLAYABLE[top_index(self.top_color, self.top_kind)][card]:
+                self.seat = (self.seat + self.step) % num
+                return
+
+        if card == WILD_DRAW_4 and self.is_challenged(hand, rng):
+            # チャレンジ成功: ワイルドドロー4を手札に戻したまま4枚引き、次のプレイヤーの手番になる
+            for _ in range(4):
+                drawn = self.draw(rng)
+                if drawn is not None:
+                    hand.append(drawn)
+            self.seat = (self.seat + self.step) % num
+            return
+
+        hand.remove(card)
+        self.discard.append(card)
+        if not hand:
+            self.winner = self.seat
+            return
+
+        skip = False
+        penalty = 0
+        if card >= WILD:
+            if card != WHITE_WILD:
+                self.top_color = choose_color(hand)
+            self.top_kind = NO_KIND
+            if card == WILD_DRAW_4:
+                penalty = 4
+            elif card == WHITE_WILD:
+                penalty = 2
+            elif card == WILD_SHUFFLE:
+                shuffle_hands(self.hands, self.seat, self.step, rng)
+                if self.hands[self.seat]:
+                    self.top_color = choose_color(self.hands[self.seat])
+        else:
+            self.top_color = card // NUM_KINDS_OF_COLOR
+            self.top_kind = card % NUM_KINDS_OF_COLOR
+            if self.top_kind == DRAW_2_KIND:
+                penalty = 2
+            elif self.top_kind == SKIP_KIND:
+                skip = True
+            elif self.top_kind == REVERSE_KIND:
+                self.step = -self.step
+
+        if penalty:
+            # ドロー系のカードは次のプレイヤーが引いてスキップされる
+            target = self.hands[(self.seat + self.step) % num]
+            for _ in range(penalty):
+                drawn = self.draw(rng)
+                if drawn is not None:
+                    target.append(drawn)
+            skip = True
+        self.seat = (self.seat + self.step * (2 if skip else 1)) % num
+
+
+    def is_challenged(self, hand: list, rng: any) -> bool:
+        """ワイルドドロー4以外に出せるカード(白いワイルドを除く)を持っている場合、一定の確率でチャレンジされる"""
+        playable = PLAYABLE[top_index(self.top_color, self.top_kind)]
+        for card in hand:
+            if card != WILD_DRAW_4 and card != WHITE_WILD and playable[card]:
+                return rng.random() < CHALLENGE_RATE
+        return False
+
+
+    def rollout(self, rng: any, max_step: int=MAX_STEP) -> list:
+        """全員がchoose_cardの方策で対戦終了まで進め、席ごとの得点を返す"""
+        for _ in range(max_step):
+            if self.winner is not None:
+                break
+            card = choose_card(self.hands[self.seat], self.top_color, self.top_kind)
+            self.apply(DRAW if card is None else card, rng)
+        return self.scores()
+
+
+    def scores(self) -> list:
+        """席ごとの得点(勝者がいない場合は全員が手札の点数だけ減点される)"""
+        scores = [-hand_score(hand) for hand in self.hands]
+        if self.winner is not None:
+            scores[self.winner] = -sum(scores)
+        return scores
+
+
+def void_cards(color_log: list) -> set:
+    """
+    出せずに山札から引いた後、まだ次のカードを引いていないプレイヤーが持っていないとみなすカード
+    その時点の場札の色のカードとワイルド系のカード(引いた1枚を除く)
+
+    Args:
+        color_log (list): Status.player_color_logのプレイヤーの記録
+    Returns:
+        set: 該当しない場合はNone
+    """
+    if not color_log:
+        return None
+    color, reason, just_before = color_log[-1]
+    if reason != 'cant_play_card' or not just_before or color not in _COLOR_INDEX:
+        return None
+    start = _COLOR_INDEX[color] * NUM_KINDS_OF_COLOR
+    return set(range(start, start + NUM_KINDS_OF_COLOR)) | set(ARR_WILD)
+
+
+def determinize(pool: list, my_cards: list, card_counts: list, open_cards: list, voids: list, top_color: int, top_kind: int, rng: any) -> SimState:
+    """
+    見えていない札を他のプレイヤーの手札と山札に無作為に配る
+    公開済みの手札は確定で持たせ、持っていないとみなすカード(void_cards)は1枚までしか配らない
+
+    Args:
+        pool (list): 見えていない札
+        my_cards (list): 自分の手札
+        card_counts (list): 手番順(自分の次から)の他のプレイヤーの手札枚数
+        open_cards (list): 手番順の他のプレイヤーの公開済みの手札
+        voids (list): 手番順の他のプレイヤーが持っていないとみなすカード(Noneは制約なし)
+        top_color (int): 場札の色
+        top_kind (int): 場札の種類
+        rng (random.Random): 乱数生成器
+    Returns:
+        SimState: 自分の手番の盤面
+    """
+    pool = list(pool)
+    rng.shuffle(pool)
+    hands = [list(my_cards)] + [[] for _ in card_counts]
+
+    # 公開済みの手札を先に配る
+    for i, (count, known) in enumerate(zip(card_counts, open_cards)):
+        for card in known:
+            if len(hands[i + 1]) < count and card in pool:
+                pool.remove(card)
+                hands[i + 1].append(card)
+
+    # 制約のあるプレイヤーから配る
+    order = sorted(range(len(card_counts)), key=lambda i: voids[i] is None)
+    for i in order:
+        hand = hands[i + 1]
+        rest = card_counts[i] - len(hand)
+        if rest <= 0:
+            continue
+        void = voids[i]
+        if void is None:
+            hand += pool[-rest:]
+            del pool[-rest:]
+            continue
+        allowed = 1 # 出せなかった後に引いた1枚
+        keep = []
+        while pool and rest > 0:
+            card = pool.pop()
+            if card in void:
+                if allowed <= 0:
+                    keep.append(card)
+                    continue
+                allowed -= 1
+            hand.append(card)
+            rest -= 1
+        if rest > 0:
+            # 制約を満たす札が足りない場合は残りから配る
+            hand += keep[:rest]
+            keep = keep[rest:]
+        pool += keep
+        rng.shuffle(pool)
+
+    return SimState(hands, pool, top_color, top_kind)
+
+
+class Node:
+    """探索木の節点(直前の行動とその行動を選んだ席を持つ)"""
+    __slots__ = ('action', 'parent', 'player', 'children', 'visits', 'avails', 'reward')
+
+    def __init__(self, action: int=None, parent: 'Node'=None, player: int=None) -> None:
+        self.action = action
+        self.parent = parent
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.avails = 1
+        self.reward = 0.0
+
+
+def search(sample, deadline: float, rng: any, max_iteration: int=None, c: float=UCB_C) -> tuple:
+    """
+    締め切り(または反復回数の上限)まで探索する
+
+    Args:
+        sample (func): sample() -> 確定化した自分の手番のSimState
+        deadline (float): time.perf_counter()基準の締め切り(Noneの場合は反復回数のみで打ち切る)
+        rng (random.Random): 乱数生成器
+        max_iteration (int): 反復回数の上限(Noneの場合は締め切りのみで打ち切る)
+        c (float): UCBの探索係数
+    Returns:
+        tuple: ({自分の行動: 節点}, 反復回数)
+    """
+    root = Node()
+    iteration = 0
+    log = math.log
+    sqrt = math.sqrt
+    while (max_iteration is None or iteration < max_iteration) and (deadline is None or time.perf_counter() < deadline):
+        state = sample()
+        node = root
+
+        # 選択・展開
+        while state.winner is None:
+            legal = state.legal_actions()
+            children = node.children
+            untried = [action for action in legal if action not in children]
+            if untried:
+                action = untried[int(rng.random() * len(untried))]
+                child = Node(action, node, state.seat)
+                children[action] = child
+                for other in legal:
+                    if other != action and other in children:
+                        children[other].avails += 1
+                state.apply(action, rng)
+                node = child
+                break
+
+            best = None
+            best_value = -math.inf
+            for action in legal:
+                child = children[action]
+                value = child.reward / child.visits + c * sqrt(log(child.avails) / child.visits)
+                child.avails += 1
+                if value > best_value:
+                    best = child
+                    best_value = value
+            state.apply(best.action, rng)
+            node = best
+
+        # プレイアウト
+        scores = state.rollout(rng)
+
+        # 逆伝播(各節点の報酬はその行動を選んだプレイヤーの得点)
+        while node.parent is not None:
+            node.visits += 1
+            node.reward += scores[node.player] / REWARD_SCALE
+            node = node.parent
+        root.visits += 1
+        iteration += 1
+
+    return root.children, iteration
+
+
+def select_action(children: dict, incumbent: int, margin: float=SWITCH_MARGIN) -> int:
+    """
+    探索結果から行動を選ぶ
+    最も訪問回数の多い行動を選ぶが、ヒューリスティックの手との平均報酬の差がmargin以下の場合はヒューリスティックの手を使う
+
+    Args:
+        children (dict): search()が返した{自分の行動: 節点}
+        incumbent (int): ヒューリスティックの手(カード or DRAW)
+        margin (float): 差し替えに必要な平均報酬の差
+    Returns:
+        int: カード or DRAW
+    """
+    best = max(children.values(), key=lambda child: child.visits)
+    base = children.get(incumbent)
+    if base is None or base.visits == 0:
+        return best.action
+    if best.reward / best.visits - base.reward / base.visits > margin:
+        return best.action
+    return incumbent
@@ -0,0 +1,317 @@
+import argparse
+import os
+import math
+import random
+import sys
+import time
+import socketio
+from strategy import *
+from consts import SocketConst, THINK_TIME
+from agent import Agent
+
+from rich import print
+
+
+
+
+"""
+定数
+"""
+TEST_TOOL_HOST_PORT = '3000' # 開発ガイドラインツールのポート番号
+
+"""
+コマンドラインから受け取った変数等
+"""
+parser = argparse.ArgumentParser(description='A demo player written in Python')
+parser.add_argument('host', action='store', type=str, help='Host to connect')
+parser.add_argument('room_name', action='store', type=str, help='Name of the room to join')
+parser.add_argument('player', action='store', type=str, help='Player name you join the game as')
+parser.add_argument('event_name', action='store', nargs='?', default=None, type=str, help='Event name for test tool') # 追加
+parser.add_argument('--think_time', action='store', type=int, default=THINK_TIME, help='Max thinking time per move in ms (0 to disable)')
+
+
+args = parser.parse_args(sys.argv[1:])
+host = args.host # 接続先（ディーラープログラム or 開発ガイドラインツール）
+room_name = args.room_name # ディーラー名
+player = args.player # プレイヤー名
+event_name = args.event_name # Socket通信イベント名
+think_time = args.think_time # 1手あたりの思考時間の上限(ms)
+is_test_tool = TEST_TOOL_HOST_PORT in host # 接続先が開発ガイドラインツールであるかを判定
+SPECIAL_LOGIC_TITLE = '◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯◯' # スペシャルロジック名
+
+"""
+グローバル変数
+"""
+once_connected = False
+
+"""
+コマンドライン引数のチェック
+"""
+if not host:
+    # 接続先のhostが指定されていない場合はプロセスを終了する
+    print('Host missed')
+    os._exit(0)
+else:
+    print('Host: {}'.format(host))
+
+# ディーラー名とプレイヤー名の指定があることをチェックする
+if not room_name or not player:
+    print('Arguments invalid')
+
+    if not is_test_tool:
+        # 接続先がディーラープログラムの場合はプロセスを終了する
+        os._exit(0)
+else:
+    print('Dealer: {}, Player: {}'.format(room_name, player))
+
+
+# 開発ガイドラインツールSTEP1で送信するサンプルデータ
+TEST_TOOL_EVENT_DATA = {
+    SocketConst.EMIT.JOIN_ROOM: {
+        'player': player,
+        'room_name': room_name,
+    },
+    SocketConst.EMIT.COLOR_OF_WILD: {
+        'color_of_wild': 'red',
+    },
+    SocketConst.EMIT.PLAY_CARD: {
+        'card_play': { 'color': 'black', 'special': 'wild' },
+        'yell_uno': False,
+        'color_of_wild': 'blue',
+    },
+    SocketConst.EMIT.DRAW_CARD: {},
+    SocketConst.EMIT.PLAY_DRAW_CARD: {
+        'is_play_card': True,
+        'yell_uno': True,
+        'color_of_wild': 'blue',
+    },
+    SocketConst.EMIT.CHALLENGE: {
+        'is_challenge': True,
+    },
+    SocketConst.EMIT.POINTED_NOT_SAY_UNO: {
+        'target': 'Player 1',
+    },
+    SocketConst.EMIT.SPECIAL_LOGIC: {
+        'title': SPECIAL_LOGIC_TITLE,
+    },
+}
+
+
+# Socketクライアント
+sio = socketio.Client()
+
+
+def random_by_number(num):
+    """
+    乱数取得
+
+    Args:
+        num (int):
+
+    Returns:
+        int:
+    """
+    return math.floor(random.random() * num)
+
+
+def send_event(event, data, callback = pass_func):
+    """
+    送信イベント共通処理
+
+    Args:
+        event (str): Socket通信イベント名
+        data (Any): 送信するデータ
+        callback (func): 個別処理
+    """
+    # print('Send {} event.'.format(event))
+    # print('req_data: ', data)
+
+    sent = time.perf_counter()
+
+    def after_func(err, res):
+        # 送信から応答までの往復時間を思考の締め切りの計算に使う
+        agent.latency.record(time.perf_counter() - sent)
+        if err:
+            # print('{} event failed!'.format(event))
+            # print(err)
+            return
+
+        # print('Send {} event.'.format(event))
+        # print('res_data: ', res)
+        callback(res)
+
+    sio.emit(event, data, callback=after_func)
+
+
+def receive_event(event, data, callback = pass_func):
+    """
+    受信イベント共通処理
+
+    Args:
+        event (str): Socket通信イベント名
+        data (Any): 送信するデータ
+        callback (func): 個別処理
+    """
+    # print('Receive {} event.'.format(event))
+    # print('res_data: ', data)
+
+    callback(data)
+
+
+# プレイヤーの思考・記録処理
+agent = Agent(send_event, log=print, think_time=think_time)
+
+
+"""
+Socket通信の確立
+"""
+@sio.on('connect')
+def on_connect():
+    print('Client connect successfully!')
+
+    if not once_connected:
+        if is_test_tool:
+            # テストツールに接続
+            if not event_name:
+                # イベント名の指定がない（開発ガイドラインSTEP2の受信のテストを行う時）
+                print('Not found event name')
+            elif not event_name in TEST_TOOL_EVENT_DATA:
+                # イベント名の指定があり、テストデータが定義されていない場合はエラー
+                print('Undefined test data. eventName: ', event_name)
+            else:
+                # イベント名の指定があり、テストデータが定義されている場合は送信する(開発ガイドラインSTEP1の送信のテストを行う時)
+                send_event(event_name, TEST_TOOL_EVENT_DATA[event_name])
+        else:
+            # ディーラープログラムに接続
+            data = {
+                'room_name': room_name,
+                'player': player,
+            }
+
+            def join_room_callback(*args):
+                global once_connected
+                print('Client join room successfully!')
+                once_connected = True
+                agent.join_room_callback(args[0])
+
+            send_event(SocketConst.EMIT.JOIN_ROOM, data, join_room_callback)
+
+
+"""
+Socket通信を切断
+"""
+@sio.on('disconnect')
+def on_disconnect():
+    print('Client disconnect.')
+    os._exit(0)
+
+
+"""
+Socket通信受信
+"""
+# プレイヤーがゲームに参加
+@sio.on(SocketConst.EMIT.JOIN_ROOM)
+def on_join_room(data_res):
+    receive_event(SocketConst.EMIT.JOIN_ROOM, data_res)
+
+
+# カードが手札に追加された
+@sio.on(SocketConst.EMIT.RECEIVER_CARD)
+def on_reciever_card(data_res):
+    receive_event(SocketConst.EMIT.RECEIVER_CARD, data_res, agent.on_reciever_card)
+
+
+# 対戦の開始
+@sio.on(SocketConst.EMIT.FIRST_PLAYER)
+def on_first_player(data_res):
+    receive_event(SocketConst.EMIT.FIRST_PLAYER, data_res, agent.on_first_player)
+
+
+# 場札の色指定を要求
+@sio.on(SocketConst.EMIT.COLOR_OF_WILD)
+def on_color_of_wild(data_res):
+    receive_event(SocketConst.EMIT.COLOR_OF_WILD, data_res, agent.on_color_of_wild)
+
+
+# 場札の色が変わった
+@sio.on(SocketConst.EMIT.UPDATE_COLOR)
+def on_update_color(data_res):
+    receive_event(SocketConst.EMIT.UPDATE_COLOR, data_res, agent.on_update_color)
+
+
+# シャッフルワイルドにより手札状況が変更
+@sio.on(SocketConst.EMIT.SHUFFLE_WILD)
+def on_shuffle_wild(data_res):
+    receive_event(SocketConst.EMIT.SHUFFLE_WILD, data_res, agent.on_shuffle_wild)
+
+
+# 自分の番
+@sio.on(SocketConst.EMIT.NEXT_PLAYER)
+def on_next_player(data_res):
+    receive_event(SocketConst.EMIT.NEXT_PLAYER, data_res, agent.on_next_player)
+
+
+# カードが場に出た
+@sio.on(SocketConst.EMIT.PLAY_CARD)
+def on_play_card(data_res):
+    receive_event(SocketConst.EMIT.PLAY_CARD, data_res, agent.on_play_card)
+
+
+# 山札からカードを引いた
+@sio.on(SocketConst.EMIT.DRAW_CARD)
+def on_draw_card(data_res):
+    receive_event(SocketConst.EMIT.DRAW_CARD, data_res, agent.on_draw_card)
+
+
+# 山札から引いたカードが場に出た
+@sio.on(SocketConst.EMIT.PLAY_DRAW_CARD)
+def on_play_draw_card(data_res):
+    receive_event(SocketConst.EMIT.PLAY_DRAW_CARD, data_res, agent.on_play_draw_card)
+
+
+# チャレンジの結果
+@sio.on(SocketConst.EMIT.CHALLENGE)
+def on_challenge(data_res):
+    receive_event(SocketConst.EMIT.CHALLENGE, data_res, agent.on_challenge)
+
+
+# チャレンジによる手札の公開
+@sio.on(SocketConst.EMIT.PUBLIC_CARD)
+def on_public_card(data_res):
+    receive_event(SocketConst.EMIT.PUBLIC_CARD, data_res, agent.on_public_card)
+
+
+# UNOコールを忘れていることを指摘
+@sio.on(SocketConst.EMIT.POINTED_NOT_SAY_UNO)
+def on_pointed_not_say_uno(data_res):
+    receive_event(SocketConst.EMIT.POINTED_NOT_SAY_UNO, data_res)
+
+
+# 対戦が終了
+@sio.on(SocketConst.EMIT.FINISH_TURN)
+def on_finish_turn(data_res):
+    receive_event(SocketConst.EMIT.FINISH_TURN, data_res, agent.on_finish_turn)
+
+
+# 試合が終了
+@sio.on(SocketConst.EMIT.FINISH_GAME)
+def on_finish_game(data_res):
+    receive_event(SocketConst.EMIT.FINISH_GAME, data_res)
+
+
+# ペナルティ発生
+@sio.on(SocketConst.EMIT.PENALTY)
+def on_penalty(data_res):
+    receive_event(SocketConst.EMIT.PENALTY, data_res, agent.on_penalty)
+
+
+def main():
+    sio.connect(
+        host,
+        transports=['websocket'],
+    )
+    sio.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,599 @@
+from collections import defaultdict, deque
+from typing import Union
+import random
+import numpy as np
+from card import CARD_KEY, WILD_SHUFFLE, encode
+
+
+NUM_OF_ALL_CARDS = 112
+DEBUG = False # Trueの場合は集計値を毎ターンcards_statusから再計算して照合する
+
+# cards_statusの行(色)と列(数字・記号)の並び
+# 行の並びは同じ枚数の色を並べるときの優先順位にもなる
+STATUS_COLORS = ['blue', 'green', 'red', 'yellow', 'black', 'white']
+STATUS_TYPES = [str(i) for i in range(10)] + ['draw_2', 'skip', 'reverse']
+COLOR_ROW = {color: i for i, color in enumerate(STATUS_COLORS)} # 色 -> 行
+TYPE_COL = dict({t: i for i, t in enumerate(STATUS_TYPES)}, wild=0, wild_draw_4=1, wild_shuffle=2, white_wild=0) # 数字・記号 -> 列
+CARD_CELL = tuple(COLOR_ROW[color] * len(STATUS_TYPES) + TYPE_COL[t] for color, t in CARD_KEY) # カード -> cards_statusの要素番号(1次元)
+
+# 場に出ていない札の初期枚数
+INIT_CARDS_STATUS = np.zeros((len(STATUS_COLORS), len(STATUS_TYPES)), dtype=np.int64)
+INIT_CARDS_STATUS[:4, :] = 2
+INIT_CARDS_STATUS[:4, TYPE_COL['0']] = 1
+INIT_CARDS_STATUS[COLOR_ROW['black'], [TYPE_COL['wild'], TYPE_COL['wild_draw_4'], TYPE_COL['wild_shuffle']]] = [4, 4, 1]
+INIT_CARDS_STATUS[COLOR_ROW['white'], TYPE_COL['white_wild']] = 3
+CARD_ROW = tuple(cell // len(STATUS_TYPES) for cell in CARD_CELL) # カード -> cards_statusの行
+# ワイルドドロー4以外のワイルド系カードであるか
+CARD_IS_WILD = tuple(t in ('wild', 'wild_shuffle', 'white_wild') for _, t in CARD_KEY)
+WILD_CELLS = [CARD_CELL[card] for card in range(len(CARD_KEY)) if CARD_IS_WILD[card]]
+
+class Status:
+    def __init__(self) -> None:
+        self.cards_status = self.init_cards_status()
+        self.init_unseen_counts()
+        self.my_cards = []
+        self.order_dic = {}
+        self.uno_declared = {}
+        self.my_uno_flag = False
+        self.num_of_deck = NUM_OF_ALL_CARDS - 4 * 7 - 1 # 山札の枚数
+        self.num_of_field = 1 # 場にあるカードの枚数
+        self.is_card_activate = True # 場にあるドロー系カードの効果の有無を格納するフィールド
+        self.is_white_activate = defaultdict(int)
+        self.challenge_success = False
+        self.turn_right = True
+        self.special_logic_flag = [False, False, False]
+        self.version = None
+
+        # プレイヤーごとに手札の枚数を記録しておくディクショナリ
+        self.player_card_counts = defaultdict(int)
+
+        # 「誰が」「どのカードを」出したかを記録するディクショナリ
+        self.player_card_log = defaultdict(lambda: deque(maxlen=None))
+
+        # 「誰が」「どの色」に変更したかを記録するディクショナリ
+        self.player_color_log = defaultdict(lambda: deque(maxlen=None))
+
+        # 最後にカードをプレイしたプレイヤーを記録しておく文字列型フィールド
+        self.who_played_last = None
+
+        # 場に出されたカードを記録する配列
+        self.field_cards = deque(maxlen=None)
+
+        # 誰がどの手札を公開したか記録するdict(list(card))
+        self.other_open_cards = defaultdict(list)
+        # 自分がどの手札を公開したか記録するdict(list(card))
+        self.my_open_cards = defaultdict(list)
+
+
+    def init_cards_status(self) -> np.ndarray:
+        """
+        カードカウンティング用変数(cards_status)の初期化
+        6色 × 13種類の整数配列で、行・列の並びはSTATUS_COLORS・STATUS_TYPESに従う
+        """
+        return INIT_CARDS_STATUS.copy()
+
+
+    def init_unseen_counts(self) -> None:
+        """
+        cards_statusの集計値を初期化する
+        以後はcards_statusの更新に合わせて差分だけ更新する
+        """
+        self.num_unseen = int(INIT_CARDS_STATUS.sum()) # 見えていない札の合計
+        self.num_unseen_color = [int(n) for n in INIT_CARDS_STATUS.sum(axis=1)] # 色(行)ごとの見えていない札
+        self.num_unseen_wild = int(INIT_CARDS_STATUS.flat[WILD_CELLS].sum()) # 見えていないワイルド系カード(ワイルドドロー4を除く)
+
+
+    def add_cards_status(self, cards: list, n: int) -> None:
+        """
+        cards_statusと集計値をカード1枚ごとに更新する
+
+        Args:
+            cards (list): 対象のカード
+            n (int): 1枚あたりの増減 (見えた場合は-1, 見えなくなった場合は+1)
+        """
+        cells = self.cards_status.reshape(-1)
+        num_unseen_color = self.num_unseen_color
+        for card in cards:
+            cells[CARD_CELL[card]] += n
+            num_unseen_color[CARD_ROW[card]] += n
+            if CARD_IS_WILD[card]:
+                self.num_unseen_wild += n
+        self.num_unseen += n * len(cards)
+
+
+    def check_unseen_counts(self) -> None:
+        """集計値がcards_statusの再計算と一致しているか確認する(デバッグ用)"""
+        assert self.num_unseen == int(self.cards_status.sum()), 'num_unseen'
+        assert self.num_unseen_color == [int(n) for n in self.cards_status.sum(axis=1)], 'num_unseen_color'
+        assert self.num_unseen_wild == int(self.cards_status.flat[WILD_CELLS].sum()), 'num_unseen_wild'
+
+
+    def init_player_card_counts(self, player_id_list: list) -> None:
+        """
+        プレイヤーのカード枚数カウントを初期化するメソッド
+        Args:
+            player_id_list(list): 全員分のplayer_idを格納したリスト
+        """
+        for player_id in player_id_list:
+            self.player_card_counts[player_id] = 7
+
+
+    def set_my_cards(self, cards:list) -> None:
+        """自分の手札(my_cards)の更新 ※カードは整数で扱う"""
+        self.my_cards = cards.copy()
+
+
+    def update_cards_status(self, cards: Union[int, list]) -> None:
+        """
+        場に出たカード、手札に来たカードからcards_statusを更新するメソッド
+        Args:
+            cards (int|list): 場に出たカード or 手札に来たカード
+        """
+        if isinstance(cards, int):
+            # 場に出されたカードの場合は記録しておく
+            cards = [cards]
+
+        self.add_cards_status(cards, -1)
+
+        # print("場札または手札にないのは")
+        # print("カードステータス:", self.cards_status)
+
+
+    def return_my_cards(self) -> None:
+        """
+        シャッフルによって場に戻った手札の分cards_statusを更新する
+        """
+        self.restore_cards_status([card for card in self.my_cards if card != WILD_SHUFFLE])
+
+
+    def restore_cards_status(self, cards: Union[int, list]) -> None:
+        """
+        見えていたカードが再び見えなくなった分cards_statusを戻すメソッド
+        Args:
+            cards (int|list): 見えなくなったカード
+        """
+        if isinstance(cards, int):
+            cards = [cards]
+
+        self.add_cards_status(cards, 1)
+
+
+    def count_color(self, color: str) -> int:
+        """指定した色の場に出ていない札の枚数"""
+        return self.num_unseen_color[COLOR_ROW[color]]
+
+
+    def count_colors(self) -> list:
+        """4色それぞれの場に出ていない札の枚数 (STATUS_COLORSの先頭4色の順)"""
+        return self.num_unseen_color[:4]
+
+
+    def count_wild(self) -> int:
+        """場に出ていないワイルド系カード(ワイルドドロー4を除く)の枚数"""
+        return self.num_unseen_wild
+
+
+    def count_unseen(self) -> int:
+        """場に出ていない(自分から見えていない)札の合計枚数"""
+        return self.num_unseen
+
+
+    def wild_shuffle_flag(self) -> bool:
+        """
+        自分の手札にワイルドシャッフルがあるかどうかを返す
+        """
+        return WILD_SHUFFLE in self.my_cards
+
+
+    def check_player_card_counts(self, player: str, card_num: int) -> None:
+        """
+        「自分のターン時に」呼び出して、
+        引数で指定したプレイヤーのカードを更新させる関数
+        カード枚数を照合する役割を果たす
+        ※ペナルティなどのイベントで枚数計算がうまくいかない場合がある
+        ※毎ターン提示される各プレイヤーの枚数情報を用いて正しい枚数に修正する
+
+        Args:
+            player(str): カードを出した or 引いたプレイヤー名
+            draw_num(int): カードの枚数
+        """
+
+        # Debug用プリント処理
+        # print("---枚数照合---")
+        # print("誰？：", player)
+        # print("dealerから送られてきたカード枚数:", card_num)
+        # print("game_statusで記録していたカード枚数:", self.player_card_counts[player])
+        # print("正しいか:", self.player_card_counts[player]==card_num)
+
+        # 更新
+        if self.player_card_counts[player] != card_num:
+            # print("正しい枚数に更新する")
+            self.player_card_counts[player] = card_num
+
+
+    def update_player_card_log(self, player:str, card:any) -> None:
+        """
+        プレイヤーごとに
+        - どのようなカードを場に出したか
+        - そのときの、カードを出した後の残り枚数
+        を時系列で記録する関数
+
+        Args:
+            player(str): プレイヤー名
+            card(any): 場に出したカード
+        """
+
+        tmp_dict = {
+            "card_counts":self.player_card_counts[player],
+            "card": card,
+        }
+
+        # プレイヤーごとにカードログを記録
+        self.player_card_log[player].append(tmp_dict)
+
+        # DEBUG用
+        # if len(self.player_card_log[player]) >= 2:
+            # print("今のは" + str(self.player_card_log[player][-1]))
+            # print("その前は" + str(self.player_card_log[player][-2]))
+
+
+    def set_play_order(self, order: list, my_id: str) -> None:
+        """順番を記憶させる関数"""
+        my_pos = order.index(my_id)
+        self.order_dic[order[(my_pos + 1) % 4]] = {"位置": "直後", "UNO": False}
+        self.order_dic[order[(my_pos + 2) % 4]] = {"位置": "対面", "UNO": False}
+        self.order_dic[order[(my_pos + 3) % 4]] = {"位置": "直前", "UNO": False}
+
+
+    def reverse_order(self) -> None:
+        """順番逆転に対応させる関数"""
+        # print("反転発動")
+        # print(self.order_dic)
+        self.turn_right = not self.turn_right
+        for k, v in self.order_dic.items():
+            if v["位置"] == "直前":
+                self.order_dic[k]["位置"] = "直後"
+            elif v["位置"] == "直後":
+                self.order_dic[k]["位置"] = "直前"
+
+
+    def get_before_id(self) -> str:
+        """直前のプレイヤーのidを入手する関数"""
+        for k, v in self.order_dic.items():
+            if v["位置"] == "直前":
+                return k
+
+        return ""
+
+
+    def get_next_id(self) -> str:
+        """直後のプレイヤーのidを入手する関数"""
+        for k, v in self.order_dic.items():
+            if v["位置"] == "直後":
+                return k
+
+        return ""
+
+
+    def get_mid_id(self) -> str:
+        """対面のプレイヤーのidを入手する関数"""
+        for k, v in self.order_dic.items():
+            if v["位置"] == "対面":
+                return k
+
+        return ""
+
+
+    def set_uno_player(self, player_id: str) -> None:
+        """UNO宣言したやつの記憶"""
+        # print(player_id + "がUNOしました" )
+        self.order_dic[player_id]["UNO"] = True
+
+
+    def undo_uno_player(self, player_id: str) -> None:
+        """UNO宣言解除したやつの記憶"""
+        # print(player_id + "がUNO解除しました" )
+        self.order_dic[player_id]["UNO"] = False
+
+
+    def check_uno_player(self, my_id: str, number_card_of_player: dict) -> None:
+        """UNO宣言のチェック"""
+        for k, v in number_card_of_player.items():
+            if k != my_id and k in self.order_dic:
+                self.order_dic[k]["UNO"] = v == 1
+        # print(self.order_dic)
+
+
+    def deck_empty(self) -> None:
+        """山札が0になった場合にcard_statusをリセットするメソッド"""
+        # print("山札が切れました")
+        # card_statusのリセット
+        # 最後に場に出されたカードと自分の手札カードは山札に戻らないのでcard_statusから除外する
+        self.cards_status = self.init_cards_status()
+        self.init_unseen_counts()
+        self.update_cards_status([encode(self.field_cards[-1])] + self.my_cards)
+
+        # 山札枚数を再計算する
+        # 最後の1枚を除いて山札に戻す、山札がマイナス(借金状態)な時も考慮する
+        self.num_of_deck = self.num_of_field - 1 + self.num_of_deck
+        self.num_of_field = 1 # 場のカードは1枚にする
+
+        # debug print
+        # print("---山札のリセットがうまくできているか---")
+        # self.debug_print()
+
+
+    def get_keys_for_card_status(self, card: int) -> tuple:
+        """
+        card_status用のkeyを取得するメソッド
+        ワイルド系のカードは指定された色に関係なく黒(白)のキーになる
+
+        Args:
+            card(int):カード
+        Returns
+            tuple: (color, type)
+        """
+        return CARD_KEY[card]
+
+
+    def draw_card(self, player:str, penalty_draw:int=0) -> None:
+        """
+        カードが山札から引かれた時に実行されるメソッド
+        ※このメソッドでは「cards_status」を操作しない
+
+        Args:
+            player(str): カードを引くプレイヤー
+            penalty_draw(bool): ペナルティ時に何枚引くかを指定する ※0枚の時はペナルティ無しと扱う
+        """
+        # 自分がカードを引いた際、そのターンにどのカードを引いたのか判定できない
+        # 自分のターンが回ってきたときに増加分のカードのcards_statusを更新する
+
+        # print(f"---{player}がカードを引きます---")
+
+        # 手持ちが25枚より大きい状態になることを許容するか
+        is_ok_over_25 = True # デフォルトでは25枚引けると設定する
+
+        # 最後に出されたカードを取得する
+        top_card = self.field_cards[-1]
+        top_card_special = top_card.get("special")
+
+        if len(self.player_color_log[player]) > 0:
+            color_log = self.player_color_log[player][-1]
+            if color_log[1] != 'wild':
+                self.player_color_log[player][-1][2] = False
+
+        # ペナルティの場合は指定した回数分だけ引く
+        if penalty_draw:
+            num_of_draw = penalty_draw
+            is_ok_over_25 = False # 25枚以上は引くことができない
+            # print("引く理由: ペナルティ")
+
+        # 山札から引くカードの枚数を指定
+        # 最後に場に出されたカードに応じて場合分け
+        elif self.is_card_activate and top_card_special == "white_wild":
+            num_of_draw = 1
+            self.is_white_activate[player] += 1
+            self.is_card_activate = False # 場に出たドロー系カードの効力は使い切った
+            # print(f"引く理由: white_wild")
+
+        elif self.is_card_activate and top_card_special == "draw_2":
+            num_of_draw = 2
+            self.is_card_activate = False # 場に出たドロー系カードの効力は使い切った
+            if self.is_white_activate[player] > 0:
+                self.is_white_activate[player] -= 1
+            # print("引く理由: draw_2")
+
+        elif self.is_card_activate and top_card_special == "wild_draw_4":
+            num_of_draw = 4
+            self.is_card_activate = False # 場に出たドロー系カードの効力は使い切った
+            if self.is_white_activate[player] > 0:
+                self.is_white_activate[player] -= 1
+            # print(f"引く理由: wild_draw_4")
+
+        else:
+            if self.is_white_activate[player] > 0:
+                num_of_draw = 1
+                self.is_white_activate[player] -= 1
+                # print(f"引く理由: white_wild")
+            else:
+                num_of_draw = 1
+                is_ok_over_25 = False # 25枚以上は引くことができない
+
+                # プレイヤーが出せなかった色を記録しておく
+                top_card_color = top_card.get("color")
+                self.player_color_log[player].append([top_card_color, "cant_play_card", True])
+
+                # print(f"引く理由: 場に出すカードがない(再行動可能)")
+
+        # print("---更新前---")
+        # print(f"山札:{self.num_of_deck}枚")
+        # for k, v in self.player_card_counts.items():
+            # print(f"{k}:{v}枚", end=" ")
+        # print()
+
+        # 手持ちが25枚より多い状態になることが許容されない場合
+        if not is_ok_over_25:
+            # 引いた後の手札が25枚以下になるように引く枚数を調整する
+            # print("25枚以下制約あり")
+            num_of_draw = max(0, min(25 - self.player_card_counts[player], num_of_draw))
+
+        # 山札とプレイヤーの手札の枚数を更新
+        self.num_of_deck -= num_of_draw
+        self.player_card_counts[player] += num_of_draw
+
+        # print("---更新後---")
+        # print(f"山札から{player}へ{num_of_draw}枚移動")
+        # print(f"山札:{self.num_of_deck}枚")
+        # for k, v in self.player_card_counts.items():
+            # print(f"{k}:{v}枚", end=" ")
+        # print()
+
+        # 山札が無くなった場合は以下を実行
+        if self.num_of_deck <= 0:
+            self.deck_empty()
+
+
+    def play_card(self, card:any, player:str) -> None:
+        """
+        カードを場に出した際に呼ばれるメソッド
+        ※このメソッドでは「cards_status」を操作しない
+
+        Args:
+            card(any): 場に出たカード
+            player(str): カードを出したプレイヤー
+        """
+
+        # プレイヤーの手札を1枚減らす
+        # シャッフルワイルドの場合は, 余分に減らしてしまうのでこの操作はスキップ
+        if card.get('special') != 'wild_shuffle':
+            self.player_card_counts[player] -= 1
+
+        # 場のカード枚数を1枚増やす
+        # self.num_of_field += 1
+
+        # カードを記録する
+        if card.get("special") == "white_wild":
+            # 白カードの場合は、最後に出されたカードの色に強制変更する
+            new_color = self.field_cards[-1]["color"]
+            new_card = {
+                "color": new_color,
+                "special": "white_wild",
+            }
+            self.field_cards.append(new_card) # 場に出たカードの記録
+        else:
+            self.field_cards.append(card) # 場に出たカードの記録
+        self.update_player_card_log(player, card) # プレイヤーごとのログを取る
+
+        # 場のカードが更新されたのでこれから場に出されるドロー系カードの効力は復活する
+        self.is_card_activate = True
+
+        # DEBUG
+        # print("---場にカードを出した---")
+        # print("プレイヤー:", player)
+        # print("カード:", card)
+        # self.debug_print()
+
+
+    # def debug_print(self) -> None:
+    #     """Debug用のメソッド"""
+    #     # print("山札の枚数:", self.num_of_deck)
+    #     # print("場の枚数:", self.num_of_field)
+    #     cnt = self.num_of_field + self.num_of_deck
+    #     for k, v in self.player_card_counts.items():
+    #         # print(f"{k}の枚数:", v)
+    #         cnt += v
+    #     # print("カード合計:", cnt)
+    #     # print("CHECK:", cnt==NUM_OF_ALL_CARDS)
+    #     # if cnt != NUM_OF_ALL_CARDS:
+    #         # print(self.cards_status)
+    #     # print("最後に記録されたカード:", self.field_cards[-1])
+
+
+    def set_other_player_cards(self, id:str, cards:list) -> None:
+        """
+        他のやつが手札公開したときに覚えておくための関数
+        args:
+            id:str = 公開したプレイヤーのid
+            cards:list = 公開した内容
+
+        """
+        self.other_open_cards[id] = cards.copy()
+        # print('公開カード！')
+        # # print(cnt_self_cards)
+        # # print(cnt_cards)
+        # print(self.other_open_cards[id])
+
+
+    def remove_other_player_cards(self, id:str, card:int) -> None:
+        """
+        手札公開していたやつが使ったカードを公開していた手札から消去する関数
+        args:
+            id:str = 公開したプレイヤーのid
+            card:int = 使ったカード
+        """
+
+        if len(self.other_open_cards[id]) > 0: # そいつがカードを公開していて
+            if card in self.other_open_cards[id]: # そいつがその札持ってたら
+                # print(id+"が公開済みカードを使いました")
+                # # print(card)
+                self.other_open_cards[id].remove(card)
+
+
+    def init_open_cards(self):
+        """
+        ワイルドシャッフル時に公開済みカードを初期化する関数
+        """
+
+        # print("公開カードリセット")
+        self.other_open_cards = defaultdict(list)
+
+
+    def remove_my_open_cards(self, card: int) -> None:
+        """
+        自分が公開した手札から使ったカードを消去する関数
+        args:
+            card:int = 使ったカード
+        """
+        challenge_success = False
+        for k, v in self.my_open_cards.items():
+            if card in v: # 自分がその札公開してたら
+                # print(k + "への公開済みカードを使いました")
+                # print(card)
+                self.my_open_cards[k].remove(card)
+
+            if len(self.my_open_cards[k]) > 0:
+                challenge_success = True
+        self.challenge_success = challenge_success
+        # print('公開済みカード！')
+        # print(self.my_open_cards)
+        # print(self.challenge_success)
+
+
+    def init_my_open_cards(self):
+        """
+        ワイルドシャッフル時に自分の公開済みカードを初期化する関数
+        """
+
+        # print("自分の公開カードリセット")
+        self.my_open_cards = defaultdict(list)
+        self.challenge_success = False
+
+
+
+    def calculate_num_of_deck(self, my_id: str, number_card_of_player: dict):
+        """
+        見えていない札の合計から他のプレイヤーの手札枚数を引いて山札の枚数を求める
+
+        Args:
+            my_id (str): 自分のID
+            number_card_of_player (dict): ディーラーから通知された各プレイヤーの手札枚数
+        Returns:
+            int: 山札の枚数
+        """
+        if DEBUG:
+            self.check_unseen_counts()
+
+        self.num_of_deck = self.num_unseen
+
+        for k, v in number_card_of_player.items():
+            # print(f"{k}の枚数:", v)
+            if k != my_id:
+                self.num_of_deck -= v
+
+        if DEBUG and self.num_of_deck < 0:
+            # 他のプレイヤーの手札枚数と見えていない札の枚数が合わない
+            print('num_of_deck < 0:', self.num_of_deck, number_card_of_player)
+
+        return self.num_of_deck
+
+
+
+
+class Games:
+    def __init__(self):
+        self.num_game = 0
+        self.challenge_cnt = {} # 各プレイヤーに対するチャレンジ成功数
+        self.challenged_cnt = {}
+        self.scores = [0, 0]
+        # self.version_order = ['v2', 'v3'] * 147 + ['v2'] * 3
+        # random.shuffle(self.version_order)